@@ -1,89 +1,125 @@
 """Language initialization for tree-sitter based chunkers.
 
 This module handles importing and registering available languages
-for the tree-sitter based code chunking system.
+for the tree-sitter based code chunking system. Grammar packages are
+imported lazily, the first time a language is requested, so a pure
+Python project never loads the other grammars.
 """
 
+import importlib
 import logging
+import os
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
 from tree_sitter import Language
 
 logger = logging.getLogger(__name__)
 
-def get_availiable_language():
-    """
-    Return a map {language: language_obj}
-    """
-    # Try to import language bindings
-    res = {}
+# language -> (grammar module, language function, pip package)
+GRAMMARS = {
+    'python': ('tree_sitter_python', 'language', 'tree-sitter-python'),
+    'javascript': ('tree_sitter_javascript', 'language', 'tree-sitter-javascript'),
+    # JavaScript also supports JSX
+    'jsx': ('tree_sitter_javascript', 'language', 'tree-sitter-javascript'),
+    # TypeScript has two grammars: typescript and tsx
+    'typescript': ('tree_sitter_typescript', 'language_typescript', 'tree-sitter-typescript'),
+    'tsx': ('tree_sitter_typescript', 'language_tsx', 'tree-sitter-typescript'),
+    'svelte': ('tree_sitter_svelte', 'language', 'tree-sitter-svelte'),
+    'go': ('tree_sitter_go', 'language', 'tree-sitter-go'),
+    'rust': ('tree_sitter_rust', 'language', 'tree-sitter-rust'),
+    'java': ('tree_sitter_java', 'language', 'tree-sitter-java'),
+    'c': ('tree_sitter_c', 'language', 'tree-sitter-c'),
+    'cpp': ('tree_sitter_cpp', 'language', 'tree-sitter-cpp'),
+    'csharp': ('tree_sitter_c_sharp', 'language', 'tree-sitter-c-sharp'),
+    'markdown': ('tree_sitter_markdown', 'language', 'tree-sitter-markdown'),
+}
 
-    try:
-        import tree_sitter_python as tspython
-        res['python'] = Language(tspython.language())
-    except ImportError:
-        logger.debug("tree-sitter-python not installed")
+# Loaded languages (None marks a grammar that is not installed)
+_languages: Dict[str, Optional[Language]] = {}
+_lock = threading.Lock()
 
-    try:
-        import tree_sitter_javascript as tsjavascript
-        res['javascript'] = Language(tsjavascript.language())
-        # JavaScript also supports JSX
-        res['jsx'] = res['javascript']
-    except ImportError:
-        logger.debug("tree-sitter-javascript not installed for JSX")
 
-    try:
-        import tree_sitter_typescript as tstypescript
-        # TypeScript has two grammars: typescript and tsx
-        res['typescript'] = Language(tstypescript.language_typescript())
-        res['tsx'] = Language(tstypescript.language_tsx())
-    except ImportError:
-        logger.debug("tree-sitter-typescript not installed")
+def _reset_lock_after_fork() -> None:
+    global _lock
+    _lock = threading.Lock()
 
-    try:
-        import tree_sitter_svelte as tssvelte
-        res['svelte'] = Language(tssvelte.language())
-    except ImportError:
-        logger.debug("tree-sitter-svelte not installed")
 
-    try:
-        import tree_sitter_go as tsgo
-        res['go'] = Language(tsgo.language())
-    except ImportError:
-        logger.debug("tree-sitter-go not installed")
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
 
-    try:
-        import tree_sitter_rust as tsrust
-        res['rust'] = Language(tsrust.language())
-    except ImportError:
-        logger.debug("tree-sitter-rust not installed")
 
-    try:
-        import tree_sitter_java as tsjava
-        res['java'] = Language(tsjava.language())
-    except ImportError:
-        logger.debug("tree-sitter-java not installed")
+def get_language(name: str) -> Optional[Language]:
+    """Get the tree-sitter language for a name, importing its grammar on first use.
 
-    try:
-        import tree_sitter_c as tsc
-        res['c'] = Language(tsc.language())
-    except ImportError:
-        logger.debug("tree-sitter-c not installed")
+    Languages are process-wide singletons; languages sharing a grammar
+    (javascript and jsx) share one Language object.
 
-    try:
-        import tree_sitter_cpp as tscpp
-        res['cpp'] = Language(tscpp.language())
-    except ImportError:
-        logger.debug("tree-sitter-cpp not installed")
+    Args:
+        name: Language name (a key of GRAMMARS)
 
+    Returns:
+        Language, or None if the name is unknown or the grammar is not installed
+    """
     try:
-        import tree_sitter_c_sharp as tscsharp
-        res['csharp'] = Language(tscsharp.language())
-    except ImportError:
-        logger.debug("tree-sitter-c-sharp not installed")
+        return _languages[name]
+    except KeyError:
+        pass
+
+    if name not in GRAMMARS:
+        return None
+
+    with _lock:
+        if name in _languages:
+            return _languages[name]
+
+        module_name, function_name, package = GRAMMARS[name]
+        language = None
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            logger.debug(f"{package} not installed")
+        else:
+            # Reuse the Language of another name backed by the same grammar
+            for other, grammar in GRAMMARS.items():
+                if grammar[:2] == (module_name, function_name) and _languages.get(other) is not None:
+                    language = _languages[other]
+                    break
+            else:
+                language = Language(getattr(module, function_name)())
+
+        _languages[name] = language
+        return language
+
+
+class LazyLanguageMap(Mapping):
+    """Read-only {language: language_obj} map that loads grammars on access.
+
+    Membership tests and lookups load only the requested grammar; iterating
+    loads all of them.
+    """
 
-    try:
-        import tree_sitter_markdown as tsmarkdown
-        res['markdown'] = Language(tsmarkdown.language())
-    except ImportError:
-        logger.debug("tree-sitter-markdown not installed")
+    def __getitem__(self, name: str) -> Language:
+        language = get_language(name)
+        if language is None:
+            raise KeyError(name)
+        return language
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and get_language(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in GRAMMARS if get_language(name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
 
-    return res
\ No newline at end of file
+
+def get_availiable_language():
+    """
+    Return a map {language: language_obj}
+
+    Loads every installed grammar; prefer get_language() for a single language.
+    """
+    return dict(LazyLanguageMap())
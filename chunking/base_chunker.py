@@ -5,11 +5,12 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from tree_sitter import Parser
-
-from chunking.available_languages import get_availiable_language
-# map {language: language_obj}
-AVAILABLE_LANGUAGES = get_availiable_language()
+from chunking.available_languages import LazyLanguageMap, get_language
+from chunking.chunk_sizing import CHARS_PER_TOKEN, ChunkSizeLimits, estimate_tokens
+from chunking.parse_cache import ParseTreeCache, compute_edit
+from chunking.parser_pool import get_parser_pool
+# map {language: language_obj}, grammars are imported on first access
+AVAILABLE_LANGUAGES = LazyLanguageMap()
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,12 @@ class TreeSitterChunk:
 class LanguageChunker(ABC):
     """Abstract base class for language-specific chunkers."""
 
+    # Deeper nodes (e.g. in minified or generated code) are not searched for chunks
+    MAX_TRAVERSAL_DEPTH = 256
+
+    # Chunk types whose children are searched for nested chunks (e.g. methods)
+    CONTAINER_NODE_TYPES = frozenset({'class_definition', 'class_declaration'})
+
     def __init__(self, language_name: str):
         """Initialize language chunker.
 
@@ -47,12 +54,17 @@ class LanguageChunker(ABC):
             language_name: Programming language name
         """
         self.language_name = language_name
-        if language_name not in AVAILABLE_LANGUAGES:
+        self.language = get_language(language_name)
+        if self.language is None:
             raise ValueError(f"Language {language_name} not available. Install tree-sitter-{language_name}")
 
-        self.language = AVAILABLE_LANGUAGES[language_name]
-        self.parser = Parser(self.language)
+        # Parsers come from the process-wide pool, so chunkers can be used from any thread
+        self.parser_pool = get_parser_pool()
         self.splittable_node_types = self._get_splittable_node_types()
+        # Optional cache of previous trees for incremental reparsing
+        self.tree_cache: Optional[ParseTreeCache] = None
+        # Optional token targets for splitting large and merging small chunks
+        self.size_limits: Optional[ChunkSizeLimits] = None
 
     @abstractmethod
     def _get_splittable_node_types(self) -> Set[str]:
@@ -92,12 +104,12 @@ class LanguageChunker(ABC):
 
         Args:
             node: Tree-sitter node
-            source: Source code bytes
+            source: Source code bytes (or a memoryview of them)
 
         Returns:
             Text content
         """
-        return source[node.start_byte:node.end_byte].decode('utf-8')
+        return str(source[node.start_byte:node.end_byte], 'utf-8')
 
     def get_line_numbers(self, node: Any) -> Tuple[int, int]:
         """Get start and end line numbers for a node.
@@ -111,67 +123,309 @@ class LanguageChunker(ABC):
         # Tree-sitter uses 0-based indexing, convert to 1-based
         return node.start_point[0] + 1, node.end_point[0] + 1
 
-    def chunk_code(self, source_code: str) -> List[TreeSitterChunk]:
+    def parse(self, source_bytes: bytes, cache_key: Optional[str] = None) -> Any:
+        """Parse source code, reusing the cached tree of the file if available.
+
+        When a previous tree for cache_key is cached, the byte diff against its
+        source is applied as an edit and tree-sitter reparses incrementally.
+
+        Args:
+            source_bytes: Source code bytes
+            cache_key: Optional cache key (usually the file path)
+
+        Returns:
+            Tree-sitter tree
+        """
+        if self.tree_cache is None or cache_key is None:
+            with self.parser_pool.parser(self.language_name) as parser:
+                return parser.parse(source_bytes)
+
+        cached = self.tree_cache.take(cache_key)
+        if cached is None:
+            with self.parser_pool.parser(self.language_name) as parser:
+                tree = parser.parse(source_bytes)
+        else:
+            old_source, old_tree = cached
+            edit = compute_edit(old_source, source_bytes)
+            if edit is None:
+                tree = old_tree
+            else:
+                edit.apply_to(old_tree)
+                with self.parser_pool.parser(self.language_name) as parser:
+                    tree = parser.parse(source_bytes, old_tree)
+
+        self.tree_cache.put(cache_key, source_bytes, tree)
+        return tree
+
+    def chunk_code(self, source_code: str, cache_key: Optional[str] = None) -> List[TreeSitterChunk]:
         """Chunk source code into semantic units.
 
         Args:
             source_code: Source code string
+            cache_key: Optional key for incremental reparsing (usually the file path)
 
         Returns:
             List of TreeSitterChunk objects
         """
         source_bytes = bytes(source_code, 'utf-8')
-        tree = self.parser.parse(source_bytes)
+        tree = self.parse(source_bytes, cache_key)
+        # Node text is decoded straight from a view, only for chunked nodes
+        source = memoryview(source_bytes)
+        chunks = self._chunk_tree(tree, source)
+        if self.size_limits is not None and chunks:
+            chunks = self._apply_size_limits(chunks, source_code, self.size_limits)
+        else:
+            chunks = [chunk for _, chunk in chunks]
+
+        # If no chunks found, create a single module-level chunk
+        if not chunks and source_code.strip():
+            chunks.append(TreeSitterChunk(
+                content=source_code,
+                start_line=1,
+                end_line=source_code.count('\n') + 1,
+                node_type='module',
+                language=self.language_name,
+                metadata={'type': 'module'}
+            ))
+
+        return chunks
+
+    def _make_chunk(
+        self,
+        node: Any,
+        source: bytes,
+        metadata: Dict[str, Any],
+        parent_info: Optional[Dict[str, Any]]
+    ) -> TreeSitterChunk:
+        """Create a chunk for a node, adding parent information if available."""
+        if parent_info:
+            metadata.update(parent_info)
+
+        start_line, end_line = self.get_line_numbers(node)
+        return TreeSitterChunk(
+            content=self.get_node_text(node, source),
+            start_line=start_line,
+            end_line=end_line,
+            node_type=node.type,
+            language=self.language_name,
+            metadata=metadata
+        )
+
+    def _chunk_tree(self, tree: Any, source: bytes) -> List[Tuple[Any, TreeSitterChunk]]:
+        """Extract chunks by walking the tree with a cursor.
+
+        Args:
+            tree: Parsed tree
+            source: Source code bytes
+
+        Returns:
+            List of (node, TreeSitterChunk) pairs in document order
+        """
         chunks = []
 
-        def traverse(node, depth=0, parent_info=None):
-            """Recursively traverse the tree and extract chunks."""
+        # Iterative pre-order walk; parent_infos[-1] applies to the cursor's level
+        cursor = tree.walk()
+        parent_infos: List[Optional[Dict[str, Any]]] = [None]
+        depth = 0
+        depth_exceeded = False
+
+        while True:
+            node = cursor.node
+            parent_info = parent_infos[-1]
+            descend = True
+
             if self.should_chunk_node(node):
-                start_line, end_line = self.get_line_numbers(node)
-                content = self.get_node_text(node, source_bytes)
-                metadata = self.extract_metadata(node, source_bytes)
-
-                # Add parent information if available
-                if parent_info:
-                    metadata.update(parent_info)
-
-                chunk = TreeSitterChunk(
-                    content=content,
-                    start_line=start_line,
-                    end_line=end_line,
-                    node_type=node.type,
-                    language=self.language_name,
-                    metadata=metadata
-                )
-                chunks.append(chunk)
+                metadata = self.extract_metadata(node, source)
+                chunks.append((node, self._make_chunk(node, source, metadata, parent_info)))
 
                 # For classes, continue traversing to find methods
                 # For other chunked nodes, stop traversal
-                if node.type in ['class_definition', 'class_declaration']:
+                if node.type in self.CONTAINER_NODE_TYPES:
                     # Pass class info to children
-                    class_info = {
+                    parent_info = {
                         'parent_name': metadata.get('name'),
                         'parent_type': 'class'
                     }
-                    for child in node.children:
-                        traverse(child, depth + 1, class_info)
-                return
+                else:
+                    descend = False
+
+            if descend and depth >= self.MAX_TRAVERSAL_DEPTH:
+                depth_exceeded = True
+                descend = False
+
+            if descend and cursor.goto_first_child():
+                depth += 1
+                parent_infos.append(parent_info)
+                continue
+
+            # Move to the next sibling, climbing up until one exists
+            while depth > 0 and not cursor.goto_next_sibling():
+                cursor.goto_parent()
+                depth -= 1
+                parent_infos.pop()
+            if depth == 0:
+                break
+
+        if depth_exceeded:
+            logger.debug(
+                f"Skipped {self.language_name} nodes nested deeper than {self.MAX_TRAVERSAL_DEPTH} levels"
+            )
 
-            # Traverse children, passing along parent info
-            for child in node.children:
-                traverse(child, depth + 1, parent_info)
+        return chunks
 
-        traverse(tree.root_node)
+    def _apply_size_limits(
+        self,
+        node_chunks: List[Tuple[Any, TreeSitterChunk]],
+        source_code: str,
+        limits: ChunkSizeLimits
+    ) -> List[TreeSitterChunk]:
+        """Split oversized chunks and pack runs of small sibling chunks.
 
-        # If no chunks found, create a single module-level chunk
-        if not chunks and source_code.strip():
-            chunks.append(TreeSitterChunk(
-                content=source_code,
-                start_line=1,
-                end_line=len(source_code.split('\n')),
-                node_type='module',
-                language=self.language_name,
-                metadata={'type': 'module'}
-            ))
+        Args:
+            node_chunks: (node, chunk) pairs in document order
+            source_code: Source code string
+            limits: Token targets
 
-        return chunks
+        Returns:
+            List of TreeSitterChunk objects
+        """
+        lines = source_code.split('\n')
+        result: List[TreeSitterChunk] = []
+        # Run of small sibling chunks waiting to be packed
+        pending: List[Tuple[Any, TreeSitterChunk]] = []
+
+        for node, chunk in node_chunks:
+            tokens = estimate_tokens(chunk.content)
+            mergeable = tokens < limits.min_tokens and node.type not in self.CONTAINER_NODE_TYPES
+
+            if pending and not (
+                mergeable
+                and node.parent is not None
+                and node.parent.id == pending[0][0].parent.id
+                and self._span_tokens(lines, pending[0][1].start_line, chunk.end_line) <= limits.merge_tokens
+            ):
+                result.append(self._merge_chunks([c for _, c in pending], lines))
+                pending = []
+
+            if mergeable and node.parent is not None:
+                pending.append((node, chunk))
+            elif tokens > limits.max_tokens:
+                result.extend(self._split_chunk(node, chunk, lines, limits))
+            else:
+                result.append(chunk)
+
+        if pending:
+            result.append(self._merge_chunks([c for _, c in pending], lines))
+
+        return result
+
+    @staticmethod
+    def _span_tokens(lines: List[str], start_line: int, end_line: int) -> int:
+        """Estimate tokens in a 1-based inclusive line range."""
+        return sum(len(line) + 1 for line in lines[start_line - 1:end_line]) // CHARS_PER_TOKEN
+
+    def _merge_chunks(self, chunks: List[TreeSitterChunk], lines: List[str]) -> TreeSitterChunk:
+        """Pack consecutive small sibling chunks into one chunk."""
+        if len(chunks) == 1:
+            return chunks[0]
+
+        first, last = chunks[0], chunks[-1]
+        names = list(dict.fromkeys(c.metadata['name'] for c in chunks if c.metadata.get('name')))
+        metadata = dict(first.metadata)
+        metadata['name'] = ', '.join(names) if names else None
+        metadata['merged_count'] = len(chunks)
+
+        return TreeSitterChunk(
+            content='\n'.join(lines[first.start_line - 1:last.end_line]),
+            start_line=first.start_line,
+            end_line=last.end_line,
+            node_type=first.node_type,
+            language=self.language_name,
+            metadata=metadata
+        )
+
+    def _statement_starts(self, node: Any, max_tokens: int) -> List[int]:
+        """Collect 0-based lines where a node may be cut between statements.
+
+        Statements are the named children of the node's body (its largest
+        named child). Statements still above max_tokens contribute their own
+        inner boundaries, and leaf statements fall back to line boundaries.
+        """
+        children = node.named_children
+        if not children:
+            return list(range(node.start_point[0] + 1, node.end_point[0] + 1))
+
+        body = max(children, key=lambda child: child.end_byte - child.start_byte)
+        if body.named_child_count > 1 and (body.end_byte - body.start_byte) * 2 >= node.end_byte - node.start_byte:
+            children = body.named_children
+
+        starts = []
+        for child in children:
+            starts.append(child.start_point[0])
+            if (child.end_byte - child.start_byte) // CHARS_PER_TOKEN > max_tokens:
+                starts.extend(self._statement_starts(child, max_tokens))
+        return starts
+
+    def _split_chunk(
+        self,
+        node: Any,
+        chunk: TreeSitterChunk,
+        lines: List[str],
+        limits: ChunkSizeLimits
+    ) -> List[TreeSitterChunk]:
+        """Split an oversized chunk at statement boundaries, with overlap.
+
+        Parts cover whole lines; each part after the first starts with up to
+        overlap_tokens of the previous part's trailing lines.
+        """
+        first_line, last_line = chunk.start_line - 1, chunk.end_line - 1
+        boundaries = sorted({
+            line for line in self._statement_starts(node, limits.max_tokens)
+            if first_line < line <= last_line
+        })
+        boundaries.append(last_line + 1)
+
+        # offsets[i] = estimated characters before line first_line + i
+        offsets = [0]
+        for line in lines[first_line:last_line + 1]:
+            offsets.append(offsets[-1] + len(line) + 1)
+
+        def tokens_between(start: int, end: int) -> int:
+            return (offsets[end - first_line] - offsets[start - first_line]) // CHARS_PER_TOKEN
+
+        ranges = []
+        start = first_line
+        index = 0
+        while start <= last_line:
+            # Take as many statements as fit, but always at least one
+            end = boundaries[index]
+            index += 1
+            while index < len(boundaries) and tokens_between(start, boundaries[index]) <= limits.max_tokens:
+                end = boundaries[index]
+                index += 1
+            ranges.append((start, end))
+            if end > last_line:
+                break
+
+            # Overlap: back up over trailing lines of this part
+            start = end
+            while start - 1 > ranges[-1][0] and tokens_between(start - 1, end) <= limits.overlap_tokens:
+                start -= 1
+
+        if len(ranges) == 1:
+            return [chunk]
+
+        parts = []
+        for number, (start, end) in enumerate(ranges, 1):
+            metadata = dict(chunk.metadata)
+            metadata['part'] = number
+            metadata['part_count'] = len(ranges)
+            parts.append(TreeSitterChunk(
+                content='\n'.join(lines[start:end]),
+                start_line=start + 1,
+                end_line=end,
+                node_type=chunk.node_type,
+                language=chunk.language,
+                metadata=metadata
+            ))
+        return parts
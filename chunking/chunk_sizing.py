@@ -0,0 +1,54 @@
+"""Token-based size targets for splitting and merging chunks."""
+
+from dataclasses import dataclass
+
+# Rough characters per token for source code with subword tokenizers
+CHARS_PER_TOKEN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of code.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class ChunkSizeLimits:
+    """Token targets for chunk splitting and merging.
+
+    Chunks above max_tokens are split at statement boundaries with
+    overlap_tokens of overlap; consecutive sibling chunks below min_tokens
+    are packed together up to merge_tokens.
+    """
+
+    max_tokens: int
+    min_tokens: int
+    merge_tokens: int
+    overlap_tokens: int
+
+    @classmethod
+    def from_max_seq_length(cls, max_seq_length: int) -> 'ChunkSizeLimits':
+        """Derive limits from an embedding model's maximum sequence length.
+
+        Leaves headroom for the prompt and the docstring prefix added by
+        CodeEmbedder.create_embedding_content.
+
+        Args:
+            max_seq_length: Maximum number of tokens the model embeds
+
+        Returns:
+            ChunkSizeLimits for the model
+        """
+        max_tokens = max(16, int(max_seq_length * 0.9))
+        return cls(
+            max_tokens=max_tokens,
+            min_tokens=max(4, max_seq_length // 64),
+            merge_tokens=max_tokens // 4,
+            overlap_tokens=max_tokens // 10
+        )
@@ -1,6 +1,6 @@
 """Markdown-specific tree-sitter based chunker."""
 
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 
 from chunking.base_chunker import LanguageChunker, TreeSitterChunk
 
@@ -55,17 +55,18 @@ class MarkdownChunker(LanguageChunker):
 
         return metadata
 
-    def chunk_code(self, source_code: str) -> List[TreeSitterChunk]:
+    def chunk_code(self, source_code: str, cache_key: Optional[str] = None) -> List[TreeSitterChunk]:
         """Chunk markdown into sections based on headers.
 
         Args:
             source_code: Markdown source code string
+            cache_key: Optional key for incremental reparsing (usually the file path)
 
         Returns:
             List of TreeSitterChunk objects
         """
         source_bytes = bytes(source_code, 'utf-8')
-        tree = self.parser.parse(source_bytes)
+        tree = self.parse(source_bytes, cache_key)
         chunks = []
 
         # Find all heading nodes
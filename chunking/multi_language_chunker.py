@@ -1,12 +1,16 @@
 """Multi-language chunker that combines AST and tree-sitter approaches."""
 
 import logging
+import os
 from pathlib import Path
 from typing import List, Optional
 
+from chunking.chunk_sizing import ChunkSizeLimits
 from chunking.code_chunk import CodeChunk
+from chunking.parse_cache import ParseTreeCache
 from chunking.tree_sitter import TreeSitterChunker, TreeSitterChunk
 from chunking.languages import LANGUAGE_MAP
+from merkle.ignore_matcher import DEFAULT_IGNORE_PATTERNS, IgnoreMatcher, walk_files
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +20,48 @@ class MultiLanguageChunker:
     # Supported extensions - derived from LANGUAGE_MAP
     SUPPORTED_EXTENSIONS = set(LANGUAGE_MAP.keys())
     
-    # Common large/build/tooling directories to skip during traversal
-    DEFAULT_IGNORED_DIRS = {
-        '__pycache__', '.git', '.hg', '.svn',
-        '.venv', 'venv', 'env', '.env', '.direnv',
-        'node_modules', '.pnpm-store', '.yarn',
-        '.pytest_cache', '.mypy_cache', '.ruff_cache', '.pytype', '.ipynb_checkpoints',
-        'build', 'dist', 'out', 'public',
-        '.next', '.nuxt', '.svelte-kit', '.angular', '.astro', '.vite',
-        '.cache', '.parcel-cache', '.turbo',
-        'coverage', '.coverage', '.nyc_output',
-        '.gradle', '.idea', '.vscode', '.docusaurus', '.vercel', '.serverless', '.terraform', '.mvn', '.tox',
-        'target', 'bin', 'obj'
-    }
+    # Common large/build/tooling paths to skip during traversal (shared with MerkleDAG)
+    DEFAULT_IGNORED_DIRS = set(DEFAULT_IGNORE_PATTERNS)
     
-    def __init__(self, root_path: Optional[str] = None):
+    # Larger files are usually generated or minified and are not worth chunking
+    MAX_FILE_SIZE = 1024 * 1024
+    
+    def __init__(
+        self,
+        root_path: Optional[str] = None,
+        max_file_size: Optional[int] = None,
+        tree_cache: Optional[ParseTreeCache] = None,
+        size_limits: Optional[ChunkSizeLimits] = None
+    ):
         """Initialize multi-language chunker.
         
         Args:
             root_path: Optional root path for relative path calculation
+            max_file_size: Maximum file size in bytes to chunk (default: MAX_FILE_SIZE)
+            tree_cache: Optional parse-tree cache, shared across chunkers to reparse
+                edited files incrementally
+            size_limits: Optional token targets for splitting large and merging
+                small chunks (see set_size_limits)
         """
         self.root_path = root_path
+        self.max_file_size = max_file_size if max_file_size is not None else self.MAX_FILE_SIZE
         # Use AST chunker for Python (more mature implementation)
         # Use tree-sitter for other languages
-        self.tree_sitter_chunker = TreeSitterChunker()
+        self.tree_sitter_chunker = TreeSitterChunker(tree_cache, size_limits)
+    
+    @property
+    def size_limits(self) -> Optional[ChunkSizeLimits]:
+        """Token targets for splitting and merging chunks, if any."""
+        return self.tree_sitter_chunker.size_limits
+    
+    def set_size_limits(self, size_limits: Optional[ChunkSizeLimits]) -> None:
+        """Set token targets for splitting and merging chunks.
+        
+        Args:
+            size_limits: Token targets, usually ChunkSizeLimits.from_max_seq_length
+                of the embedding model, or None to keep one chunk per node
+        """
+        self.tree_sitter_chunker.set_size_limits(size_limits)
     
     def is_supported(self, file_path: str) -> bool:
         """Check if file type is supported.
@@ -53,6 +75,21 @@ class MultiLanguageChunker:
         suffix = Path(file_path).suffix.lower()
         return suffix in self.SUPPORTED_EXTENSIONS
     
+    def is_indexable(self, file_path: str, size: int) -> bool:
+        """Check if a file would be chunked, given its size.
+        
+        Used by the Merkle DAG builder to decide which files need a content
+        hash; everything else is tracked by stat metadata only.
+        
+        Args:
+            file_path: Path to file
+            size: File size in bytes
+            
+        Returns:
+            True if the file type is supported and the file is not too large
+        """
+        return size <= self.max_file_size and self.is_supported(file_path)
+    
     def chunk_file(self, file_path: str) -> List[CodeChunk]:
         """Chunk a file into semantic units.
         
@@ -65,6 +102,13 @@ class MultiLanguageChunker:
         if not self.is_supported(file_path):
             logger.debug(f"File type not supported: {file_path}")
             return []
+        
+        try:
+            if os.path.getsize(file_path) > self.max_file_size:
+                logger.debug(f"Skipping file larger than {self.max_file_size} bytes: {file_path}")
+                return []
+        except OSError:
+            pass
 
         # Use tree-sitter for all  languages 
         try:
@@ -168,6 +212,10 @@ class MultiLanguageChunker:
                 tags.append('generic')
             if tchunk.metadata.get('is_component'):
                 tags.append('component')
+            if tchunk.metadata.get('part'):
+                tags.append('partial')
+            if tchunk.metadata.get('merged_count'):
+                tags.append('merged')
             
             # Add language tag
             tags.append(tchunk.language)
@@ -217,19 +265,19 @@ class MultiLanguageChunker:
         else:
             valid_extensions = self.SUPPORTED_EXTENSIONS
         
-        # Find all files with supported extensions
-        for ext in valid_extensions:
-            for file_path in dir_path.rglob(f'*{ext}'):
-                # Skip common large/build/tooling directories
-                if any(part in self.DEFAULT_IGNORED_DIRS for part in file_path.parts):
-                    continue
-                
-                try:
-                    chunks = self.chunk_file(str(file_path))
-                    all_chunks.extend(chunks)
-                    logger.debug(f"Chunked {len(chunks)} from {file_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to chunk {file_path}: {e}")
+        # Single gitignore-aware pass over the tree, pruning ignored directories
+        matcher = IgnoreMatcher(str(dir_path), self.DEFAULT_IGNORED_DIRS)
+        for _, entry in walk_files(str(dir_path), matcher):
+            if os.path.splitext(entry.name)[1].lower() not in valid_extensions:
+                continue
+            
+            file_path = entry.path
+            try:
+                chunks = self.chunk_file(file_path)
+                all_chunks.extend(chunks)
+                logger.debug(f"Chunked {len(chunks)} from {file_path}")
+            except Exception as e:
+                logger.warning(f"Failed to chunk {file_path}: {e}")
         
         logger.info(f"Total chunks from directory: {len(all_chunks)}")
         return all_chunks
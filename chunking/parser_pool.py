@@ -0,0 +1,118 @@
+"""Process-wide pool of tree-sitter parsers shared by all chunkers."""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from tree_sitter import Parser
+
+from chunking.available_languages import get_language
+
+
+class ParserPool:
+    """Thread-safe pool of idle parsers per language.
+
+    A tree-sitter Parser must not be used by two threads at once, so each
+    parse checks a parser out of the pool and returns it afterwards. Parsers
+    are created on demand, so the pool grows to the number of threads that
+    parse the same language concurrently and no further.
+    """
+
+    def __init__(self, max_idle_per_language: int = 8):
+        """Initialize the pool.
+
+        Args:
+            max_idle_per_language: Maximum number of idle parsers kept per language
+        """
+        self.max_idle_per_language = max_idle_per_language
+        self._idle: Dict[str, List[Parser]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def acquire(self, language_name: str) -> Parser:
+        """Check out a parser for a language.
+
+        Args:
+            language_name: Language name
+
+        Returns:
+            Parser owned by the caller until release()
+
+        Raises:
+            ValueError: If the language is not available
+        """
+        with self._lock:
+            idle = self._idle.get(language_name)
+            if idle:
+                return idle.pop()
+
+        language = get_language(language_name)
+        if language is None:
+            raise ValueError(f"Language {language_name} not available. Install tree-sitter-{language_name}")
+
+        parser = Parser(language)
+        with self._lock:
+            self.created += 1
+        return parser
+
+    def release(self, language_name: str, parser: Parser) -> None:
+        """Return a parser to the pool.
+
+        Args:
+            language_name: Language the parser was acquired for
+            parser: Parser from acquire()
+        """
+        # Drop any cancellation or range state set by the caller
+        parser.reset()
+        with self._lock:
+            idle = self._idle.setdefault(language_name, [])
+            if len(idle) < self.max_idle_per_language:
+                idle.append(parser)
+
+    @contextmanager
+    def parser(self, language_name: str) -> Iterator[Parser]:
+        """Borrow a parser for the duration of a with block.
+
+        Args:
+            language_name: Language name
+
+        Yields:
+            Parser for the language
+        """
+        parser = self.acquire(language_name)
+        try:
+            yield parser
+        finally:
+            self.release(language_name, parser)
+
+    def idle_count(self, language_name: str) -> int:
+        """Get the number of idle parsers for a language."""
+        with self._lock:
+            return len(self._idle.get(language_name, []))
+
+    def clear(self) -> None:
+        """Drop all idle parsers."""
+        with self._lock:
+            self._idle.clear()
+
+    def _reset_after_fork(self) -> None:
+        """Give a forked child its own lock and an empty pool."""
+        self._lock = threading.Lock()
+        self._idle = {}
+
+
+_pool = ParserPool()
+
+if hasattr(os, 'register_at_fork'):
+    # A lock held by another thread at fork time would never be released in the child
+    os.register_at_fork(after_in_child=_pool._reset_after_fork)
+
+
+def get_parser_pool() -> ParserPool:
+    """Get the process-wide parser pool.
+
+    Returns:
+        Shared ParserPool
+    """
+    return _pool
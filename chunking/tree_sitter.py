@@ -5,16 +5,39 @@ from pathlib import Path
 from typing import List, Optional
 
 from chunking.base_chunker import TreeSitterChunk, AVAILABLE_LANGUAGES
+from chunking.chunk_sizing import ChunkSizeLimits
 from chunking.languages import LANGUAGE_MAP
+from chunking.parse_cache import ParseTreeCache
 
 logger = logging.getLogger(__name__)
 
 class TreeSitterChunker:
     """Main tree-sitter chunker that delegates to language-specific implementations."""
 
-    def __init__(self):
-        """Initialize the tree-sitter chunker."""
+    def __init__(
+        self,
+        tree_cache: Optional[ParseTreeCache] = None,
+        size_limits: Optional[ChunkSizeLimits] = None
+    ):
+        """Initialize the tree-sitter chunker.
+
+        Args:
+            tree_cache: Optional parse-tree cache for incremental reparsing of files
+            size_limits: Optional token targets for splitting and merging chunks
+        """
         self.chunkers = {}
+        self.tree_cache = tree_cache
+        self.size_limits = size_limits
+
+    def set_size_limits(self, size_limits: Optional[ChunkSizeLimits]) -> None:
+        """Set token targets for splitting and merging chunks.
+
+        Args:
+            size_limits: Token targets, or None to keep one chunk per node
+        """
+        self.size_limits = size_limits
+        for chunker in self.chunkers.values():
+            chunker.size_limits = size_limits
 
     def get_chunker(self, file_path: str):
         """Get the appropriate chunker for a file.
@@ -41,6 +64,8 @@ class TreeSitterChunker:
         if suffix not in self.chunkers:
             assert callable(chunker_class), f"Chunker should be callable, got {type(chunker_class)}"
             self.chunkers[suffix] = chunker_class()
+            self.chunkers[suffix].tree_cache = self.tree_cache
+            self.chunkers[suffix].size_limits = self.size_limits
 
         return self.chunkers[suffix]
 
@@ -69,7 +94,7 @@ class TreeSitterChunker:
                 return []
 
         try:
-            return chunker.chunk_code(content)
+            return chunker.chunk_code(content, cache_key=str(Path(file_path).resolve()))
         except Exception as e:
             logger.warning(f"Tree-sitter parsing failed for {file_path}: {e}")
             return []
@@ -38,7 +38,14 @@ except ImportError:
 
 def pytest_collection_modifyitems(config, items):
     """Automatically mark tests based on their location."""
+    # Wall-clock budgets depend on the machine, so they only run when selected
+    run_benchmarks = 'benchmark' in (config.getoption('markexpr') or '')
+    skip_benchmark = pytest.mark.skip(reason="wall-clock benchmark; run with -m benchmark")
+
     for item in items:
+        if 'benchmark' in item.keywords and not run_benchmarks:
+            item.add_marker(skip_benchmark)
+
         # Mark tests based on file path and location
         path_str = str(item.fspath)
 
@@ -70,6 +77,11 @@ class EmbeddingModelMock:
         self.model_name = "google/embeddinggemma-300m"
         self.rng = np.random.RandomState(42)  # Deterministic seed for reproducible tests
 
+    @property
+    def model(self):
+        """Return the mock itself as the loaded model."""
+        return self
+
     def encode(self, texts, **kwargs):
         """Return mock embeddings."""
         # Return 768-dimensional embeddings (matching EmbeddingGemma)
@@ -80,6 +92,10 @@ class EmbeddingModelMock:
         """Return embedding dimension."""
         return 768
 
+    def get_max_seq_length(self):
+        """Return maximum sequence length."""
+        return 512
+
     def get_model_info(self):
         """Return mock model info."""
         return {
@@ -108,6 +124,7 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "embeddings: Embedding generation tests")
     config.addinivalue_line("markers", "chunking: Code chunking tests")
     config.addinivalue_line("markers", "search: Search functionality tests")
+    config.addinivalue_line("markers", "benchmark: Wall-clock budget tests, skipped unless run with -m benchmark")
 
     # Patch AVAILABLE_MODELS with mock for integration tests
     try:
@@ -1,7 +1,8 @@
 """Code embedding wrapper using EmbeddingGemma model."""
 
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from dataclasses import dataclass
 import numpy as np
 
@@ -16,6 +17,30 @@ class EmbeddingResult:
     embedding: np.ndarray
     chunk_id: str
     metadata: Dict[str, Any]
+    # Full chunk source for the lexical index; not stored with the metadata
+    content: Optional[str] = None
+
+
+def embedding_input_hash(text: str) -> str:
+    """Hash the exact text a chunk is embedded from.
+
+    Chunks with equal hashes get equal embeddings, so they can share one.
+
+    Args:
+        text: Embedding input
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def make_chunk_id(chunk: CodeChunk) -> str:
+    """Build the id a chunk is stored under, from its path, lines, type and name."""
+    chunk_id = f"{chunk.relative_path}:{chunk.start_line}-{chunk.end_line}:{chunk.chunk_type}"
+    if chunk.name:
+        chunk_id += f":{chunk.name}"
+    return chunk_id
 
 
 class CodeEmbedder:
@@ -50,6 +75,11 @@ class CodeEmbedder:
         """Get the underlying embedding model."""
         return self._model.model
 
+    @property
+    def max_seq_length(self) -> Optional[int]:
+        """Maximum number of tokens the model embeds per text (loads the model)."""
+        return self._model.get_max_seq_length()
+
     def create_embedding_content(self, chunk: CodeChunk, max_chars: int = 6000) -> str:
         """Create clean content for embedding generation.
 
@@ -124,10 +154,11 @@ class CodeEmbedder:
             show_progress_bar=False
         )[0]
 
-        # Create chunk ID
-        chunk_id = f"{chunk.relative_path}:{chunk.start_line}-{chunk.end_line}:{chunk.chunk_type}"
-        if chunk.name:
-            chunk_id += f":{chunk.name}"
+        return self._create_result(chunk, embedding, embedding_input_hash(content))
+
+    def _create_result(self, chunk: CodeChunk, embedding: np.ndarray, embedding_hash: str) -> EmbeddingResult:
+        """Build the result of an embedded chunk with its id and metadata."""
+        chunk_id = make_chunk_id(chunk)
 
         # Prepare metadata
         metadata = {
@@ -144,75 +175,83 @@ class CodeEmbedder:
             'imports': chunk.imports,
             'complexity_score': chunk.complexity_score,
             'tags': chunk.tags,
-            'content_preview': chunk.content[:200] + "..." if len(chunk.content) > 200 else chunk.content
+            'content_preview': chunk.content[:200] + "..." if len(chunk.content) > 200 else chunk.content,
+            'embedding_hash': embedding_hash
         }
 
         return EmbeddingResult(
             embedding=embedding,
             chunk_id=chunk_id,
-            metadata=metadata
+            metadata=metadata,
+            content=chunk.content
         )
 
-    def embed_chunks(self, chunks: List[CodeChunk], batch_size: int = 32) -> List[EmbeddingResult]:
+    def embed_chunks(
+        self,
+        chunks: List[CodeChunk],
+        batch_size: int = 32,
+        reuse: Optional[Callable[[str], Optional[np.ndarray]]] = None
+    ) -> List[EmbeddingResult]:
         """Generate embeddings for multiple chunks with batching.
 
+        Chunks with identical embedding inputs (vendored copies, generated
+        code, copy-pasted helpers) are encoded once and share the embedding.
+        Encoded embeddings are rows of one preallocated, contiguous float32
+        matrix, which CodeIndexManager.add_embeddings uses without copying.
+
         Args:
             chunks: List of code chunks to embed
             batch_size: Batch size for processing
+            reuse: Optional lookup of an existing embedding by embedding input
+                hash (e.g. CodeIndexManager.get_vector); inputs it knows are
+                not encoded again
 
         Returns:
-            List of EmbeddingResults
+            List of EmbeddingResults, one per chunk in order
         """
-        results = []
-
-        self._logger.info(f"Generating embeddings for {len(chunks)} chunks")
+        contents = [self.create_embedding_content(chunk) for chunk in chunks]
+        hashes = [embedding_input_hash(content) for content in contents]
+        unique = dict(zip(hashes, contents))
+
+        embeddings: Dict[str, np.ndarray] = {}
+        if reuse is not None:
+            for embedding_hash in unique:
+                embedding = reuse(embedding_hash)
+                if embedding is not None:
+                    embeddings[embedding_hash] = embedding
+        pending = [(h, content) for h, content in unique.items() if h not in embeddings]
+
+        self._logger.info(
+            f"Generating embeddings for {len(chunks)} chunks "
+            f"({len(pending)} to encode, {len(unique) - len(pending)} reused, "
+            f"{len(chunks) - len(unique)} duplicates)"
+        )
 
         # Process in batches
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            batch_contents = [self.create_embedding_content(chunk) for chunk in batch]
+        matrix = None
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
 
             # Generate embeddings for batch
             batch_embeddings = self._model.encode(
-                batch_contents,
+                [content for _, content in batch],
                 prompt_name="Retrieval-document",
                 show_progress_bar=False
             )
+            if matrix is None:
+                matrix = np.empty((len(pending), np.shape(batch_embeddings)[1]), dtype=np.float32)
+            matrix[i:i + len(batch)] = batch_embeddings
+            for row, (embedding_hash, _) in enumerate(batch, start=i):
+                embeddings[embedding_hash] = matrix[row]
 
-            # Create results
-            for chunk, embedding in zip(batch, batch_embeddings):
-                chunk_id = f"{chunk.relative_path}:{chunk.start_line}-{chunk.end_line}:{chunk.chunk_type}"
-                if chunk.name:
-                    chunk_id += f":{chunk.name}"
-
-                metadata = {
-                    'file_path': chunk.file_path,
-                    'relative_path': chunk.relative_path,
-                    'folder_structure': chunk.folder_structure,
-                    'chunk_type': chunk.chunk_type,
-                    'start_line': chunk.start_line,
-                    'end_line': chunk.end_line,
-                    'name': chunk.name,
-                    'parent_name': chunk.parent_name,
-                    'docstring': chunk.docstring,
-                    'decorators': chunk.decorators,
-                    'imports': chunk.imports,
-                    'complexity_score': chunk.complexity_score,
-                    'tags': chunk.tags,
-                    'content_preview': chunk.content[:200] + "..." if len(chunk.content) > 200 else chunk.content
-                }
-
-                results.append(EmbeddingResult(
-                    embedding=embedding,
-                    chunk_id=chunk_id,
-                    metadata=metadata
-                ))
-
-            if i + batch_size < len(chunks):
-                self._logger.info(f"Processed {i + batch_size}/{len(chunks)} chunks")
+            if i + batch_size < len(pending):
+                self._logger.info(f"Processed {i + batch_size}/{len(pending)} unique chunks")
 
         self._logger.info("Embedding generation completed")
-        return results
+        return [
+            self._create_result(chunk, embeddings[embedding_hash], embedding_hash)
+            for chunk, embedding_hash in zip(chunks, hashes)
+        ]
 
     def embed_query(self, query: str) -> np.ndarray:
         """Generate embedding for a search query.
@@ -230,6 +269,21 @@ class CodeEmbedder:
         )[0]
         return embedding
 
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Generate embeddings for several search queries in one model batch.
+
+        Args:
+            queries: Search query texts
+
+        Returns:
+            Array of embeddings, one row per query
+        """
+        return np.asarray(self._model.encode(
+            queries,
+            prompt_name="InstructionRetrieval",
+            show_progress_bar=False
+        ))
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the embedding model.
 
@@ -1,17 +1,22 @@
 """Abstract base class for embedding models."""
 
 from abc import ABC, abstractmethod
+from functools import cached_property
 from typing import List, Dict, Any, Optional
 import numpy as np
-import torch
 
 
 class EmbeddingModel(ABC):
     """Abstract base class for embedding models."""
 
     def __init__(self, device: str):
-        """Initialize with device resolution."""
-        self._device = self._resolve_device(device)
+        """Initialize with the requested device, resolved on first use."""
+        self._requested_device = device
+
+    @cached_property
+    def _device(self) -> str:
+        """Resolved device (resolving imports torch, so it waits for model load)."""
+        return self._resolve_device(self._requested_device)
 
     @abstractmethod
     def encode(self, texts: List[str], **kwargs) -> np.ndarray:
@@ -31,6 +36,10 @@ class EmbeddingModel(ABC):
         """Get the dimension of embeddings produced by this model."""
         pass
 
+    def get_max_seq_length(self) -> Optional[int]:
+        """Get the maximum number of tokens embedded per text, if known."""
+        return None
+
     @abstractmethod
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the model."""
@@ -50,6 +59,8 @@ class EmbeddingModel(ABC):
 
     def _resolve_device(self, requested: Optional[str]) -> str:
         """Resolve device string."""
+        import torch
+
         req = (requested or "auto").lower()
         if req in ("auto", "none", ""):
             if torch.cuda.is_available():
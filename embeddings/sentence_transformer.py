@@ -6,8 +6,6 @@ from functools import cached_property
 import os
 import logging
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import torch
 
 from embeddings.embedding_model import EmbeddingModel
 
@@ -37,6 +35,9 @@ class SentenceTransformerModel(EmbeddingModel):
     @cached_property
     def model(self):
         """Load and cache the SentenceTransformer model."""
+        # Imported here so that importing the model registry stays cheap
+        from sentence_transformers import SentenceTransformer
+
         self._logger.info(f"Loading model: {self.model_name}")
 
         # If the model appears to be cached locally, enable offline mode
@@ -82,6 +83,10 @@ class SentenceTransformerModel(EmbeddingModel):
         """Get embedding dimension."""
         return self.model.get_sentence_embedding_dimension()
 
+    def get_max_seq_length(self) -> Optional[int]:
+        """Get the maximum sequence length of the loaded model."""
+        return getattr(self.model, 'max_seq_length', None)
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information."""
         if not self._model_loaded:
@@ -101,6 +106,8 @@ class SentenceTransformerModel(EmbeddingModel):
             return
 
         try:
+            import torch
+
             model = self.model
             model.to('cpu')
 
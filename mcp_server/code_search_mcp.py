@@ -3,10 +3,12 @@
 import json
 import logging
 from pathlib import Path
+from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 import yaml
 from mcp_server.code_search_server import CodeSearchServer
+from mcp_server.tool_executor import ToolExecutor
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -15,10 +17,16 @@ logger = logging.getLogger(__name__)
 class CodeSearchMCP(FastMCP if FastMCP else object):
     """MCP server that manages FastMCP instance and tool registration."""
 
-    def __init__(self, server: "CodeSearchServer"):
-        """Initialize the MCP server with a code search server instance."""
+    def __init__(self, server: "CodeSearchServer", executor: Optional[ToolExecutor] = None):
+        """Initialize the MCP server with a code search server instance.
+
+        Args:
+            server: Code search server implementing the tools
+            executor: Executor running tool calls (default: ToolExecutor())
+        """
         super().__init__("Code Search")
         self.server = server
+        self.executor = executor or ToolExecutor()
         self._strings = self._load_strings()
         self._setup()
 
@@ -36,10 +44,10 @@ class CodeSearchMCP(FastMCP if FastMCP else object):
     def _setup(self):
         """Setup all MCP tools, resources, and prompts."""
 
-        # Register tools using getattr
+        # Register async variants of the tools, run on the executor's thread pool
         for tool_name, description in self._strings["tools"].items():
             server_method = getattr(self.server, tool_name)
-            self.tool(description=description)(server_method)
+            self.tool(description=description)(self.executor.wrap(tool_name, server_method))
 
         # Register resources
         @self.resource("search://stats")
@@ -66,4 +74,7 @@ class CodeSearchMCP(FastMCP if FastMCP else object):
         if transport in ["sse", "streamable-http"]:
             logger.info(f"Starting HTTP server on {host}:{port}")
         # FastMCP not support host and port
-        return super().run(transport=transport)
+        try:
+            return super().run(transport=transport)
+        finally:
+            self.executor.shutdown()
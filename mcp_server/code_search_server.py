@@ -3,21 +3,31 @@
 import os
 import sys
 import json
-import asyncio
 import logging
+import functools
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from datetime import datetime
-from functools import lru_cache
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from common_utils import get_storage_dir
-from chunking.multi_language_chunker import MultiLanguageChunker
-from embeddings.embedder import CodeEmbedder
-from search.indexer import CodeIndexManager
-from search.searcher import IntelligentSearcher
+from chunking.parse_cache import ParseTreeCache
+from mcp_server.tool_executor import current_cancel_event
+from search.result_cache import SearchResultCache
+
+# Embedding, FAISS and search modules are imported where they are first used,
+# so the MCP handshake and status tools do not wait for them to load
+if TYPE_CHECKING:
+    from embeddings.embedder import CodeEmbedder
+    from search.federated import FederatedSearcher
+    from search.index_pool import IndexPool, PooledIndex
+    from search.indexer import CodeIndexManager
+    from search.reranker import Reranker
+    from search.searcher import IntelligentSearcher, SearchResult
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -26,12 +36,60 @@ logger = logging.getLogger(__name__)
 class CodeSearchServer:
     """Server that manages code search state and implements business logic."""
 
-    def __init__(self):
-        """Initialize the code search server."""
+    def __init__(
+        self,
+        max_projects: int = 64,
+        index_memory_budget: int = 2 * 1024 ** 3,
+        idle_timeout: Optional[float] = 30 * 60,
+        federated_timeout: float = 2.0,
+        reranker: Optional["Reranker"] = None,
+        result_cache_entries: int = 256,
+        vector_dtype: str = "float32",
+        model_load_timeout: Optional[float] = 300.0
+    ):
+        """Initialize the code search server.
+
+        Args:
+            max_projects: Maximum number of project indexes kept loaded
+            index_memory_budget: Maximum estimated bytes of loaded project indexes
+            idle_timeout: Seconds after which an unused project index is unloaded
+            federated_timeout: Seconds a federated search waits for each project
+            reranker: Optional second stage re-scoring the top candidates of every search
+            result_cache_entries: Maximum number of cached search_code responses (0 to disable)
+            vector_dtype: Element type of newly built project indexes, "float32" or "float16"
+            model_load_timeout: Seconds a tool waits for the embedding model to load
+                (None to wait until it is loaded)
+        """
         # State management
-        self._index_manager: Optional[CodeIndexManager] = None
-        self._searcher: Optional[IntelligentSearcher] = None
         self._current_project: Optional[str] = None
+        # Loaded project indexes, created on first use (see _get_index_pool)
+        self._index_pool: Optional["IndexPool"] = None
+        self._index_pool_config = dict(
+            max_projects=max_projects,
+            memory_budget=index_memory_budget,
+            idle_timeout=idle_timeout
+        )
+        self.federated_timeout = federated_timeout
+        self._federated_searcher: Optional["FederatedSearcher"] = None
+        self.reranker = reranker
+        self.vector_dtype = vector_dtype
+        # Responses of repeated searches, valid while their index is unchanged
+        self._result_cache = SearchResultCache(max_entries=result_cache_entries)
+        # Parse trees of recently chunked files, reused when they are reindexed
+        self._tree_cache = ParseTreeCache()
+        self._embedder: Optional["CodeEmbedder"] = None
+        self._embedder_lock = threading.Lock()
+        # Resolves to the embedder once the model is loaded (see start_model_preload)
+        self._model_ready: Optional[Future] = None
+        self.model_load_timeout = model_load_timeout
+        # One indexing run per project at a time
+        self._indexing_locks: Dict[str, threading.Lock] = {}
+
+    def _indexing_lock(self, project_path: str) -> threading.Lock:
+        """Get the lock serializing indexing runs of a project."""
+        key = str(Path(project_path).resolve())
+        with self._embedder_lock:
+            return self._indexing_locks.setdefault(key, threading.Lock())
 
     def get_project_storage_dir(self, project_path: str) -> Path:
         """Get or create project-specific storage directory."""
@@ -80,77 +138,151 @@ class CodeSearchServer:
             logger.warning(f"Failed to check/auto-index project {project_path}: {e}")
             return False
 
-    @lru_cache(maxsize=1)
-    def embedder(self) -> CodeEmbedder:
+    def embedder(self) -> "CodeEmbedder":
         """Lazy initialization of embedder."""
-        cache_dir = get_storage_dir() / "models"
-        cache_dir.mkdir(exist_ok=True)
-        embedder = CodeEmbedder(cache_dir=str(cache_dir))
-        logger.info("Embedder initialized")
-        return embedder
-
-    @lru_cache(maxsize=1)
-    def _maybe_start_model_preload(self) -> None:
-        """Preload the embedding model in the background."""
-        async def _preload():
+        from embeddings.embedder import CodeEmbedder
+
+        with self._embedder_lock:
+            if self._embedder is None:
+                cache_dir = get_storage_dir() / "models"
+                cache_dir.mkdir(exist_ok=True)
+                self._embedder = CodeEmbedder(cache_dir=str(cache_dir))
+                logger.info("Embedder initialized")
+            return self._embedder
+
+    def start_model_preload(self) -> Future:
+        """Start loading the embedding model in a background thread.
+
+        Safe to call repeatedly; the load runs once. A failed load is retried
+        on the next call.
+
+        Returns:
+            Future resolving to the embedder once its model is loaded
+        """
+        with self._embedder_lock:
+            if self._model_ready is not None and not (
+                self._model_ready.done() and self._model_ready.exception() is not None
+            ):
+                return self._model_ready
+
+            future: Future = Future()
+            self._model_ready = future
+
+        def _preload():
             try:
                 logger.info("Starting background model preload")
-                _ = self.embedder().model
+                embedder = self.embedder()
+                _ = embedder.model
                 logger.info("Background model preload completed")
+                future.set_result(embedder)
             except Exception as e:
                 logger.warning(f"Background model preload failed: {e}")
+                future.set_exception(e)
 
-        try:
-            # Try to get the current event loop, handling the case where none exists
-            try:
-                loop = asyncio.get_running_loop()
-                # If we're already in an event loop, create a task
-                loop.create_task(_preload())
-            except RuntimeError:
-                # No running loop, so create one and run the coroutine
-                asyncio.run(_preload())
-        except Exception as e:
-            logger.debug(f"Model preload scheduling skipped: {e}")
-        return None
+        threading.Thread(target=_preload, name="model-preload", daemon=True).start()
+        return future
 
-    def get_index_manager(self, project_path: str = None) -> CodeIndexManager:
-        """Get index manager for specific or current project."""
-        if project_path is None:
-            if self._current_project is None:
-                project_path = os.getcwd()
-                logger.info(f"No active project. Using cwd: {project_path}")
-                self.ensure_project_indexed(project_path)
-            else:
-                project_path = self._current_project
+    @property
+    def model_ready(self) -> Future:
+        """Readiness future of the embedding model (starts the preload if needed).
 
-        if self._current_project != project_path:
-            self._index_manager = None
-            self._current_project = project_path
+        Async callers can await asyncio.wrap_future(server.model_ready).
+        """
+        return self.start_model_preload()
 
-        if self._index_manager is None:
-            project_dir = self.get_project_storage_dir(project_path)
-            index_dir = project_dir / "index"
-            index_dir.mkdir(exist_ok=True)
-            self._index_manager = CodeIndexManager(str(index_dir))
-            logger.info(f"Index manager initialized for: {Path(project_path).name}")
+    def wait_for_model(self, timeout: Optional[float] = None) -> "CodeEmbedder":
+        """Block until the embedding model is loaded.
+
+        A load that is still running when the wait times out keeps running in
+        the background, so a later call can succeed.
 
-        return self._index_manager
+        Args:
+            timeout: Maximum seconds to wait (default: model_load_timeout)
 
-    def get_searcher(self, project_path: str = None) -> IntelligentSearcher:
-        """Get searcher for specific or current project."""
-        if project_path is None and self._current_project is None:
+        Returns:
+            Embedder with its model loaded
+
+        Raises:
+            RuntimeError: If the model is not loaded in time or its load failed
+        """
+        if timeout is None:
+            timeout = self.model_load_timeout
+        try:
+            return self.model_ready.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise RuntimeError(
+                f"Embedding model is still loading after {timeout:g} s; try again shortly"
+            ) from None
+        except Exception as e:
+            raise RuntimeError(f"Embedding model failed to load: {e}") from e
+
+    def get_model_status(self) -> str:
+        """Get the state of the background model preload.
+
+        Returns:
+            One of "not_started", "loading", "ready" or "failed"
+        """
+        future = self._model_ready
+        if future is None:
+            return "not_started"
+        if not future.done():
+            return "loading"
+        return "failed" if future.exception() is not None else "ready"
+
+    def _get_index_pool(self) -> "IndexPool":
+        """Get the pool of loaded project indexes."""
+        from search.index_pool import IndexPool
+
+        with self._embedder_lock:
+            if self._index_pool is None:
+                self._index_pool = IndexPool(self._load_index_manager, **self._index_pool_config)
+            return self._index_pool
+
+    def _load_index_manager(self, project_path: str) -> "CodeIndexManager":
+        """Create the index manager of a project."""
+        from search.indexer import CodeIndexManager
+
+        project_dir = self.get_project_storage_dir(project_path)
+        index_dir = project_dir / "index"
+        index_dir.mkdir(exist_ok=True)
+        logger.info(f"Index manager initialized for: {Path(project_path).name}")
+        return CodeIndexManager(str(index_dir), vector_dtype=self.vector_dtype)
+
+    def _resolve_project(self, project_path: Optional[str] = None) -> str:
+        """Resolve an explicit project path, falling back to the current project or cwd."""
+        if project_path is not None:
+            return str(Path(project_path).resolve())
+        if self._current_project is None:
             project_path = os.getcwd()
             logger.info(f"No active project. Using cwd: {project_path}")
             self.ensure_project_indexed(project_path)
+            if self._current_project is None:
+                self._current_project = str(Path(project_path).resolve())
+        return self._current_project
 
-        if self._current_project != project_path or self._searcher is None:
-            self._searcher = IntelligentSearcher(
-                self.get_index_manager(project_path),
-                self.embedder()
-            )
-            logger.info(f"Searcher initialized for: {Path(self._current_project).name if self._current_project else 'unknown'}")
+    def _get_pooled_index(self, project_path: Optional[str] = None) -> "PooledIndex":
+        """Get the pooled index of a project without changing the current project."""
+        return self._get_index_pool().get(self._resolve_project(project_path))
 
-        return self._searcher
+    def get_index_manager(self, project_path: str = None) -> "CodeIndexManager":
+        """Get index manager for specific or current project.
+
+        A given project becomes the current project.
+        """
+        pooled = self._get_pooled_index(project_path)
+        self._current_project = pooled.project_path
+        return pooled.index_manager
+
+    def get_searcher(self, project_path: str = None) -> "IntelligentSearcher":
+        """Get searcher for specific or current project (the current project is unchanged)."""
+        from search.searcher import IntelligentSearcher
+
+        pooled = self._get_pooled_index(project_path)
+        if pooled.searcher is None:
+            pooled.searcher = IntelligentSearcher(pooled.index_manager, self.embedder(), reranker=self.reranker)
+            logger.info(f"Searcher initialized for: {Path(pooled.project_path).name}")
+
+        return pooled.searcher
 
     def search_code(
         self,
@@ -161,98 +293,303 @@ class CodeSearchServer:
         chunk_type: str = None,
         include_context: bool = True,
         auto_reindex: bool = True,
-        max_age_minutes: float = 5
+        max_age_minutes: float = 5,
+        project: str = None,
+        projects: List[str] = None,
+        collapse_duplicates: bool = False
     ) -> str:
         """Implementation of search_code tool."""
         try:
-            logger.info(f"🔍 MCP REQUEST: search_code(query='{query}', k={k}, mode='{search_mode}', file_pattern={file_pattern}, chunk_type={chunk_type})")
+            logger.info(f"🔍 MCP REQUEST: search_code(query='{query}', k={k}, mode='{search_mode}', file_pattern={file_pattern}, chunk_type={chunk_type}, project={project})")
 
-            if auto_reindex and self._current_project:
-                from search.incremental_indexer import IncrementalIndexer
+            filters = {}
+            if file_pattern:
+                filters['file_pattern'] = [file_pattern]
+            if chunk_type:
+                filters['chunk_type'] = chunk_type
 
-                logger.info(f"Checking if index needs refresh (max age: {max_age_minutes} minutes)")
+            if search_mode == "federated" or projects:
+                return self._federated_search(query, k, projects, filters or None, include_context)
 
-                index_manager = self.get_index_manager(self._current_project)
-                embedder = self.embedder()
-                chunker = MultiLanguageChunker(self._current_project)
+            if project is not None and not Path(project).is_dir():
+                return json.dumps({"error": f"Project path does not exist: {project}"})
+            # An explicit project is searched without switching the current project
+            project_path = str(Path(project).resolve()) if project is not None else self._current_project
 
-                incremental_indexer = IncrementalIndexer(
-                    indexer=index_manager,
-                    embedder=embedder,
-                    chunker=chunker
-                )
+            # Queries are embedded, so wait for the preloaded model
+            embedder = self.wait_for_model()
 
-                reindex_result = incremental_indexer.auto_reindex_if_needed(
-                    self._current_project,
-                    max_age_minutes=max_age_minutes
-                )
+            if auto_reindex and project_path:
+                self._auto_reindex(project_path, embedder, max_age_minutes)
 
-                if reindex_result.files_modified > 0 or reindex_result.files_added > 0:
-                    logger.info(f"Auto-reindexed: {reindex_result.files_added} added, {reindex_result.files_modified} modified, took {reindex_result.time_taken:.2f}s")
-                    self._searcher = None  # Reset to force reload
+            searcher = self.get_searcher(project_path)
+            logger.info(f"Searching project: {project_path or self._current_project}")
 
-            searcher = self.get_searcher()
-            logger.info(f"Current project: {self._current_project}")
+            # Read the generation before searching, so a concurrent update invalidates the response
+            index_key = str(searcher.index_manager.storage_dir)
+            generation = searcher.index_manager.generation
+            cache_params = (query, k, search_mode, file_pattern, chunk_type, include_context, collapse_duplicates)
+            cached = self._result_cache.get(index_key, generation, cache_params)
+            if cached is not None:
+                logger.info("Returning cached search response")
+                return cached
 
             index_stats = searcher.index_manager.get_stats()
             logger.info(f"Index contains {index_stats.get('total_chunks', 0)} chunks")
 
-            filters = {}
-            if file_pattern:
-                filters['file_pattern'] = [file_pattern]
-            if chunk_type:
-                filters['chunk_type'] = chunk_type
-
             logger.info(f"Search filters: {filters}")
 
+            from search.indexer import SearchStats
+
             context_depth = 1 if include_context else 0
+            stats = SearchStats()
             logger.info(f"Calling searcher.search with query='{query}', k={k}, mode={search_mode}")
             results = searcher.search(
                 query=query,
                 k=k,
                 search_mode=search_mode,
                 context_depth=context_depth,
-                filters=filters if filters else None
+                filters=filters if filters else None,
+                stats=stats,
+                collapse_duplicates=collapse_duplicates
             )
             logger.info(f"Search returned {len(results)} results")
 
-            def make_snippet(preview: Optional[str]) -> str:
-                if not preview:
-                    return ""
-                for line in preview.split('\n'):
-                    s = line.strip()
-                    if s:
-                        snippet = ' '.join(s.split())
-                        return (snippet[:157] + '...') if len(snippet) > 160 else snippet
-                return ""
-
-            formatted_results = []
-            for result in results:
-                item = {
-                    'file': result.relative_path,
-                    'lines': f"{result.start_line}-{result.end_line}",
-                    'kind': result.chunk_type,
-                    'score': round(result.similarity_score, 2),
-                    'chunk_id': result.chunk_id
-                }
-                if result.name:
-                    item['name'] = result.name
-                snippet = make_snippet(result.content_preview)
-                if snippet:
-                    item['snippet'] = snippet
-                formatted_results.append(item)
+            formatted_results = [self._format_result(result) for result in results]
 
             response = {
                 'query': query,
                 'results': formatted_results
             }
+            # Selective filters needed a wider candidate search
+            if stats.expansions:
+                response['expansions'] = stats.expansions
 
-            return json.dumps(response, separators=(",", ":"))
+            serialized = json.dumps(response, separators=(",", ":"))
+            self._result_cache.put(index_key, generation, cache_params, serialized)
+            return serialized
         except Exception as e:
             error_msg = f"Search failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return json.dumps({"error": error_msg})
 
+    def _auto_reindex(self, project_path: str, embedder: "CodeEmbedder", max_age_minutes: float) -> None:
+        """Refresh a project's index before searching if it is older than max_age_minutes."""
+        from chunking.multi_language_chunker import MultiLanguageChunker
+        from search.incremental_indexer import IncrementalIndexer
+
+        indexing_lock = self._indexing_lock(project_path)
+        if not indexing_lock.acquire(blocking=False):
+            # Searching the current index beats waiting for the running indexer
+            logger.info("Indexing in progress, skipping auto-reindex")
+            return
+        try:
+            logger.info(f"Checking if index needs refresh (max age: {max_age_minutes} minutes)")
+
+            index_manager = self._get_pooled_index(project_path).index_manager
+            chunker = MultiLanguageChunker(project_path, tree_cache=self._tree_cache)
+
+            incremental_indexer = IncrementalIndexer(
+                indexer=index_manager,
+                embedder=embedder,
+                chunker=chunker,
+                cancel_event=current_cancel_event()
+            )
+
+            reindex_result = incremental_indexer.auto_reindex_if_needed(
+                project_path,
+                max_age_minutes=max_age_minutes
+            )
+        finally:
+            indexing_lock.release()
+
+        if reindex_result.files_modified > 0 or reindex_result.files_added > 0:
+            logger.info(f"Auto-reindexed: {reindex_result.files_added} added, {reindex_result.files_modified} modified, took {reindex_result.time_taken:.2f}s")
+
+    def search_code_batch(
+        self,
+        queries: List[str],
+        k: int = 5,
+        search_mode: str = "auto",
+        file_pattern: str = None,
+        chunk_type: str = None,
+        include_context: bool = False,
+        auto_reindex: bool = True,
+        max_age_minutes: float = 5,
+        project: str = None
+    ) -> str:
+        """Implementation of search_code_batch tool."""
+        try:
+            logger.info(f"🔍 MCP REQUEST: search_code_batch({len(queries)} queries, k={k}, file_pattern={file_pattern}, chunk_type={chunk_type}, project={project})")
+
+            if not queries:
+                return json.dumps({"error": "No queries given"})
+
+            filters = {}
+            if file_pattern:
+                filters['file_pattern'] = [file_pattern]
+            if chunk_type:
+                filters['chunk_type'] = chunk_type
+
+            if project is not None and not Path(project).is_dir():
+                return json.dumps({"error": f"Project path does not exist: {project}"})
+            project_path = str(Path(project).resolve()) if project is not None else self._current_project
+
+            embedder = self.wait_for_model()
+
+            if auto_reindex and project_path:
+                self._auto_reindex(project_path, embedder, max_age_minutes)
+
+            from search.indexer import SearchStats
+
+            searcher = self.get_searcher(project_path)
+            stats = SearchStats()
+            results = searcher.search_many(
+                queries,
+                k=k,
+                context_depth=1 if include_context else 0,
+                filters=filters if filters else None,
+                search_mode=search_mode,
+                stats=stats
+            )
+            logger.info(f"Batch search returned {sum(len(r) for r in results)} results")
+
+            response = {
+                'results': [
+                    {'query': query, 'results': [self._format_result(result) for result in query_results]}
+                    for query, query_results in zip(queries, results)
+                ]
+            }
+            if stats.expansions:
+                response['expansions'] = stats.expansions
+
+            return json.dumps(response, separators=(",", ":"))
+        except Exception as e:
+            error_msg = f"Batch search failed: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return json.dumps({"error": error_msg})
+
+    @staticmethod
+    def _format_result(result: "SearchResult") -> dict:
+        """Format a search result compactly for the search_code response."""
+        def make_snippet(preview: Optional[str]) -> str:
+            if not preview:
+                return ""
+            for line in preview.split('\n'):
+                s = line.strip()
+                if s:
+                    snippet = ' '.join(s.split())
+                    return (snippet[:157] + '...') if len(snippet) > 160 else snippet
+            return ""
+
+        item = {
+            'file': result.relative_path,
+            'lines': f"{result.start_line}-{result.end_line}",
+            'kind': result.chunk_type,
+            'score': round(result.similarity_score, 2),
+            'chunk_id': result.chunk_id
+        }
+        if result.name:
+            item['name'] = result.name
+        snippet = make_snippet(result.content_preview)
+        if snippet:
+            item['snippet'] = snippet
+        if result.duplicates:
+            item['duplicates'] = result.duplicates
+        return item
+
+    def _indexed_projects(self) -> Dict[str, str]:
+        """Get the indexed projects in the storage directory.
+
+        Returns:
+            Project path -> project name
+        """
+        projects = {}
+        projects_dir = get_storage_dir() / "projects"
+        if not projects_dir.exists():
+            return projects
+        for project_dir in projects_dir.iterdir():
+            info_file = project_dir / "project_info.json"
+            if not (project_dir / "index" / "code.index").exists() or not info_file.exists():
+                continue
+            with open(info_file) as f:
+                project_info = json.load(f)
+            projects[project_info["project_path"]] = project_info["project_name"]
+        return projects
+
+    def _federated_search(
+        self,
+        query: str,
+        k: int,
+        projects: Optional[List[str]],
+        filters: Optional[dict],
+        include_context: bool
+    ) -> str:
+        """Search several projects with one query embedding and merge the results.
+
+        Args:
+            query: Natural language query
+            k: Number of merged results
+            projects: Project paths to search (default: all indexed projects)
+            filters: Optional filters applied in every project
+            include_context: Include related chunks in the results
+
+        Returns:
+            JSON response with results tagged by project
+        """
+        from search.federated import FederatedSearcher
+
+        indexed = self._indexed_projects()
+        if projects:
+            targets = {}
+            for project in projects:
+                project_path = str(Path(project).resolve())
+                if project_path not in indexed:
+                    return json.dumps({"error": f"Project not indexed: {project}"})
+                targets[project_path] = indexed[project_path]
+        else:
+            targets = indexed
+        if not targets:
+            return json.dumps({"error": "No indexed projects to search"})
+
+        embedder = self.wait_for_model()
+        with self._embedder_lock:
+            if self._federated_searcher is None:
+                self._federated_searcher = FederatedSearcher(embedder, timeout=self.federated_timeout)
+            federated = self._federated_searcher
+
+        # Project indexes are searched as they are, without auto-reindexing
+        response = federated.search(
+            query,
+            {path: functools.partial(self.get_searcher, path) for path in targets},
+            k=k,
+            filters=filters,
+            context_depth=1 if include_context else 0
+        )
+        logger.info(
+            f"Federated search over {len(targets)} projects returned {len(response.results)} results"
+            f" ({len(response.timed_out)} timed out, {len(response.failed)} failed)"
+        )
+
+        formatted_results = []
+        for item in response.results:
+            formatted = self._format_result(item.result)
+            formatted['project'] = targets[item.project]
+            formatted['project_path'] = item.project
+            formatted['calibrated_score'] = round(item.calibrated_score, 2)
+            formatted_results.append(formatted)
+
+        result = {
+            'query': query,
+            'results': formatted_results,
+            'projects_searched': len(response.projects_searched)
+        }
+        if response.timed_out:
+            result['timed_out'] = [targets[p] for p in response.timed_out]
+        if response.failed:
+            result['failed'] = {targets[p]: error for p, error in response.failed.items()}
+        return json.dumps(result, separators=(",", ":"))
+
     def index_directory(
         self,
         directory_path: str,
@@ -262,10 +599,9 @@ class CodeSearchServer:
     ) -> str:
         """Implementation of index_directory tool."""
         try:
+            from chunking.multi_language_chunker import MultiLanguageChunker
             from search.incremental_indexer import IncrementalIndexer
 
-            self._maybe_start_model_preload()
-
             directory_path = Path(directory_path).resolve()
             if not directory_path.exists():
                 return json.dumps({"error": f"Directory does not exist: {directory_path}"})
@@ -277,20 +613,25 @@ class CodeSearchServer:
             logger.info(f"Indexing directory: {directory_path} (incremental={incremental})")
 
             index_manager = self.get_index_manager(str(directory_path))
-            embedder = self.embedder()
-            chunker = MultiLanguageChunker(str(directory_path))
+            embedder = self.wait_for_model()
+            chunker = MultiLanguageChunker(str(directory_path), tree_cache=self._tree_cache)
 
             incremental_indexer = IncrementalIndexer(
                 indexer=index_manager,
                 embedder=embedder,
-                chunker=chunker
+                chunker=chunker,
+                cancel_event=current_cancel_event()
             )
 
-            result = incremental_indexer.incremental_index(
-                str(directory_path),
-                project_name,
-                force_full=not incremental
-            )
+            with self._indexing_lock(str(directory_path)):
+                result = incremental_indexer.incremental_index(
+                    str(directory_path),
+                    project_name,
+                    force_full=not incremental
+                )
+                # Keep a previously built nearest-neighbour graph current for find_duplicate_code
+                if result.success:
+                    index_manager.refresh_knn_graph()
 
             stats = incremental_indexer.get_indexing_stats(str(directory_path))
 
@@ -318,10 +659,10 @@ class CodeSearchServer:
             logger.error(error_msg, exc_info=True)
             return json.dumps({"error": error_msg})
 
-    def find_similar_code(self, chunk_id: str, k: int = 5) -> str:
+    def find_similar_code(self, chunk_id: str, k: int = 5, project: str = None) -> str:
         """Implementation of find_similar_code tool."""
         try:
-            searcher = self.get_searcher()
+            searcher = self.get_searcher(project)
             results = searcher.find_similar_to_chunk(chunk_id, k=k)
 
             formatted_results = []
@@ -347,17 +688,69 @@ class CodeSearchServer:
             logger.error(error_msg, exc_info=True)
             return json.dumps({"error": error_msg})
 
-    def get_index_status(self) -> str:
+    def find_duplicate_code(
+        self,
+        threshold: float = 0.95,
+        min_cluster_size: int = 2,
+        max_clusters: int = 20,
+        rebuild: bool = False,
+        project: str = None
+    ) -> str:
+        """Implementation of find_duplicate_code tool."""
+        try:
+            index_manager = self._get_pooled_index(project).index_manager
+            if rebuild:
+                index_manager.build_knn_graph()
+            clusters = index_manager.find_duplicate_clusters(threshold=threshold, min_size=min_cluster_size)
+            if clusters is None:
+                return json.dumps({
+                    "error": "No up-to-date nearest-neighbour graph for this project",
+                    "suggestion": "Call find_duplicate_code(rebuild=True), or index with "
+                                  "scripts/index_codebase.py --knn-graph K"
+                })
+
+            formatted_clusters = []
+            for cluster in clusters[:max_clusters]:
+                formatted_clusters.append({
+                    'size': len(cluster['chunks']),
+                    'similarity': round(cluster['similarity'], 3),
+                    'chunks': [
+                        {
+                            'chunk_id': chunk_id,
+                            'file': metadata.get('relative_path'),
+                            'lines': f"{metadata.get('start_line')}-{metadata.get('end_line')}",
+                            'name': metadata.get('name')
+                        }
+                        for chunk_id, metadata in cluster['chunks']
+                    ]
+                })
+
+            response = {
+                'threshold': threshold,
+                'total_clusters': len(clusters),
+                'clusters': formatted_clusters
+            }
+
+            return json.dumps(response, indent=2)
+        except Exception as e:
+            error_msg = f"Duplicate code search failed: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return json.dumps({"error": error_msg})
+
+    def get_index_status(self, project: str = None) -> str:
         """Implementation of get_index_status tool."""
         try:
-            index_manager = self.get_index_manager()
-            stats = index_manager.get_stats()
+            stats = self._get_pooled_index(project).index_manager.get_stats()
 
             model_info = self.embedder().get_model_info()
 
             response = {
                 "index_statistics": stats,
                 "model_information": model_info,
+                "model_status": self.get_model_status(),
+                "loaded_projects": self._get_index_pool().get_stats(),
+                "result_cache": self._result_cache.get_stats(),
+                "reranker": self.reranker.get_stats() if self.reranker is not None else None,
                 "storage_directory": str(get_storage_dir())
             }
 
@@ -422,8 +815,6 @@ class CodeSearchServer:
                 })
 
             self._current_project = str(project_path)
-            self._index_manager = None
-            self._searcher = None
 
             info_file = project_dir / "project_info.json"
             project_info = {}
@@ -18,6 +18,7 @@ logging.getLogger("fastmcp").setLevel(logging.DEBUG)
 
 from mcp_server.code_search_server import CodeSearchServer
 from mcp_server.code_search_mcp import CodeSearchMCP
+from mcp_server.tool_executor import ToolExecutor
 
 
 def main():
@@ -42,12 +43,64 @@ def main():
         default=8000,
         help="Port for HTTP transport (default: 8000)"
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Worker threads for concurrent tool calls (default: cpu count + 4, at most 32)"
+    )
+
+    parser.add_argument(
+        "--rerank-model",
+        default=None,
+        help="Cross-encoder re-scoring the top search results, e.g. cross-encoder/ms-marco-MiniLM-L-6-v2 (default: off)"
+    )
+    parser.add_argument(
+        "--rerank-top-n",
+        type=int,
+        default=20,
+        help="Number of top results re-scored by the cross-encoder (default: 20)"
+    )
+    parser.add_argument(
+        "--rerank-budget-ms",
+        type=float,
+        default=150.0,
+        help="Milliseconds per query the cross-encoder may take before ranking falls back (default: 150)"
+    )
+
+    parser.add_argument(
+        "--vector-dtype",
+        choices=["float32", "float16"],
+        default="float32",
+        help="Element type of the vectors of newly built indexes; float16 halves index memory (default: float32)"
+    )
+
+    parser.add_argument(
+        "--model-load-timeout",
+        type=float,
+        default=300.0,
+        help="Seconds a tool call waits for the embedding model to load before returning an error (default: 300)"
+    )
 
     args = parser.parse_args()
 
+    reranker = None
+    if args.rerank_model:
+        from common_utils import get_storage_dir
+        from search.reranker import CrossEncoderScorer, Reranker
+
+        scorer = CrossEncoderScorer(args.rerank_model, cache_dir=str(get_storage_dir() / "models"))
+        reranker = Reranker(scorer, top_n=args.rerank_top_n, budget_ms=args.rerank_budget_ms)
+
     # Create and run server
-    server = CodeSearchServer()
-    mcp_server = CodeSearchMCP(server)
+    server = CodeSearchServer(
+        reranker=reranker, vector_dtype=args.vector_dtype, model_load_timeout=args.model_load_timeout
+    )
+    # Load the embedding model, and any re-ranking model, while the client connects
+    server.start_model_preload()
+    if reranker is not None:
+        scorer.start_preload()
+    mcp_server = CodeSearchMCP(server, ToolExecutor(max_workers=args.max_workers))
     mcp_server.run(transport=args.transport, host=args.host, port=args.port)
 
 
@@ -0,0 +1,149 @@
+"""Async execution of synchronous tool implementations on a bounded thread pool."""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Maximum concurrent calls per tool; tools not listed use default_limit
+DEFAULT_TOOL_LIMITS = {
+    'index_directory': 1,
+    'index_test_project': 1,
+    'clear_index': 1,
+    'switch_project': 1,
+    'search_code': 8,
+    'search_code_batch': 4,
+    'find_duplicate_code': 1,
+}
+
+_local = threading.local()
+
+
+def current_cancel_event() -> Optional[threading.Event]:
+    """Get the cancellation event of the tool call running on this thread.
+
+    Long-running tool code checks it at safe points and stops early once it
+    is set.
+
+    Returns:
+        Event set when the client cancels the call, or None outside a tool call
+    """
+    return getattr(_local, 'cancel_event', None)
+
+
+class ToolExecutor:
+    """Run tool calls off the event loop with per-tool concurrency limits.
+
+    Each call runs on a shared thread pool, so a long index_directory does
+    not block concurrent searches. Calls beyond a tool's limit wait for a
+    free slot without occupying a worker thread. When the awaiting task is
+    cancelled, a call that has not started is dropped and a running call has
+    its cancel event set; its slot is only freed once the thread finishes,
+    so limits hold even for cancelled calls.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        tool_limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 4
+    ):
+        """Initialize the executor.
+
+        Args:
+            max_workers: Worker threads (default: min(32, cpu_count + 4))
+            tool_limits: Maximum concurrent calls per tool name
+            default_limit: Maximum concurrent calls of other tools
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.tool_limits = dict(DEFAULT_TOOL_LIMITS if tool_limits is None else tool_limits)
+        self.default_limit = default_limit
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tool')
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(tool_name)
+        if semaphore is None:
+            limit = self.tool_limits.get(tool_name, self.default_limit)
+            semaphore = self._semaphores[tool_name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore) -> None:
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # The loop already closed, nothing waits on the semaphore anymore
+            pass
+
+    @staticmethod
+    def _call(cancel_event: threading.Event, func: Callable, args, kwargs) -> Any:
+        _local.cancel_event = cancel_event
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.cancel_event = None
+
+    async def run(self, tool_name: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a synchronous tool function on the pool.
+
+        Args:
+            tool_name: Tool name used for the concurrency limit
+            func: Synchronous function to call
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+        """
+        semaphore = self._semaphore(tool_name)
+        await semaphore.acquire()
+
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+        try:
+            future = self._executor.submit(self._call, cancel_event, func, args, kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._release(loop, semaphore))
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # wrap_future cancels calls that have not started; running ones stop cooperatively
+            cancel_event.set()
+            logger.info(f"Tool call {tool_name} cancelled")
+            raise
+
+    def wrap(self, tool_name: str, func: Callable) -> Callable:
+        """Create an async variant of a synchronous tool function.
+
+        The wrapper keeps the function's name, docstring and signature, so
+        it registers with FastMCP under the same schema.
+
+        Args:
+            tool_name: Tool name used for the concurrency limit
+            func: Synchronous tool function
+
+        Returns:
+            Coroutine function running func through run()
+        """
+        @functools.wraps(func)
+        async def async_tool(*args, **kwargs):
+            return await self.run(tool_name, func, *args, **kwargs)
+
+        return async_tool
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the worker threads, dropping calls that have not started.
+
+        Args:
+            wait: Wait for running calls to finish
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,7 +1,8 @@
 """Merkle tree-based change detection for efficient incremental indexing."""
 
 from merkle.merkle_dag import MerkleNode, MerkleDAG
+from merkle.git_source import GitMerkleDAG
 from merkle.snapshot_manager import SnapshotManager
 from merkle.change_detector import ChangeDetector
 
-__all__ = ['MerkleNode', 'MerkleDAG', 'SnapshotManager', 'ChangeDetector']
\ No newline at end of file
+__all__ = ['MerkleNode', 'MerkleDAG', 'GitMerkleDAG', 'SnapshotManager', 'ChangeDetector']
\ No newline at end of file
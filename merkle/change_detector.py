@@ -2,8 +2,9 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
+from merkle.git_source import GitMerkleDAG, find_git_dir
 from merkle.merkle_dag import MerkleDAG, MerkleNode
 from merkle.snapshot_manager import SnapshotManager
 
@@ -45,13 +46,53 @@ class FileChanges:
 class ChangeDetector:
     """Detects changes between Merkle DAGs."""
     
-    def __init__(self, snapshot_manager: SnapshotManager = None):
+    def __init__(
+        self,
+        snapshot_manager: SnapshotManager = None,
+        use_git: bool = True,
+        content_filter: Optional[Callable[[str, int], bool]] = None
+    ):
         """Initialize change detector.
         
         Args:
             snapshot_manager: Snapshot manager instance
+            use_git: Reuse git index blob hashes when the project is a git work tree
+            content_filter: Optional (relative_path, size) predicate selecting files
+                whose content is hashed; others are tracked by stat metadata only
         """
         self.snapshot_manager = snapshot_manager or SnapshotManager()
+        self.use_git = use_git
+        self.content_filter = content_filter
+    
+    def build_dag(self, project_path: str) -> MerkleDAG:
+        """Build a DAG for the current state of a project.
+        
+        Git work trees use the git index as change source; other projects
+        are hashed from the filesystem.
+        
+        Args:
+            project_path: Path to project
+            
+        Returns:
+            Built MerkleDAG
+        """
+        git_dir = find_git_dir(project_path) if self.use_git else None
+        if git_dir is not None:
+            current_dag = GitMerkleDAG(project_path, git_dir, self.content_filter)
+        else:
+            current_dag = MerkleDAG(project_path, self.content_filter)
+        
+        # Add snapshot directory to ignore patterns if it's inside the project
+        snapshot_dir = self.snapshot_manager.storage_dir
+        try:
+            relative_snapshot = snapshot_dir.relative_to(Path(project_path))
+            current_dag.ignore_patterns.add(str(relative_snapshot))
+        except ValueError:
+            # Snapshot dir is not inside the project, no need to ignore
+            pass
+        
+        current_dag.build()
+        return current_dag
     
     def detect_changes(self, old_dag: MerkleDAG, new_dag: MerkleDAG) -> FileChanges:
         """Detect file changes between two Merkle DAGs.
@@ -101,18 +142,7 @@ class ChangeDetector:
             Tuple of (FileChanges, current MerkleDAG)
         """
         # Build current DAG
-        current_dag = MerkleDAG(project_path)
-        
-        # Add snapshot directory to ignore patterns if it's inside the project
-        snapshot_dir = self.snapshot_manager.storage_dir
-        try:
-            relative_snapshot = snapshot_dir.relative_to(Path(project_path))
-            current_dag.ignore_patterns.add(str(relative_snapshot))
-        except ValueError:
-            # Snapshot dir is not inside the project, no need to ignore
-            pass
-        
-        current_dag.build()
+        current_dag = self.build_dag(project_path)
         
         # Load previous snapshot
         old_dag = self.snapshot_manager.load_snapshot(project_path)
@@ -147,18 +177,7 @@ class ChangeDetector:
             return True
         
         # Build current DAG
-        current_dag = MerkleDAG(project_path)
-        
-        # Add snapshot directory to ignore patterns if it's inside the project
-        snapshot_dir = self.snapshot_manager.storage_dir
-        try:
-            relative_snapshot = snapshot_dir.relative_to(Path(project_path))
-            current_dag.ignore_patterns.add(str(relative_snapshot))
-        except ValueError:
-            # Snapshot dir is not inside the project, no need to ignore
-            pass
-        
-        current_dag.build()
+        current_dag = self.build_dag(project_path)
         
         # Compare root hashes
         return old_dag.get_root_hash() != current_dag.get_root_hash()
@@ -0,0 +1,287 @@
+"""Git-aware change source that reuses blob hashes from the git index."""
+
+import hashlib
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from merkle.ignore_matcher import IgnoreMatcher
+from merkle.merkle_dag import MerkleDAG
+
+
+# Index entry flags (see git's Documentation/gitformat-index.txt)
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+_FLAG2_SKIP_WORKTREE = 0x4000
+
+
+@dataclass
+class GitIndexEntry:
+    """A stage-0 entry from the git index."""
+
+    path: str
+    sha: str
+    mode: int
+    size: int
+    mtime_s: int
+    mtime_ns: int
+
+
+def find_git_dir(project_path: str) -> Optional[Path]:
+    """Locate the git directory for a project root.
+
+    Args:
+        project_path: Project root path
+
+    Returns:
+        Path to the git directory or None if the project is not a git work tree
+    """
+    dot_git = Path(project_path) / '.git'
+    if dot_git.is_dir():
+        return dot_git
+
+    # Worktrees and submodules use a ".git" file pointing at the real directory
+    if dot_git.is_file():
+        try:
+            content = dot_git.read_text().strip()
+        except (IOError, OSError):
+            return None
+        if content.startswith('gitdir:'):
+            git_dir = Path(content[len('gitdir:'):].strip())
+            if not git_dir.is_absolute():
+                git_dir = (Path(project_path) / git_dir).resolve()
+            if git_dir.is_dir():
+                return git_dir
+
+    return None
+
+
+def git_blob_hash(file_path: Path) -> Tuple[str, int]:
+    """Calculate the git blob SHA-1 of a file.
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        Tuple of (blob sha, file_size)
+    """
+    size = file_path.stat().st_size
+    sha1 = hashlib.sha1(f'blob {size}\0'.encode())
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(65536):
+            sha1.update(chunk)
+    return sha1.hexdigest(), size
+
+
+class GitIndex:
+    """Pure-Python reader for the git index file (versions 2, 3 and 4)."""
+
+    def __init__(self, git_dir: Path):
+        """Initialize the reader.
+
+        Args:
+            git_dir: Path to the git directory
+        """
+        self.git_dir = Path(git_dir)
+        self.index_path = self.git_dir / 'index'
+        self.entries: Dict[str, GitIndexEntry] = {}
+        self.index_mtime_ns: int = 0
+
+    def load(self) -> bool:
+        """Parse the index file.
+
+        Returns:
+            True if the index was read successfully
+        """
+        self.entries.clear()
+        try:
+            self.index_mtime_ns = self.index_path.stat().st_mtime_ns
+            data = self.index_path.read_bytes()
+        except (IOError, OSError):
+            return False
+
+        try:
+            self._parse(data)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self.entries.clear()
+            return False
+        return True
+
+    def _parse(self, data: bytes) -> None:
+        """Parse raw index bytes into entries."""
+        signature, version, count = struct.unpack_from('>4sII', data, 0)
+        if signature != b'DIRC':
+            raise ValueError("Not a git index file")
+        if version not in (2, 3, 4):
+            raise ValueError(f"Unsupported git index version: {version}")
+
+        offset = 12
+        previous_path = b''
+        for _ in range(count):
+            entry_start = offset
+            (_ctime_s, _ctime_ns, mtime_s, mtime_ns, _dev, _ino,
+             mode, _uid, _gid, size) = struct.unpack_from('>10I', data, offset)
+            offset += 40
+            sha = data[offset:offset + 20].hex()
+            offset += 20
+            (flags,) = struct.unpack_from('>H', data, offset)
+            offset += 2
+
+            flags2 = 0
+            if version >= 3 and flags & _FLAG_EXTENDED:
+                (flags2,) = struct.unpack_from('>H', data, offset)
+                offset += 2
+
+            if version == 4:
+                # Prefix-compressed path: strip N bytes from the previous path
+                strip, offset = self._read_varint(data, offset)
+                end = data.index(b'\0', offset)
+                path = previous_path[:len(previous_path) - strip] + data[offset:end]
+                offset = end + 1
+            else:
+                name_length = flags & _FLAG_NAME_MASK
+                if name_length == _FLAG_NAME_MASK:
+                    end = data.index(b'\0', offset)
+                else:
+                    end = offset + name_length
+                path = data[offset:end]
+                # Entries are NUL-padded to a multiple of eight bytes
+                entry_length = end - entry_start
+                offset = entry_start + ((entry_length + 8) & ~7)
+
+            previous_path = path
+
+            # Skip conflict stages and sparse-checkout entries absent from disk
+            if flags & _FLAG_STAGE_MASK or flags2 & _FLAG2_SKIP_WORKTREE:
+                continue
+
+            decoded = path.decode('utf-8')
+            self.entries[decoded] = GitIndexEntry(
+                path=decoded,
+                sha=sha,
+                mode=mode,
+                size=size,
+                mtime_s=mtime_s,
+                mtime_ns=mtime_ns
+            )
+
+    @staticmethod
+    def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+        """Read git's offset-encoded varint used by index version 4."""
+        byte = data[offset]
+        offset += 1
+        value = byte & 0x7F
+        while byte & 0x80:
+            byte = data[offset]
+            offset += 1
+            value = ((value + 1) << 7) | (byte & 0x7F)
+        return value, offset
+
+    def is_up_to_date(self, entry: GitIndexEntry, stat: os.stat_result) -> bool:
+        """Check whether a working tree file still matches its index entry.
+
+        Mirrors git's stat check: size and mtime must match, and files modified
+        in the same instant the index was written are treated as racily clean
+        and must be rehashed.
+
+        Args:
+            entry: Index entry for the file
+            stat: Current stat result of the working tree file
+
+        Returns:
+            True if the cached blob SHA can be reused
+        """
+        if stat.st_size & 0xFFFFFFFF != entry.size:
+            return False
+        if int(stat.st_mtime) & 0xFFFFFFFF != entry.mtime_s:
+            return False
+        if stat.st_mtime_ns % 1_000_000_000 != entry.mtime_ns:
+            return False
+        return stat.st_mtime_ns < self.index_mtime_ns
+
+
+class GitMerkleDAG(MerkleDAG):
+    """Merkle DAG that keys tracked files by their git blob SHA.
+
+    Tracked files whose stat data still matches the git index reuse the blob
+    SHA stored there instead of being read from disk. Modified tracked files
+    are rehashed as git blobs, and untracked files fall back to the regular
+    filesystem hash. Ignore files only apply to untracked paths, as in git.
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        git_dir: Optional[Path] = None,
+        content_filter: Optional[Callable[[str, int], bool]] = None
+    ):
+        """Initialize a git-aware Merkle DAG.
+
+        Args:
+            root_path: Root directory to track
+            git_dir: Git directory (discovered from root_path if omitted)
+            content_filter: Optional (relative_path, size) predicate, see MerkleDAG
+        """
+        super().__init__(root_path, content_filter)
+        self.git_dir = git_dir or find_git_dir(str(self.root_path))
+        self.git_index: Optional[GitIndex] = None
+        self._tracked_dirs: Set[str] = set()
+        self.reused_hashes = 0
+
+    def build(self) -> None:
+        """Load the git index and build the DAG."""
+        self.git_index = None
+        self._tracked_dirs.clear()
+        self.reused_hashes = 0
+
+        if self.git_dir is not None:
+            index = GitIndex(self.git_dir)
+            if index.load():
+                self.git_index = index
+                for path in index.entries:
+                    parent = path.rpartition('/')[0]
+                    while parent and parent not in self._tracked_dirs:
+                        self._tracked_dirs.add(parent)
+                        parent = parent.rpartition('/')[0]
+
+        super().build()
+
+    def create_matcher(self) -> IgnoreMatcher:
+        """Create an ignore matcher that also reads .git/info/exclude."""
+        exclude_files = [self.git_dir / 'info' / 'exclude'] if self.git_dir else []
+        return IgnoreMatcher(
+            str(self.root_path),
+            self.ignore_patterns,
+            use_gitignore=self.use_gitignore,
+            exclude_files=exclude_files
+        )
+
+    def _is_ignored(self, relative_path: str, is_dir: bool) -> bool:
+        """Only apply the default patterns to tracked paths."""
+        if self.git_index is not None and (
+            relative_path in self.git_index.entries or relative_path in self._tracked_dirs
+        ):
+            return self._get_matcher().matches_defaults(relative_path, is_dir)
+        return super()._is_ignored(relative_path, is_dir)
+
+    def hash_file(self, file_path: Path) -> Tuple[str, int]:
+        """Hash a file, reusing the git index blob SHA when possible."""
+        if self.git_index is None:
+            return super().hash_file(file_path)
+
+        entry = self.git_index.entries.get(file_path.relative_to(self.root_path).as_posix())
+        if entry is None:
+            # Untracked file - regular filesystem hash
+            return super().hash_file(file_path)
+
+        try:
+            stat = file_path.stat()
+            if self.git_index.is_up_to_date(entry, stat):
+                self.reused_hashes += 1
+                return entry.sha, stat.st_size
+            return git_blob_hash(file_path)
+        except (IOError, OSError):
+            return super().hash_file(file_path)
@@ -5,7 +5,9 @@ import json
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from merkle.ignore_matcher import DEFAULT_IGNORE_PATTERNS, IgnoreMatcher, scan_directory
 
 
 @dataclass
@@ -44,49 +46,68 @@ class MerkleNode:
 class MerkleDAG:
     """Merkle DAG for tracking file system changes."""
     
-    def __init__(self, root_path: str):
+    def __init__(
+        self,
+        root_path: str,
+        content_filter: Optional[Callable[[str, int], bool]] = None
+    ):
         """Initialize Merkle DAG for a directory tree.
         
         Args:
             root_path: Root directory to track
+            content_filter: Optional predicate taking (relative_path, size) that
+                returns True if the file's content must be hashed. Other files
+                are recorded by stat metadata only.
         """
         self.root_path = Path(root_path).resolve()
+        self.content_filter = content_filter
         self.nodes: Dict[str, MerkleNode] = {}
         self.root_node: Optional[MerkleNode] = None
-        self.ignore_patterns: Set[str] = {
-            '__pycache__', '.git', '.hg', '.svn',
-            '.venv', 'venv', 'env', '.env', '.direnv',
-            'node_modules', '.pnpm-store', '.yarn',
-            '.pytest_cache', '.mypy_cache', '.ruff_cache', '.pytype', '.ipynb_checkpoints',
-            'build', 'dist', 'out', 'public',
-            '.next', '.nuxt', '.svelte-kit', '.angular', '.astro', '.vite',
-            '.cache', '.parcel-cache', '.turbo',
-            'coverage', '.coverage', '.nyc_output',
-            '.gradle', '.idea', '.vscode', '.docusaurus', '.vercel', '.serverless', '.terraform', '.mvn', '.tox',
-            'target', 'bin', 'obj',
-            '*.pyc', '*.pyo', '.DS_Store', 'Thumbs.db'
-        }
+        self.ignore_patterns: Set[str] = set(DEFAULT_IGNORE_PATTERNS)
+        self.use_gitignore = True
+        self._matcher: Optional[IgnoreMatcher] = None
+    
+    def create_matcher(self) -> IgnoreMatcher:
+        """Create the ignore matcher for the current ignore patterns.
+        
+        Returns:
+            IgnoreMatcher rooted at the DAG root
+        """
+        return IgnoreMatcher(
+            str(self.root_path),
+            self.ignore_patterns,
+            use_gitignore=self.use_gitignore
+        )
+    
+    def _get_matcher(self) -> IgnoreMatcher:
+        """Get the ignore matcher, creating it on first use."""
+        if self._matcher is None:
+            self._matcher = self.create_matcher()
+        return self._matcher
+    
+    def _is_ignored(self, relative_path: str, is_dir: bool) -> bool:
+        """Check if a '/' separated relative path should be ignored."""
+        return self._get_matcher().is_ignored(relative_path, is_dir)
     
     def should_ignore(self, path: Path) -> bool:
         """Check if a path should be ignored.
         
+        Applies the ignore patterns and any .gitignore files with
+        gitignore semantics.
+        
         Args:
             path: Path to check
             
         Returns:
             True if path should be ignored
         """
-        name = path.name
-         
-        # Check exact matches and patterns
-        for pattern in self.ignore_patterns:
-            if pattern.startswith('*'):
-                if name.endswith(pattern[1:]):
-                    return True
-            elif name == pattern:
-                return True
-        
-        return False
+        if path == self.root_path:
+            return False
+        try:
+            relative_path = path.relative_to(self.root_path).as_posix()
+        except ValueError:
+            relative_path = path.name
+        return self._is_ignored(relative_path, path.is_dir())
     
     def hash_file(self, file_path: Path) -> Tuple[str, int]:
         """Calculate SHA-256 hash of a file.
@@ -111,6 +132,17 @@ class MerkleDAG:
             
         return sha256.hexdigest(), size
     
+    def hash_stat(self, stat: os.stat_result) -> str:
+        """Calculate a hash from file stat metadata without reading the file.
+        
+        Args:
+            stat: Stat result of the file
+            
+        Returns:
+            Hash of size and modification time
+        """
+        return hashlib.sha256(f"stat:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+    
     def hash_directory(self, dir_path: Path, child_hashes: List[str]) -> str:
         """Calculate hash for a directory based on its children.
         
@@ -132,12 +164,13 @@ class MerkleDAG:
             
         return sha256.hexdigest()
     
-    def build_node(self, path: Path, base_path: Optional[Path] = None) -> Optional[MerkleNode]:
-        """Recursively build a Merkle node for a path.
+    def build_node(self, path: Path) -> Optional[MerkleNode]:
+        """Build a Merkle node for a path and everything below it.
+        
+        Relative paths of the nodes are taken against the DAG's root path.
         
         Args:
             path: Path to build node for
-            base_path: Base path for relative path calculation
             
         Returns:
             MerkleNode or None if path should be ignored
@@ -145,9 +178,6 @@ class MerkleDAG:
         if self.should_ignore(path):
             return None
             
-        if base_path is None:
-            base_path = self.root_path
-            
         # Calculate relative path
         if path == self.root_path:
             relative_path = "."
@@ -155,44 +185,74 @@ class MerkleDAG:
             relative_path = str(path.relative_to(self.root_path))
         
         if path.is_file():
-            file_hash, size = self.hash_file(path)
-            node = MerkleNode(
-                path=relative_path,
-                hash=file_hash,
-                is_file=True,
-                size=size
-            )
-            self.nodes[relative_path] = node
-            return node
-            
+            return self._build_file_node(path, relative_path)
         elif path.is_dir():
-            children = []
-            child_hashes = []
+            return self._build_directory_node(path, relative_path)
             
+        return None
+    
+    def _build_file_node(
+        self,
+        path: Path,
+        relative_path: str,
+        entry: Optional[os.DirEntry] = None
+    ) -> MerkleNode:
+        """Hash a file and register its node."""
+        file_hash = None
+        if self.content_filter is not None:
             try:
-                for child_path in sorted(path.iterdir()):
-                    child_node = self.build_node(child_path, base_path)
-                    if child_node:
-                        children.append(child_node)
-                        child_hashes.append(child_node.hash)
-            except (PermissionError, OSError):
+                stat = entry.stat() if entry is not None else path.stat()
+                if not self.content_filter(Path(relative_path).as_posix(), stat.st_size):
+                    file_hash, size = self.hash_stat(stat), stat.st_size
+            except OSError:
                 pass
-                
-            dir_hash = self.hash_directory(path, child_hashes)
-            node = MerkleNode(
-                path=relative_path,
-                hash=dir_hash,
-                is_file=False,
-                children=children
-            )
-            self.nodes[relative_path] = node
-            return node
+        if file_hash is None:
+            file_hash, size = self.hash_file(path)
+        node = MerkleNode(
+            path=relative_path,
+            hash=file_hash,
+            is_file=True,
+            size=size
+        )
+        self.nodes[relative_path] = node
+        return node
+    
+    def _build_directory_node(self, path: Path, relative_path: str) -> MerkleNode:
+        """Recursively build a directory node in a single scandir pass per level."""
+        scan_relative = '' if relative_path == '.' else Path(relative_path).as_posix()
+        directories, files = scan_directory(str(path), scan_relative, self._is_ignored)
+        
+        children = []
+        child_hashes = []
+        entries = [(entry, False) for entry in directories] + [(entry, True) for entry in files]
+        for entry, is_file in sorted(entries, key=lambda item: item[0].name):
+            child_path = Path(entry.path)
+            if relative_path == ".":
+                child_relative = entry.name
+            else:
+                child_relative = os.path.join(relative_path, entry.name)
+            if is_file:
+                child_node = self._build_file_node(child_path, child_relative, entry)
+            else:
+                child_node = self._build_directory_node(child_path, child_relative)
+            children.append(child_node)
+            child_hashes.append(child_node.hash)
             
-        return None
+        dir_hash = self.hash_directory(path, child_hashes)
+        node = MerkleNode(
+            path=relative_path,
+            hash=dir_hash,
+            is_file=False,
+            children=children
+        )
+        self.nodes[relative_path] = node
+        return node
     
     def build(self) -> None:
         """Build the complete Merkle DAG for the root directory."""
         self.nodes.clear()
+        # Recreate the matcher so pattern and .gitignore edits take effect
+        self._matcher = None
         self.root_node = self.build_node(self.root_path)
         # For the root node, use "." as its path
         if self.root_node:
@@ -52,6 +52,20 @@ def main():
         action="store_true",
         help="Clear existing index before indexing"
     )
+    parser.add_argument(
+        "--vector-dtype",
+        choices=["float32", "float16"],
+        default="float32",
+        help="Element type of stored vectors; float16 halves index memory (default: float32)"
+    )
+    parser.add_argument(
+        "--knn-graph",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Also precompute the K nearest neighbours of every chunk for "
+             "find_similar_code and find_duplicate_code (default: 0, skip)"
+    )
     
     args = parser.parse_args()
     
@@ -87,7 +101,7 @@ def main():
         
         # Initialize index manager
         index_dir = storage_dir / "index"
-        index_manager = CodeIndexManager(str(index_dir))
+        index_manager = CodeIndexManager(str(index_dir), vector_dtype=args.vector_dtype)
         
         # Clear existing index if requested
         if args.clear:
@@ -132,6 +146,10 @@ def main():
         logger.info("Saving index to disk...")
         index_manager.save_index()
         
+        if args.knn_graph > 0:
+            logger.info(f"Building {args.knn_graph}-nearest-neighbour graph...")
+            index_manager.build_knn_graph(k=args.knn_graph)
+        
         # Display final statistics
         stats = index_manager.get_stats()
         model_info = embedder.get_model_info()
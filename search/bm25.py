@@ -0,0 +1,197 @@
+"""BM25 inverted index over identifier-split tokens of code chunks."""
+
+import math
+import pickle
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_CAMEL_BOUNDARY = re.compile(r'([a-z])([A-Z])')
+_WORD = re.compile(r'\w+')
+
+
+def normalize_to_tokens(text: str) -> List[str]:
+    """Convert text to normalized tokens, handling CamelCase.
+
+    Args:
+        text: Query, identifier or source text
+
+    Returns:
+        Lowercase tokens with CamelCase, snake_case and kebab-case split apart
+    """
+    # Split CamelCase and snake_case
+    text = _CAMEL_BOUNDARY.sub(r'\1 \2', text)
+    text = text.replace('_', ' ').replace('-', ' ')
+
+    # Extract alphanumeric tokens
+    return _WORD.findall(text.lower())
+
+
+def path_tokens(relative_path: str) -> List[str]:
+    """Convert a relative file path to the tokens used for path matching.
+
+    Args:
+        relative_path: Path relative to the project root
+
+    Returns:
+        Lowercase tokens of the directories and file name
+    """
+    return normalize_to_tokens(relative_path.lower().replace('/', ' ').replace('\\', ' '))
+
+
+def chunk_tokens(metadata: Dict[str, Any], content: Optional[str] = None) -> List[str]:
+    """Collect the lexical tokens of a chunk.
+
+    Args:
+        metadata: Chunk metadata as stored in the index
+        content: Full chunk source (falls back to the stored preview)
+
+    Returns:
+        Tokens of the chunk's name, parent, path, docstring and source
+    """
+    parts = [
+        metadata.get('name'),
+        metadata.get('parent_name'),
+        metadata.get('relative_path'),
+        metadata.get('docstring'),
+        content if content is not None else metadata.get('content_preview'),
+    ]
+    return normalize_to_tokens(' '.join(part for part in parts if part))
+
+
+class BM25Index:
+    """Incrementally updated Okapi BM25 index keyed by chunk id.
+
+    Documents can be added, replaced and removed one at a time; document
+    frequencies and the average length are kept up to date, so scores
+    always reflect the current set of chunks.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        # token -> chunk id -> term frequency
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # chunk id -> token -> term frequency, needed to remove documents
+        self._documents: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def add(self, chunk_id: str, tokens: Iterable[str]) -> None:
+        """Add a chunk, replacing an existing one with the same id.
+
+        Args:
+            chunk_id: Chunk ID
+            tokens: Lexical tokens of the chunk
+        """
+        self.remove(chunk_id)
+        frequencies = dict(Counter(tokens))
+        for token, frequency in frequencies.items():
+            self._postings.setdefault(token, {})[chunk_id] = frequency
+        self._documents[chunk_id] = frequencies
+        length = sum(frequencies.values())
+        self._doc_lengths[chunk_id] = length
+        self._total_length += length
+
+    def remove(self, chunk_id: str) -> bool:
+        """Remove a chunk.
+
+        Args:
+            chunk_id: Chunk ID
+
+        Returns:
+            True if the chunk was indexed
+        """
+        frequencies = self._documents.pop(chunk_id, None)
+        if frequencies is None:
+            return False
+        for token in frequencies:
+            posting = self._postings[token]
+            del posting[chunk_id]
+            if not posting:
+                del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(chunk_id)
+        return True
+
+    def rename(self, renames: Dict[str, str]) -> None:
+        """Move chunks to new ids, keeping their tokens.
+
+        Args:
+            renames: Dictionary mapping old to new chunk ids; all moves are
+                applied together, so ids may be swapped
+        """
+        moved = {}
+        for chunk_id, new_id in renames.items():
+            frequencies = self._documents.get(chunk_id)
+            if frequencies is not None:
+                moved[new_id] = frequencies
+                self.remove(chunk_id)
+        for new_id, frequencies in moved.items():
+            self.add(new_id, Counter(frequencies).elements())
+
+    def search(self, query_tokens: Iterable[str], k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Score the chunks containing any query token.
+
+        Args:
+            query_tokens: Normalized query tokens
+            k: Maximum number of results (None for all matches)
+
+        Returns:
+            List of (chunk_id, BM25 score), best first
+        """
+        n_docs = len(self._documents)
+        if n_docs == 0:
+            return []
+        avg_length = self._total_length / n_docs
+
+        scores: Dict[str, float] = {}
+        for token in set(query_tokens):
+            posting = self._postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for chunk_id, frequency in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked if k is None else ranked[:k]
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._documents
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def save(self, path: Path) -> None:
+        """Write the index to disk.
+
+        Args:
+            path: Destination file
+        """
+        with open(path, 'wb') as f:
+            pickle.dump({'k1': self.k1, 'b': self.b, 'documents': self._documents}, f)
+
+    @classmethod
+    def load(cls, path: Path) -> 'BM25Index':
+        """Read an index written by save().
+
+        Args:
+            path: Source file
+
+        Returns:
+            Loaded BM25Index
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        index = cls(state['k1'], state['b'])
+        for chunk_id, frequencies in state['documents'].items():
+            index.add(chunk_id, Counter(frequencies).elements())
+        return index
@@ -0,0 +1,186 @@
+"""Compressed, content-addressed storage of chunk source text."""
+
+import hashlib
+import logging
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from sqlitedict import SqliteDict
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# First byte of every stored blob names its codec, so stores written with
+# and without zstd installed stay readable
+_ZLIB = b'z'
+_ZSTD = b's'
+
+
+def content_hash(content: str) -> str:
+    """Hash chunk content; the hash addresses the content in the store.
+
+    Args:
+        content: Chunk source text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _encode(content: str) -> sqlite3.Binary:
+    data = content.encode('utf-8')
+    if zstandard is not None:
+        return sqlite3.Binary(_ZSTD + zstandard.ZstdCompressor(level=3).compress(data))
+    return sqlite3.Binary(_ZLIB + zlib.compress(data, 6))
+
+
+def _decode(blob: bytes) -> str:
+    blob = bytes(blob)
+    codec, payload = blob[:1], blob[1:]
+    if codec == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Chunk content was stored with zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    return zlib.decompress(payload).decode('utf-8')
+
+
+class ContentStore:
+    """Chunk source text, compressed and addressed by content hash.
+
+    Keeping bodies out of the metadata rows keeps the rows read on every
+    search small; identical chunks share one stored body. Each body counts
+    the chunks referring to it and is deleted when the last one goes, so
+    no pass over the metadata is needed to collect unused bodies.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self._db: Optional[SqliteDict] = None
+        self._refs: Optional[SqliteDict] = None
+
+    @property
+    def db(self) -> SqliteDict:
+        """Lazy opening of the database."""
+        if self._db is None:
+            self._db = SqliteDict(
+                str(self.path),
+                tablename='content',
+                autocommit=False,
+                journal_mode="WAL",
+                encode=_encode,
+                decode=_decode
+            )
+        return self._db
+
+    @property
+    def refs(self) -> SqliteDict:
+        """Lazy opening of the reference counts, a second table of the same database."""
+        if self._refs is None:
+            self._refs = SqliteDict(str(self.path), tablename='refs', autocommit=False, journal_mode="WAL")
+        return self._refs
+
+    def put_many(self, contents: Dict[str, str]) -> int:
+        """Store contents that are not stored yet.
+
+        Args:
+            contents: Content hash -> content
+
+        Returns:
+            Number of bodies written
+        """
+        written = 0
+        for digest, content in contents.items():
+            if digest not in self.db:
+                self.db[digest] = content
+                written += 1
+        if written:
+            self.db.commit()
+        return written
+
+    def get(self, digest: str) -> Optional[str]:
+        """Fetch one body.
+
+        Args:
+            digest: Content hash
+
+        Returns:
+            The content, or None if not stored
+        """
+        return self.db.get(digest)
+
+    def add_references(self, contents: Dict[str, str], counts: Dict[str, int]) -> int:
+        """Store new bodies and count the chunks newly referring to bodies.
+
+        Args:
+            contents: Content hash -> content, for bodies that may not be stored yet
+            counts: Content hash -> number of chunks added with that content
+
+        Returns:
+            Number of bodies written
+        """
+        written = self.put_many(contents)
+        for digest, count in counts.items():
+            self.refs[digest] = self.refs.get(digest, 0) + count
+        if counts:
+            self.refs.commit()
+        return written
+
+    def release(self, counts: Dict[str, int]) -> int:
+        """Drop references of removed chunks, deleting bodies no chunk refers to.
+
+        Bodies without a count, stored before counts were kept, are left
+        in place.
+
+        Args:
+            counts: Content hash -> number of chunks removed with that content
+
+        Returns:
+            Number of bodies deleted
+        """
+        unreferenced = []
+        for digest, count in counts.items():
+            remaining = self.refs.get(digest)
+            if remaining is None:
+                continue
+            if remaining > count:
+                self.refs[digest] = remaining - count
+            else:
+                del self.refs[digest]
+                unreferenced.append(digest)
+        if counts:
+            self.refs.commit()
+
+        for digest in unreferenced:
+            if digest in self.db:
+                del self.db[digest]
+        if unreferenced:
+            self.db.commit()
+            logger.info(f"Removed {len(unreferenced)} unreferenced chunk bodies")
+        return len(unreferenced)
+
+    def __len__(self) -> int:
+        return len(self.db)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.db
+
+    def close(self) -> None:
+        """Close the database connections."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._refs is not None:
+            self._refs.close()
+            self._refs = None
@@ -0,0 +1,152 @@
+"""Federated search across several project indexes with one query embedding."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from search.searcher import IntelligentSearcher, SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-count of the shrinkage towards the scores of all projects; indexes
+# with few candidates get close to the pooled statistics
+CALIBRATION_PRIOR_WEIGHT = 20
+# Lower bound on score spread, so near-identical candidates do not inflate z-scores
+MIN_SCORE_STD = 1e-3
+
+
+@dataclass
+class FederatedResult:
+    """A search result from one project of a federated search."""
+
+    project: str
+    calibrated_score: float
+    result: SearchResult
+
+
+@dataclass
+class FederatedSearchResponse:
+    """Merged results of a federated search."""
+
+    results: List[FederatedResult]
+    projects_searched: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+class FederatedSearcher:
+    """Fan one query out to several project indexes and merge their top-k.
+
+    The query is embedded once and the embedding is searched in every
+    project in parallel. Rank scores are not directly comparable between
+    indexes (a project full of similar boilerplate scores every query
+    high), so each project's scores are calibrated as z-scores against the
+    scores of all its candidates, shrunk towards the candidates of all
+    projects, before the results are merged.
+    """
+
+    def __init__(self, embedder: Any, max_workers: int = 8, timeout: float = 2.0):
+        """Initialize the federated searcher.
+
+        Args:
+            embedder: Embedder for the query
+            max_workers: Maximum number of projects searched at once
+            timeout: Seconds to wait for the projects after embedding the query
+        """
+        self.embedder = embedder
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='federated')
+
+    def search(
+        self,
+        query: str,
+        projects: Dict[str, Callable[[], IntelligentSearcher]],
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        context_depth: int = 0,
+        timeout: Optional[float] = None
+    ) -> FederatedSearchResponse:
+        """Search several projects and merge the results.
+
+        Projects that do not answer within the timeout are left out and
+        reported; their searches finish in the background.
+
+        Args:
+            query: Natural language query
+            projects: Project name -> function returning the project's searcher
+            k: Number of merged results
+            filters: Optional filters applied in every project
+            context_depth: Include related chunks in the merged results
+            timeout: Override for the per-query project timeout in seconds
+
+        Returns:
+            FederatedSearchResponse with the merged top-k results
+        """
+        query_embedding = self.embedder.embed_query(query.strip())
+
+        def search_project(get_searcher: Callable[[], IntelligentSearcher]):
+            searcher = get_searcher()
+            return searcher, searcher.search_scored(query, k, filters, query_embedding)
+
+        futures = {
+            self._executor.submit(search_project, get_searcher): name
+            for name, get_searcher in projects.items()
+        }
+        done, not_done = wait(futures, timeout=self.timeout if timeout is None else timeout)
+
+        response = FederatedSearchResponse(results=[])
+        scored_by_project: Dict[str, Tuple[IntelligentSearcher, List[Tuple[float, SearchResult]]]] = {}
+        for future in done:
+            name = futures[future]
+            try:
+                scored_by_project[name] = future.result()
+            except Exception as e:
+                logger.warning(f"Federated search failed for {name}: {e}")
+                response.failed[name] = str(e)
+        for future in not_done:
+            future.cancel()
+            response.timed_out.append(futures[future])
+        response.projects_searched = sorted(scored_by_project)
+        response.timed_out.sort()
+
+        calibrated = self._calibrate({name: scored for name, (_, scored) in scored_by_project.items()}, k)
+        calibrated.sort(key=lambda item: item.calibrated_score, reverse=True)
+        response.results = calibrated[:k]
+
+        for item in response.results:
+            scored_by_project[item.project][0].add_context(item.result, context_depth)
+        return response
+
+    @staticmethod
+    def _calibrate(
+        scored_by_project: Dict[str, List[Tuple[float, SearchResult]]],
+        k: int
+    ) -> List[FederatedResult]:
+        """Turn each project's top-k rank scores into calibrated z-scores."""
+        all_scores = np.array([s for scored in scored_by_project.values() for s, _ in scored], dtype=np.float64)
+        if all_scores.size == 0:
+            return []
+        prior_mean = float(all_scores.mean())
+        prior_var = float(all_scores.var())
+
+        calibrated = []
+        for name, scored in scored_by_project.items():
+            if not scored:
+                continue
+            scores = np.array([s for s, _ in scored], dtype=np.float64)
+            n = scores.size
+            weight = CALIBRATION_PRIOR_WEIGHT
+            mean = (scores.sum() + weight * prior_mean) / (n + weight)
+            var = (((scores - mean) ** 2).sum() + weight * (prior_var + (prior_mean - mean) ** 2)) / (n + weight)
+            std = max(float(np.sqrt(var)), MIN_SCORE_STD)
+            calibrated.extend(
+                FederatedResult(name, (score - mean) / std, result) for score, result in scored[:k]
+            )
+        return calibrated
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,29 @@
 """Incremental indexing using Merkle tree change detection."""
 
 import logging
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from merkle.change_detector import ChangeDetector, FileChanges
 from merkle.merkle_dag import MerkleDAG
 from merkle.snapshot_manager import SnapshotManager
+from chunking.chunk_sizing import ChunkSizeLimits
+from chunking.code_chunk import CodeChunk
 from chunking.multi_language_chunker import MultiLanguageChunker
-from embeddings.embedder import CodeEmbedder
+from embeddings.embedder import CodeEmbedder, make_chunk_id
+from search.content_store import content_hash
 from search.indexer import CodeIndexManager as Indexer
 
 logger = logging.getLogger(__name__)
 
 
+class IndexingCancelled(Exception):
+    """Raised when indexing stops early because its cancel event was set."""
+
+
 @dataclass
 class IncrementalIndexResult:
     """Result of incremental indexing operation."""
@@ -28,6 +36,7 @@ class IncrementalIndexResult:
     time_taken: float
     success: bool
     error: Optional[str] = None
+    chunks_reused: int = 0
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
@@ -37,6 +46,7 @@ class IncrementalIndexResult:
             'files_modified': self.files_modified,
             'chunks_added': self.chunks_added,
             'chunks_removed': self.chunks_removed,
+            'chunks_reused': self.chunks_reused,
             'time_taken': self.time_taken,
             'success': self.success,
             'error': self.error
@@ -51,7 +61,8 @@ class IncrementalIndexer:
         indexer: Optional[Indexer] = None,
         embedder: Optional[CodeEmbedder] = None,
         chunker: Optional[MultiLanguageChunker] = None,
-        snapshot_manager: Optional[SnapshotManager] = None
+        snapshot_manager: Optional[SnapshotManager] = None,
+        cancel_event: Optional[threading.Event] = None
     ):
         """Initialize incremental indexer.
         
@@ -60,12 +71,31 @@ class IncrementalIndexer:
             embedder: Embedder instance
             chunker: Code chunker instance
             snapshot_manager: Snapshot manager instance
+            cancel_event: Optional event that stops indexing before the index is modified
         """
         self.indexer = indexer or Indexer()
         self.embedder = embedder or CodeEmbedder()
         self.chunker = chunker or MultiLanguageChunker()
         self.snapshot_manager = snapshot_manager or SnapshotManager()
-        self.change_detector = ChangeDetector(self.snapshot_manager)
+        self.cancel_event = cancel_event
+        # Files the chunker will never index are tracked by stat metadata only
+        self.change_detector = ChangeDetector(
+            self.snapshot_manager,
+            content_filter=self.chunker.is_indexable
+        )
+    
+    def _check_cancelled(self) -> None:
+        """Raise IndexingCancelled if the cancel event is set."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise IndexingCancelled("Indexing cancelled")
+
+    def _configure_chunk_sizes(self) -> None:
+        """Size chunks to the embedding model unless the chunker has explicit limits."""
+        if self.chunker.size_limits is not None:
+            return
+        max_seq_length = self.embedder.max_seq_length
+        if max_seq_length:
+            self.chunker.set_size_limits(ChunkSizeLimits.from_max_seq_length(max_seq_length))
     
     def detect_changes(self, project_path: str) -> Tuple[FileChanges, MerkleDAG]:
         """Detect changes in project since last snapshot.
@@ -128,9 +158,11 @@ class IncrementalIndexer:
                 f"Removed: {len(changes.removed)}, Modified: {len(changes.modified)}"
             )
             
-            # Process changes
-            chunks_removed = self._remove_old_chunks(changes, project_name)
-            chunks_added = self._add_new_chunks(changes, project_path, project_name)
+            # Process changes (deleted files last, so a cancelled run leaves the index as it was)
+            chunks_added, stale_removed, chunks_reused = self._add_new_chunks(
+                changes, project_path, project_name
+            )
+            chunks_removed = self._remove_old_chunks(changes, project_name) + stale_removed
             
             # Update snapshot
             self.snapshot_manager.save_snapshot(current_dag, {
@@ -151,7 +183,8 @@ class IncrementalIndexer:
                 chunks_added=chunks_added,
                 chunks_removed=chunks_removed,
                 time_taken=time.time() - start_time,
-                success=True
+                success=True,
+                chunks_reused=chunks_reused
             )
             
         except Exception as e:
@@ -184,20 +217,18 @@ class IncrementalIndexer:
             IncrementalIndexResult
         """
         try:
-            # Clear existing index
-            self.indexer.clear_index()
-            
             # Build DAG for all files
-            dag = MerkleDAG(project_path)
-            dag.build()
+            dag = self.change_detector.build_dag(project_path)
             all_files = dag.get_all_files()
             
             # Filter supported files
             supported_files = [f for f in all_files if self.chunker.is_supported(f)]
+            self._configure_chunk_sizes()
             
             # Collect all chunks first, then embed in a single pass for efficiency
             all_chunks = []
             for file_path in supported_files:
+                self._check_cancelled()
                 full_path = Path(project_path) / file_path
                 try:
                     chunks = self.chunker.chunk_file(str(full_path))
@@ -209,14 +240,23 @@ class IncrementalIndexer:
             # Embed all chunks in one batched call
             all_embedding_results = []
             if all_chunks:
+                self._check_cancelled()
                 try:
                     all_embedding_results = self.embedder.embed_chunks(all_chunks)
-                    # Update metadata
-                    for chunk, embedding_result in zip(all_chunks, all_embedding_results):
-                        embedding_result.metadata['project_name'] = project_name
-                        embedding_result.metadata['content'] = chunk.content
                 except Exception as e:
-                    logger.warning(f"Embedding failed: {e}")
+                    # Keep the old index rather than replacing it with an empty one
+                    logger.error(f"Embedding failed: {e}")
+                    raise
+                # Update metadata
+                for chunk, embedding_result in zip(all_chunks, all_embedding_results):
+                    embedding_result.metadata['project_name'] = project_name
+                    # The body goes to the index's content store, not the metadata row
+                    embedding_result.content = chunk.content
+                    embedding_result.metadata['content_hash'] = self._content_hash(chunk.content)
+            
+            # The old index is only replaced once the new one is ready
+            self._check_cancelled()
+            self.indexer.clear_index()
             
             # Add all embeddings to index at once
             if all_embedding_results:
@@ -260,7 +300,9 @@ class IncrementalIndexer:
             )
     
     def _remove_old_chunks(self, changes: FileChanges, project_name: str) -> int:
-        """Remove chunks for deleted and modified files.
+        """Remove chunks for deleted files.
+        
+        Modified files are diffed chunk by chunk in _add_new_chunks instead.
         
         Args:
             changes: File changes
@@ -269,10 +311,9 @@ class IncrementalIndexer:
         Returns:
             Number of chunks removed
         """
-        files_to_remove = self.change_detector.get_files_to_remove(changes)
         chunks_removed = 0
         
-        for file_path in files_to_remove:
+        for file_path in sorted(changes.removed):
             # Remove from metadata
             removed = self.indexer.remove_file_chunks(file_path, project_name)
             chunks_removed += removed
@@ -280,13 +321,80 @@ class IncrementalIndexer:
         
         return chunks_removed
     
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """Hash chunk content for chunk-level change detection."""
+        return content_hash(content)
+    
+    def _chunk_key(self, chunk_type: Optional[str], parent_name: Optional[str],
+                   name: Optional[str], content_hash: str) -> Tuple:
+        """Build the structural identity used to match old and new chunks."""
+        return (chunk_type, parent_name, name, content_hash)
+    
+    def _diff_file_chunks(
+        self,
+        new_chunks: List[CodeChunk],
+        old_entries: List[Tuple[str, Dict[str, Any]]]
+    ) -> Tuple[List[CodeChunk], List[str], Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """Diff freshly chunked code against the chunks stored for the same file.
+        
+        Chunks are matched by structural name and content hash. Matched chunks
+        keep their vector; if their lines moved they get the new line numbers
+        and the id encoding them.
+        
+        Args:
+            new_chunks: Chunks produced from the current file content
+            old_entries: (chunk_id, metadata) pairs stored for the file
+            
+        Returns:
+            Tuple of (chunks to embed, stale chunk ids, metadata updates for kept
+            chunks, new ids of kept chunks whose lines moved)
+        """
+        available: Dict[Tuple, List[str]] = {}
+        for chunk_id, metadata in old_entries:
+            digest = metadata.get('content_hash')
+            if digest is None and 'content' in metadata:
+                digest = self._content_hash(metadata['content'])
+            if digest is None:
+                continue
+            key = self._chunk_key(
+                metadata.get('chunk_type'), metadata.get('parent_name'),
+                metadata.get('name'), digest
+            )
+            available.setdefault(key, []).append(chunk_id)
+        
+        to_embed = []
+        kept: Set[str] = set()
+        line_updates: Dict[str, Dict[str, Any]] = {}
+        renames: Dict[str, str] = {}
+        old_lines = {chunk_id: (m.get('start_line'), m.get('end_line')) for chunk_id, m in old_entries}
+        
+        for chunk in new_chunks:
+            key = self._chunk_key(
+                chunk.chunk_type, chunk.parent_name, chunk.name, self._content_hash(chunk.content)
+            )
+            candidates = available.get(key)
+            if not candidates:
+                to_embed.append(chunk)
+                continue
+            chunk_id = candidates.pop(0)
+            kept.add(chunk_id)
+            if old_lines[chunk_id] != (chunk.start_line, chunk.end_line):
+                line_updates[chunk_id] = {'start_line': chunk.start_line, 'end_line': chunk.end_line}
+            new_id = make_chunk_id(chunk)
+            if new_id != chunk_id:
+                renames[chunk_id] = new_id
+        
+        stale = [chunk_id for chunk_id, _ in old_entries if chunk_id not in kept]
+        return to_embed, stale, line_updates, renames
+    
     def _add_new_chunks(
         self,
         changes: FileChanges,
         project_path: str,
         project_name: str
-    ) -> int:
-        """Add chunks for new and modified files.
+    ) -> Tuple[int, int, int]:
+        """Add chunks for new files and diff chunks of modified files.
         
         Args:
             changes: File changes
@@ -294,40 +402,87 @@ class IncrementalIndexer:
             project_name: Project name
             
         Returns:
-            Number of chunks added
+            Tuple of (chunks added, stale chunks removed, chunks reused)
         """
         files_to_index = self.change_detector.get_files_to_reindex(changes)
         
         # Filter supported files
         supported_files = [f for f in files_to_index if self.chunker.is_supported(f)]
+        modified = set(changes.modified)
+        if supported_files:
+            self._configure_chunk_sizes()
+        
+        # Look up stored chunks of all modified files in a single pass
+        lookup = {}
+        for file_path in supported_files:
+            if file_path in modified:
+                lookup[file_path] = file_path
+                lookup[str(Path(project_path) / file_path)] = file_path
+        old_by_file: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        if lookup:
+            found = self.indexer.get_chunks_for_files(lookup.keys(), project_name)
+            for key, entries in found.items():
+                old_by_file.setdefault(lookup[key], []).extend(entries)
         
         # Collect all chunks first, then embed in a single pass
         chunks_to_embed = []
+        stale_ids: List[str] = []
+        line_updates: Dict[str, Dict[str, Any]] = {}
+        renames: Dict[str, str] = {}
+        kept_ids: Set[str] = set()
         for file_path in supported_files:
+            self._check_cancelled()
             full_path = Path(project_path) / file_path
+            chunks = []
             try:
                 chunks = self.chunker.chunk_file(str(full_path))
-                if chunks:
-                    chunks_to_embed.extend(chunks)
             except Exception as e:
                 logger.warning(f"Failed to chunk {file_path}: {e}")
-
+            
+            if file_path not in modified:
+                chunks_to_embed.extend(chunks)
+                continue
+            
+            old_entries = old_by_file.get(file_path, [])
+            new_chunks, stale, updates, moved = self._diff_file_chunks(chunks, old_entries)
+            chunks_to_embed.extend(new_chunks)
+            stale_ids.extend(stale)
+            line_updates.update(updates)
+            renames.update(moved)
+            kept_ids.update(chunk_id for chunk_id, _ in old_entries if chunk_id not in stale)
+            logger.debug(
+                f"{file_path}: {len(new_chunks)} new/changed chunks, "
+                f"{len(old_entries) - len(stale)} reused, {len(stale)} stale"
+            )
+        
         all_embedding_results = []
         if chunks_to_embed:
+            self._check_cancelled()
             try:
-                all_embedding_results = self.embedder.embed_chunks(chunks_to_embed)
-                # Update metadata
-                for chunk, embedding_result in zip(chunks_to_embed, all_embedding_results):
-                    embedding_result.metadata['project_name'] = project_name
-                    embedding_result.metadata['content'] = chunk.content
+                # Chunks identical to ones already indexed reuse their vectors
+                all_embedding_results = self.embedder.embed_chunks(chunks_to_embed, reuse=self.indexer.get_vector)
             except Exception as e:
-                logger.warning(f"Embedding failed: {e}")
+                # Leave the index and snapshot as they were, so the next run retries these files
+                logger.error(f"Embedding failed: {e}")
+                raise
+            # Update metadata
+            for chunk, embedding_result in zip(chunks_to_embed, all_embedding_results):
+                embedding_result.metadata['project_name'] = project_name
+                embedding_result.content = chunk.content
+                embedding_result.metadata['content_hash'] = self._content_hash(chunk.content)
+        
+        # Modified files are only updated once their new chunks are embedded.
+        # Stale ids are freed first, so kept chunks and new ones can take them.
+        self._check_cancelled()
+        stale_removed = self.indexer.remove_chunks(stale_ids)
+        self.indexer.update_chunk_metadata(line_updates)
+        self.indexer.rename_chunks(renames)
         
         # Add all embeddings to index at once
         if all_embedding_results:
             self.indexer.add_embeddings(all_embedding_results)
         
-        return len(all_embedding_results)
+        return len(all_embedding_results), stale_removed, len(kept_ids)
     
     
     def get_indexing_stats(self, project_path: str) -> Optional[Dict]:
@@ -0,0 +1,180 @@
+"""LRU pool of per-project index managers for serving several projects at once."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from search.indexer import CodeIndexManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledIndex:
+    """Index manager of one project plus objects built on top of it."""
+
+    project_path: str
+    index_manager: CodeIndexManager
+    # Searcher for this project, created by the pool's user on first search
+    searcher: Optional[Any] = None
+    last_used: float = field(default_factory=time.monotonic)
+    # Estimated bytes of the loaded index, refreshed on every get()
+    memory_usage: int = 0
+
+
+class IndexPool:
+    """Keep the index managers of recently used projects loaded.
+
+    Projects are kept in least-recently-used order. When the pool holds more
+    than max_projects, or the loaded indexes exceed memory_budget bytes, the
+    least recently used projects are dropped; projects idle for longer than
+    idle_timeout seconds are dropped as well. Dropped managers are not closed
+    explicitly, since a concurrent call may still hold them; they release
+    their FAISS index and database when the last reference goes away.
+
+    The memory budget is checked against the estimate each project had when
+    it was last fetched. Only the requested project's estimate is refreshed,
+    outside the pool lock, so a manager busy with a long update never holds
+    up lookups of other projects.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], CodeIndexManager],
+        max_projects: int = 8,
+        memory_budget: int = 2 * 1024 ** 3,
+        idle_timeout: Optional[float] = 30 * 60
+    ):
+        """Initialize the pool.
+
+        Args:
+            loader: Creates the index manager of a project path
+            max_projects: Maximum number of projects kept
+            memory_budget: Maximum estimated bytes of loaded indexes
+            idle_timeout: Seconds after which unused projects are dropped (None to keep them)
+        """
+        self.loader = loader
+        self.max_projects = max_projects
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[str, PooledIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(project_path: str) -> str:
+        return str(Path(project_path).resolve())
+
+    def get(self, project_path: str) -> PooledIndex:
+        """Get the pooled index of a project, loading it if needed.
+
+        Args:
+            project_path: Project root path
+
+        Returns:
+            PooledIndex of the project
+        """
+        key = self._key(project_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            else:
+                entry = PooledIndex(key, self.loader(key))
+                self._entries[key] = entry
+                self.loads += 1
+            entry.last_used = time.monotonic()
+            self._evict(keep=key)
+
+        memory_usage = entry.index_manager.memory_usage()
+        with self._lock:
+            entry.memory_usage = memory_usage
+            self._evict_over_budget(keep=key)
+        return entry
+
+    def discard(self, project_path: str) -> None:
+        """Drop a project from the pool.
+
+        Args:
+            project_path: Project root path
+        """
+        with self._lock:
+            self._entries.pop(self._key(project_path), None)
+
+    def evict_idle(self) -> List[str]:
+        """Drop projects that were not used within idle_timeout.
+
+        Returns:
+            Paths of the dropped projects
+        """
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the pooled indexes in bytes, as of their last get()."""
+        with self._lock:
+            return sum(entry.memory_usage for entry in self._entries.values())
+
+    def projects(self) -> List[str]:
+        """Get the pooled project paths, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, project_path: str) -> bool:
+        with self._lock:
+            return self._key(project_path) in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics.
+
+        Returns:
+            Dictionary with pooled projects, memory usage and counters
+        """
+        with self._lock:
+            return {
+                'projects': list(self._entries),
+                'memory_usage': sum(entry.memory_usage for entry in self._entries.values()),
+                'memory_budget': self.memory_budget,
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
+
+    def _evict_idle(self, now: float, keep: Optional[str] = None) -> List[str]:
+        if self.idle_timeout is None:
+            return []
+        idle = [
+            key for key, entry in self._entries.items()
+            if key != keep and now - entry.last_used > self.idle_timeout
+        ]
+        for key in idle:
+            self._drop(key, 'idle')
+        return idle
+
+    def _evict(self, keep: str) -> None:
+        self._evict_idle(time.monotonic(), keep)
+
+        while len(self._entries) > self.max_projects:
+            self._drop(next(iter(self._entries)), 'project limit')
+
+    def _evict_over_budget(self, keep: str) -> None:
+        total = sum(entry.memory_usage for entry in self._entries.values())
+        for key, entry in list(self._entries.items()):
+            if total <= self.memory_budget:
+                break
+            if key != keep:
+                total -= entry.memory_usage
+                self._drop(key, 'memory budget')
+
+    def _drop(self, key: str, reason: str) -> None:
+        del self._entries[key]
+        self.evictions += 1
+        logger.info(f"Evicted index of {Path(key).name} from pool ({reason})")
@@ -4,20 +4,101 @@ import os
 import json
 import pickle
 import logging
+import tempfile
+import functools
+import itertools
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import asdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from dataclasses import asdict, dataclass
 import numpy as np
 import faiss
 from sqlitedict import SqliteDict
 from embeddings.embedder import EmbeddingResult
 from chunking.code_chunk import CodeChunk
+from search.bm25 import BM25Index, chunk_tokens, normalize_to_tokens, path_tokens
+from search.content_store import ContentStore, content_hash
+from search.knn_graph import DEFAULT_NEIGHBORS, KnnGraph
+
+
+def _synchronized(method):
+    """Run a CodeIndexManager method under the manager's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Source of index generations, unique across all managers of the process
+_GENERATIONS = itertools.count(1)
+
+# Initial candidates per wanted result, and growth factor of each expansion
+OVERFETCH_FACTOR = 3
+EXPANSION_FACTOR = 4
+
+# Element types new indexes can store vectors as
+VECTOR_DTYPES = ("float32", "float16")
+
+
+def _count_content_hash(counts: Dict[str, int], metadata: Dict[str, Any]) -> None:
+    """Count a chunk's reference to its stored body, if it has one."""
+    digest = metadata.get('content_hash')
+    if digest:
+        counts[digest] = counts.get(digest, 0) + 1
+
+
+def _id_bytes(chunk_ids: Iterable[str]) -> int:
+    """Estimate the memory of chunk id strings kept in the id lists."""
+    return sum(len(chunk_id) + 56 for chunk_id in chunk_ids)
+
+
+def _embedding_matrix(embeddings: List[np.ndarray]) -> np.ndarray:
+    """Get embeddings as one float32 matrix, without copying them if possible.
+    
+    Embeddings that are consecutive rows of one C-contiguous float32 matrix
+    (as returned by CodeEmbedder.embed_chunks) are viewed as that block of
+    rows; anything else is copied into a new matrix.
+    """
+    base = embeddings[0].base
+    if isinstance(base, np.ndarray) and base.ndim == 2 and base.dtype == np.float32 and base.flags.c_contiguous:
+        row_bytes = base.strides[0]
+        start, offset = divmod(embeddings[0].ctypes.data - base.ctypes.data, row_bytes)
+        block = base[start:start + len(embeddings)]
+        first_row = block.ctypes.data
+        if not offset and len(block) == len(embeddings) and all(
+            embedding.base is base and embedding.ctypes.data == first_row + i * row_bytes
+            for i, embedding in enumerate(embeddings)
+        ):
+            return block
+    return np.array(embeddings, dtype=np.float32)
+
+
+@dataclass
+class SearchStats:
+    """How much of the index filtered searches had to scan."""
+    # Times the candidate count was widened because filters dropped too many
+    expansions: int = 0
+    # Largest number of candidates fetched per query
+    candidates: int = 0
+    # Queries that scanned the whole index and still found fewer results than wanted
+    exhausted: int = 0
 
 
 class CodeIndexManager:
     """Manages FAISS vector index and metadata storage for code chunks."""
     
-    def __init__(self, storage_dir: str):
+    def __init__(self, storage_dir: str, vector_dtype: str = "float32"):
+        """Initialize the manager.
+        
+        Args:
+            storage_dir: Directory of the index files
+            vector_dtype: Element type of the vectors of new indexes, "float32"
+                or "float16" (half the memory; existing indexes keep theirs)
+        """
+        if vector_dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+        self.vector_dtype = vector_dtype
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         
@@ -26,15 +107,45 @@ class CodeIndexManager:
         self.metadata_path = self.storage_dir / "metadata.db" 
         self.chunk_id_path = self.storage_dir / "chunk_ids.pkl"
         self.stats_path = self.storage_dir / "stats.json"
+        self.bm25_path = self.storage_dir / "bm25.pkl"
+        self.content_path = self.storage_dir / "content.db"
+        self.shared_vectors_path = self.storage_dir / "shared_vectors.pkl"
+        self.knn_graph_path = self.storage_dir / "knn_graph.npz"
         
         # Initialize components
         self._index = None
         self._metadata_db = None
+        self._bm25 = None
+        self._knn_graph = None
+        self._content_store = ContentStore(self.content_path)
         self._chunk_ids = []
+        # Chunks with identical embedding inputs share one vector: embedding
+        # hash -> vector position, and position -> chunk ids besides _chunk_ids[position]
+        self._vector_slots: Dict[str, int] = {}
+        self._shared_chunk_ids: Dict[int, List[str]] = {}
+        # Running estimate of _id_bytes() over both id lists, kept by every update
+        self._chunk_id_bytes = 0
         self._logger = logging.getLogger(__name__)
         self._on_gpu = False
+        # Searches and updates may come from concurrent tool calls
+        self._lock = threading.RLock()
+        self._generation = next(_GENERATIONS)
         
     @property
+    def generation(self) -> int:
+        """Number identifying the current index contents.
+        
+        It changes with every committed add, update or removal, and differs
+        between managers, so results computed at one generation stay valid
+        exactly as long as the generation is unchanged.
+        """
+        return self._generation
+    
+    def _bump_generation(self) -> None:
+        self._generation = next(_GENERATIONS)
+        
+    @property
+    @_synchronized
     def index(self):
         """Lazy loading of FAISS index."""
         if self._index is None:
@@ -42,6 +153,7 @@ class CodeIndexManager:
         return self._index
     
     @property
+    @_synchronized
     def metadata_db(self):
         """Lazy loading of metadata database."""
         if self._metadata_db is None:
@@ -52,11 +164,37 @@ class CodeIndexManager:
             )
         return self._metadata_db
     
+    @property
+    @_synchronized
+    def bm25(self) -> BM25Index:
+        """Lazy loading of the BM25 index, rebuilt from metadata for older indexes."""
+        if self._bm25 is None:
+            if self.bm25_path.exists():
+                self._bm25 = BM25Index.load(self.bm25_path)
+            else:
+                self._bm25 = BM25Index()
+                _ = self.index
+                for chunk_id in self._all_chunk_ids():
+                    metadata_entry = self.metadata_db.get(chunk_id)
+                    if metadata_entry:
+                        self._bm25.add(chunk_id, chunk_tokens(metadata_entry['metadata']))
+        return self._bm25
+    
+    @property
+    @_synchronized
+    def knn_graph(self) -> Optional[KnnGraph]:
+        """Lazy loading of the nearest-neighbour graph, if one was built."""
+        if self._knn_graph is None and self.knn_graph_path.exists():
+            self._knn_graph = KnnGraph.load(self.knn_graph_path)
+        return self._knn_graph
+    
     def _load_index(self):
         """Load existing FAISS index or create new one."""
         if self.index_path.exists():
             self._logger.info(f"Loading existing index from {self.index_path}")
             self._index = faiss.read_index(str(self.index_path))
+            # Indexes saved without a direct map get one before leaving the CPU
+            self._ensure_direct_map()
             # If GPU support is available, optionally move to GPU for runtime speed
             self._maybe_move_index_to_gpu()
             
@@ -64,67 +202,161 @@ class CodeIndexManager:
             if self.chunk_id_path.exists():
                 with open(self.chunk_id_path, 'rb') as f:
                     self._chunk_ids = pickle.load(f)
+            if self.shared_vectors_path.exists():
+                with open(self.shared_vectors_path, 'rb') as f:
+                    shared_vectors = pickle.load(f)
+                self._vector_slots = shared_vectors['slots']
+                self._shared_chunk_ids = shared_vectors['shared']
+            self._chunk_id_bytes = _id_bytes(itertools.chain(self._chunk_ids, *self._shared_chunk_ids.values()))
         else:
             self._logger.info("Creating new index")
             # Create a new index - we'll initialize it when we get the first embedding
             self._index = None
             self._chunk_ids = []
+            self._vector_slots = {}
+            self._shared_chunk_ids = {}
+            self._chunk_id_bytes = 0
     
     def create_index(self, embedding_dimension: int, index_type: str = "flat"):
-        """Create a new FAISS index."""
+        """Create a new FAISS index storing vectors as self.vector_dtype."""
+        # float16 vectors are scanned with FAISS's SIMD fp16 distance kernels
+        fp16 = self.vector_dtype == "float16"
         if index_type == "flat":
             # Simple flat index for exact search
-            self._index = faiss.IndexFlatIP(embedding_dimension)  # Inner product (cosine similarity)
+            if fp16:
+                self._index = faiss.IndexScalarQuantizer(
+                    embedding_dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                self._index = faiss.IndexFlatIP(embedding_dimension)  # Inner product (cosine similarity)
         elif index_type == "ivf":
             # IVF index for faster approximate search on large datasets
             quantizer = faiss.IndexFlatIP(embedding_dimension)
             n_centroids = min(100, max(10, embedding_dimension // 8))  # Adaptive number of centroids
-            self._index = faiss.IndexIVFFlat(quantizer, embedding_dimension, n_centroids)
+            if fp16:
+                self._index = faiss.IndexIVFScalarQuantizer(
+                    quantizer, embedding_dimension, n_centroids,
+                    faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                self._index = faiss.IndexIVFFlat(quantizer, embedding_dimension, n_centroids)
         else:
             raise ValueError(f"Unsupported index type: {index_type}")
         
-        self._logger.info(f"Created {index_type} index with dimension {embedding_dimension}")
+        self._logger.info(f"Created {index_type} {self.vector_dtype} index with dimension {embedding_dimension}")
+        self._ensure_direct_map()
         self._maybe_move_index_to_gpu()
     
+    def _ensure_direct_map(self) -> None:
+        """Let IVF indexes reconstruct stored vectors by position.
+        
+        similarities() and the other lookups of stored vectors call
+        reconstruct(), which IVF indexes only support with a direct map.
+        The map is kept up to date by later adds and saved with the index.
+        """
+        ivf = faiss.try_extract_index_ivf(self._index) if self._index is not None else None
+        if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+            ivf.make_direct_map()
+    
+    @_synchronized
     def add_embeddings(self, embedding_results: List[EmbeddingResult]) -> None:
-        """Add embeddings to the index and metadata to the database."""
+        """Add embeddings to the index and metadata to the database.
+        
+        Results whose metadata carries an ``embedding_hash`` already in the
+        index (or earlier in the batch) share that vector instead of adding
+        their own; searches expand a shared vector into all its chunks.
+        
+        Embeddings that are consecutive rows of one float32 matrix (as from
+        CodeEmbedder.embed_chunks) are normalized in place rather than copied.
+        This modifies the caller's arrays: afterwards those rows, and with them
+        the embeddings of duplicates sharing a row, have unit length. Other
+        embeddings are copied and left as they were.
+        """
         if not embedding_results:
             return
         
-        # Initialize index if needed
-        if self._index is None:
+        # Initialize index if needed (loading any existing one first)
+        if self.index is None:
             embedding_dim = embedding_results[0].embedding.shape[0]
             # Default to flat index for better recall - only use IVF for very large datasets
             index_type = "ivf" if len(embedding_results) > 10000 else "flat"
             self.create_index(embedding_dim, index_type)
         
-        # Prepare embeddings and metadata
-        embeddings = np.array([result.embedding for result in embedding_results])
-        
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings)
-        
-        # Train IVF index if needed
-        if hasattr(self._index, 'is_trained') and not self._index.is_trained:
-            self._logger.info("Training IVF index...")
-            self._index.train(embeddings)
-        
-        # Add to FAISS index
+        # Assign every result a vector position, adding only unseen embedding inputs
         start_id = len(self._chunk_ids)
-        self._index.add(embeddings)
+        new_results = []
+        slots = []
+        for result in embedding_results:
+            embedding_hash = result.metadata.get('embedding_hash')
+            slot = self._vector_slots.get(embedding_hash) if embedding_hash else None
+            if slot is None:
+                slot = start_id + len(new_results)
+                new_results.append(result)
+                if embedding_hash:
+                    self._vector_slots[embedding_hash] = slot
+            else:
+                primary = self._chunk_ids[slot] if slot < start_id else new_results[slot - start_id].chunk_id
+                if result.chunk_id != primary and result.chunk_id not in self._shared_chunk_ids.get(slot, ()):
+                    self._shared_chunk_ids.setdefault(slot, []).append(result.chunk_id)
+                    self._chunk_id_bytes += _id_bytes([result.chunk_id])
+            slots.append(slot)
+        
+        if new_results:
+            # Prepare embeddings
+            embeddings = _embedding_matrix([result.embedding for result in new_results])
+            
+            # Normalize embeddings for cosine similarity
+            faiss.normalize_L2(embeddings)
+            
+            # Train IVF index if needed
+            if hasattr(self._index, 'is_trained') and not self._index.is_trained:
+                self._logger.info("Training IVF index...")
+                self._index.train(embeddings)
+            
+            # Add to FAISS index
+            self._index.add(embeddings)
+            self._chunk_ids.extend(result.chunk_id for result in new_results)
+            self._chunk_id_bytes += _id_bytes(result.chunk_id for result in new_results)
         
-        # Store metadata and update chunk IDs
-        for i, result in enumerate(embedding_results):
+        # Store metadata
+        bm25 = self.bm25
+        contents = {}
+        references: Dict[str, int] = {}
+        replaced: Dict[str, int] = {}
+        for result, slot in zip(embedding_results, slots):
             chunk_id = result.chunk_id
-            self._chunk_ids.append(chunk_id)
+            
+            # Chunk bodies go to the content store; metadata rows keep their hash
+            content = result.metadata.pop('content', None)
+            if result.content is not None:
+                content = result.content
+            if content is not None:
+                digest = result.metadata.setdefault('content_hash', content_hash(content))
+                contents[digest] = content
+            _count_content_hash(references, result.metadata)
+            # A re-added chunk no longer refers to the body of its old row
+            previous = self.metadata_db.get(chunk_id)
+            if previous is not None:
+                _count_content_hash(replaced, previous['metadata'])
+            
+            # Tokens used by the searcher's re-ranking, computed once here
+            result.metadata['name_tokens'] = normalize_to_tokens(result.metadata.get('name') or '')
+            result.metadata['path_tokens'] = path_tokens(result.metadata.get('relative_path') or '')
             
             # Store in metadata database
             self.metadata_db[chunk_id] = {
-                'index_id': start_id + i,
+                'index_id': slot,
                 'metadata': result.metadata
             }
+            bm25.add(chunk_id, chunk_tokens(result.metadata, content))
+        
+        self._content_store.add_references(contents, references)
+        self._content_store.release(replaced)
         
-        self._logger.info(f"Added {len(embedding_results)} embeddings to index")
+        self._logger.info(
+            f"Added {len(embedding_results)} embeddings to index "
+            f"({len(new_results)} new vectors, {len(embedding_results) - len(new_results)} shared)"
+        )
         
         # Commit metadata in a single transaction for performance
         try:
@@ -132,6 +364,7 @@ class CodeIndexManager:
         except Exception:
             # If commit is unavailable for some reason, continue without failing
             pass
+        self._bump_generation()
         
         # Update statistics
         self._update_stats()
@@ -166,54 +399,236 @@ class CodeIndexManager:
         self, 
         query_embedding: np.ndarray, 
         k: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        min_results: Optional[int] = None,
+        stats: Optional[SearchStats] = None,
+        collapse_duplicates: bool = False
     ) -> List[Tuple[str, float, Dict[str, Any]]]:
         """Search for similar code chunks."""
+        return self.search_many(
+            np.asarray(query_embedding).reshape(1, -1), k, filters, min_results, stats, collapse_duplicates
+        )[0]
+    
+    @_synchronized
+    def search_many(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        min_results: Optional[int] = None,
+        stats: Optional[SearchStats] = None,
+        collapse_duplicates: bool = False
+    ) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """Search for similar code chunks of several queries in one FAISS call.
+        
+        Filters and removed chunks drop candidates after the FAISS search, so
+        queries left with fewer than min_results results are searched again
+        with geometrically more candidates until enough pass or the whole
+        index has been scanned.
+        
+        A vector shared by identical chunks yields a result for each of
+        them, unless collapse_duplicates is set: then only the first
+        matching chunk is returned, with the ids of the others under the
+        ``duplicate_chunk_ids`` metadata key.
+        
+        Args:
+            query_embeddings: Query embeddings, one per row
+            k: Number of results per query
+            filters: Optional filters applied to every query
+            min_results: Results per query worth widening the search for (default: k)
+            stats: Optional SearchStats updated with the expansions needed
+            collapse_duplicates: Return one result per shared vector
+            
+        Returns:
+            List of (chunk_id, similarity, metadata) lists, one per query
+        """
         import logging
         logger = logging.getLogger(__name__)
         
-        logger.info(f"Index manager search called with k={k}, filters={filters}")
+        logger.info(f"Index manager search called with {len(query_embeddings)} queries, k={k}, filters={filters}")
         
         # Use property to trigger lazy loading
         index = self.index
         if index is None or index.ntotal == 0:
             logger.warning(f"Index is empty or None. Index: {index}, ntotal: {index.ntotal if index else 'N/A'}")
-            return []
+            return [[] for _ in range(len(query_embeddings))]
         
         logger.info(f"Index has {index.ntotal} total vectors")
         
-        # Normalize query embedding
-        query_embedding = query_embedding.reshape(1, -1)
-        faiss.normalize_L2(query_embedding)
+        # Normalize a copy, callers may reuse their embeddings
+        query_embeddings = np.array(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        faiss.normalize_L2(query_embeddings)
         
-        # Search in FAISS index
-        search_k = min(k * 3, index.ntotal)  # Get more results for filtering
-        similarities, indices = index.search(query_embedding, search_k)
+        min_results = k if min_results is None else min(min_results, k)
+        search_k = min(k * OVERFETCH_FACTOR, index.ntotal)  # Get more results for filtering
+        results: List[List[Tuple[str, float, Dict[str, Any]]]] = [[] for _ in range(len(query_embeddings))]
+        pending = list(range(len(query_embeddings)))
+        expansions = 0
         
+        while True:
+            similarities, indices = index.search(query_embeddings[pending], search_k)
+            short = []
+            for row, row_similarities, row_indices in zip(pending, similarities, indices):
+                results[row] = self._collect_results(row_similarities, row_indices, k, filters, collapse_duplicates)
+                if len(results[row]) < min_results:
+                    short.append(row)
+            
+            if not short or search_k >= index.ntotal:
+                break
+            pending = short
+            search_k = min(search_k * EXPANSION_FACTOR, index.ntotal)
+            expansions += 1
+        
+        if expansions:
+            logger.info(f"Widened search {expansions} times to {search_k} candidates, {len(short)} queries still short")
+        if stats is not None:
+            stats.expansions += expansions
+            stats.candidates = max(stats.candidates, search_k)
+            stats.exhausted += len(short)
+        return results
+    
+    def _collect_results(
+        self,
+        similarities: np.ndarray,
+        indices: np.ndarray,
+        k: int,
+        filters: Optional[Dict[str, Any]],
+        collapse_duplicates: bool = False
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Turn one row of FAISS hits into filtered results with metadata."""
         results = []
-        for i, (similarity, index_id) in enumerate(zip(similarities[0], indices[0])):
+        for similarity, index_id in zip(similarities, indices):
             if index_id == -1:  # No more results
                 break
             
-            chunk_id = self._chunk_ids[index_id]
+            # A shared vector stands for every chunk with the same embedding input
+            head = None
+            for chunk_id, metadata in self._live_slot_chunks(index_id):
+                # Apply filters
+                if filters and not self._matches_filters(metadata, filters):
+                    continue
+                
+                if collapse_duplicates and head is not None:
+                    head.setdefault('duplicate_chunk_ids', []).append(chunk_id)
+                    continue
+                head = metadata
+                results.append((chunk_id, float(similarity), metadata))
+                
+                if len(results) >= k and not collapse_duplicates:
+                    return results
+            
+            if len(results) >= k:
+                break
+        
+        return results
+    
+    def _slot_chunk_ids(self, slot: int) -> List[str]:
+        """Chunk ids that were stored with the vector at a position."""
+        shared = self._shared_chunk_ids.get(slot)
+        return [self._chunk_ids[slot], *shared] if shared else [self._chunk_ids[slot]]
+    
+    def _live_slot_chunks(self, slot: int) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """(chunk_id, metadata) of the chunks currently stored with a vector."""
+        for chunk_id in self._slot_chunk_ids(slot):
             metadata_entry = self.metadata_db.get(chunk_id)
             
             if metadata_entry is None:
                 continue
             
-            metadata = metadata_entry['metadata']
-            
-            # Apply filters
-            if filters and not self._matches_filters(metadata, filters):
+            # Skip stale vectors whose chunk id was re-added at a new position
+            if metadata_entry.get('index_id', slot) != slot:
                 continue
             
-            results.append((chunk_id, float(similarity), metadata))
+            yield chunk_id, metadata_entry['metadata']
+    
+    def _all_chunk_ids(self) -> Iterable[str]:
+        """Every chunk id ever stored, each once, including chunks sharing a vector."""
+        return dict.fromkeys(itertools.chain(self._chunk_ids, *self._shared_chunk_ids.values()))
+    
+    @_synchronized
+    def get_vector(self, embedding_hash: str) -> Optional[np.ndarray]:
+        """Get the stored vector of an embedding input, if any chunk added it.
+        
+        Only this index is consulted, so vectors are shared between the
+        chunks of one project but never across projects.
+        
+        Args:
+            embedding_hash: Hash of the text the vector was embedded from
             
+        Returns:
+            The normalized vector, or None when it is unknown or cannot be read
+        """
+        index = self.index
+        slot = self._vector_slots.get(embedding_hash)
+        if index is None or slot is None or slot >= index.ntotal:
+            return None
+        try:
+            return index.reconstruct(slot)
+        except RuntimeError as e:
+            # e.g. GPU IVF indexes, which keep no direct map; callers embed again
+            self._logger.warning(f"Cannot read the vector of {embedding_hash}: {e}")
+            return None
+    
+    @_synchronized
+    def lexical_search(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Search chunks by BM25 over identifier-split tokens.
+        
+        Args:
+            query: Query text or identifier
+            k: Number of results
+            filters: Optional filters
+            
+        Returns:
+            List of (chunk_id, BM25 score, metadata), best first
+        """
+        results = []
+        for chunk_id, score in self.bm25.search(normalize_to_tokens(query)):
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if metadata_entry is None:
+                continue
+            metadata = metadata_entry['metadata']
+            if filters and not self._matches_filters(metadata, filters):
+                continue
+            results.append((chunk_id, score, metadata))
             if len(results) >= k:
                 break
-        
         return results
     
+    @_synchronized
+    def similarities(self, query_embedding: np.ndarray, chunk_ids: List[str]) -> List[float]:
+        """Compute the cosine similarity of a query to specific chunks.
+        
+        Args:
+            query_embedding: Query embedding
+            chunk_ids: Chunk IDs to score
+            
+        Returns:
+            Similarity per chunk id (0.0 for chunks without a readable vector)
+        """
+        index = self.index
+        query = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+        scores = []
+        for chunk_id in chunk_ids:
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if index is None or metadata_entry is None or metadata_entry['index_id'] >= index.ntotal:
+                scores.append(0.0)
+                continue
+            try:
+                vector = index.reconstruct(metadata_entry['index_id'])
+            except RuntimeError as e:
+                # e.g. GPU IVF indexes, which keep no direct map
+                self._logger.warning(f"Cannot read the vector of {chunk_id}: {e}")
+                scores.append(0.0)
+                continue
+            scores.append(float(query[0] @ vector))
+        return scores
+    
     def _matches_filters(self, metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """Check if metadata matches the provided filters."""
         for key, value in filters.items():
@@ -249,18 +664,53 @@ class CodeIndexManager:
         metadata_entry = self.metadata_db.get(chunk_id)
         return metadata_entry['metadata'] if metadata_entry else None
     
+    @_synchronized
+    def get_chunk_content(self, chunk_id: str) -> Optional[str]:
+        """Fetch the full source of a chunk from the content store.
+        
+        Args:
+            chunk_id: Chunk ID
+            
+        Returns:
+            The chunk's source, or None if unknown or indexed without content
+        """
+        metadata = self.get_chunk_by_id(chunk_id)
+        if metadata is None:
+            return None
+        # Indexes written before the content store kept bodies inline
+        if 'content' in metadata:
+            return metadata['content']
+        digest = metadata.get('content_hash')
+        return self._content_store.get(digest) if digest else None
+    
+    @_synchronized
     def get_similar_chunks(self, chunk_id: str, k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
-        """Find chunks similar to a given chunk."""
+        """Find chunks similar to a given chunk.
+        
+        Answered from the nearest-neighbour graph when it covers the whole
+        index and holds enough live neighbours, otherwise by a search.
+        """
         metadata_entry = self.metadata_db.get(chunk_id)
         if not metadata_entry:
             return []
         
+        index = self.index
         index_id = metadata_entry['index_id']
-        if self._index is None or index_id >= self._index.ntotal:
+        if index is None or index_id >= index.ntotal:
             return []
         
+        graph = self._current_knn_graph()
+        if graph is not None:
+            similarities, neighbors = graph.row(index_id)
+            results = [
+                (cid, sim, meta) for cid, sim, meta in self._collect_results(similarities, neighbors, k + 1, None)
+                if cid != chunk_id
+            ][:k]
+            if len(results) == k:
+                return results
+        
         # Get the embedding for this chunk
-        embedding = self._index.reconstruct(index_id)
+        embedding = index.reconstruct(index_id)
         
         # Search for similar chunks (excluding the original)
         results = self.search(embedding, k + 1)
@@ -268,6 +718,255 @@ class CodeIndexManager:
         # Filter out the original chunk
         return [(cid, sim, meta) for cid, sim, meta in results if cid != chunk_id][:k]
     
+    def _current_knn_graph(self) -> Optional[KnnGraph]:
+        """The nearest-neighbour graph, if it covers every vector of the index."""
+        graph = self.knn_graph
+        index = self.index
+        if graph is None or index is None or len(graph) != index.ntotal:
+            return None
+        return graph
+    
+    def build_knn_graph(self, k: Optional[int] = None, batch_size: int = 1024) -> Optional[KnnGraph]:
+        """Compute and save the nearest neighbours of every vector.
+        
+        The graph is built from a copy of the index taken under the lock,
+        so searches and updates go on during the build. It replaces the
+        current graph once complete, unless the index was cleared meanwhile.
+        
+        Args:
+            k: Neighbours kept per vector (default: as many as the current
+                graph keeps, at least DEFAULT_NEIGHBORS)
+            batch_size: Vectors searched per FAISS call
+            
+        Returns:
+            The graph, or None for an empty or cleared index
+        """
+        with self._lock:
+            index = self.index
+            if index is None or index.ntotal == 0:
+                return None
+            if k is None:
+                graph = self.knn_graph
+                k = max(DEFAULT_NEIGHBORS, graph.width - 1) if graph is not None else DEFAULT_NEIGHBORS
+            snapshot = faiss.index_gpu_to_cpu(index) if self._on_gpu else faiss.clone_index(index)
+        
+        graph = KnnGraph.build(snapshot, k, batch_size)
+        fd, temp_path = tempfile.mkstemp(dir=self.storage_dir, suffix='.npz')
+        os.close(fd)
+        try:
+            graph.save(Path(temp_path))
+            with self._lock:
+                if self._index is not index:
+                    self._logger.info("Index was cleared during the k-NN graph build; graph discarded")
+                    return None
+                os.replace(temp_path, self.knn_graph_path)
+                self._knn_graph = graph
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return graph
+    
+    def refresh_knn_graph(self) -> Optional[KnnGraph]:
+        """Rebuild the nearest-neighbour graph if one exists but no longer covers the index.
+        
+        Returns:
+            The current graph, or None if none was built
+        """
+        with self._lock:
+            if self.knn_graph is None or self._current_knn_graph() is not None:
+                return self._knn_graph
+        return self.build_knn_graph()
+    
+    @_synchronized
+    def find_duplicate_clusters(
+        self,
+        threshold: float = 0.95,
+        min_size: int = 2
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Group chunks whose vectors are near-duplicates of each other.
+        
+        Uses the nearest-neighbour graph, which is never built here: build
+        it with build_knn_graph() first. Chunks sharing a vector (identical
+        copies) are always in one cluster.
+        
+        Args:
+            threshold: Minimum cosine similarity linking two chunks
+            min_size: Minimum number of chunks per cluster
+            
+        Returns:
+            Clusters, largest first, as dictionaries with 'similarity' (the
+            weakest link of the cluster) and 'chunks' ((chunk_id, metadata)
+            pairs); None if no graph covers the current index
+        """
+        index = self.index
+        if index is None or index.ntotal == 0:
+            return []
+        graph = self._current_knn_graph()
+        if graph is None:
+            return None
+        
+        chunks_by_slot: Dict[int, List[Tuple[str, Dict[str, Any]]]] = {}
+        for chunk_id in self._all_chunk_ids():
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if metadata_entry is not None:
+                chunks_by_slot.setdefault(metadata_entry['index_id'], []).append((chunk_id, metadata_entry['metadata']))
+        
+        groups = graph.clusters(threshold, live=set(chunks_by_slot))
+        grouped = {slot for slots, _ in groups for slot in slots}
+        groups.extend(([slot], 1.0) for slot, chunks in chunks_by_slot.items() if len(chunks) > 1 and slot not in grouped)
+        
+        clusters = []
+        for slots, similarity in groups:
+            chunks = [chunk for slot in slots for chunk in chunks_by_slot[slot]]
+            if len(chunks) >= min_size:
+                clusters.append({'similarity': similarity, 'chunks': chunks})
+        clusters.sort(key=lambda cluster: (len(cluster['chunks']), cluster['similarity']), reverse=True)
+        return clusters
+    
+    @_synchronized
+    def get_chunks_for_files(
+        self,
+        file_paths: Iterable[str],
+        project_name: Optional[str] = None
+    ) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+        """Collect stored chunks for several files in a single pass.
+        
+        Args:
+            file_paths: Relative or absolute file paths (matched exactly)
+            project_name: Optional project name filter
+            
+        Returns:
+            Dictionary mapping each matched path to (chunk_id, metadata) pairs
+        """
+        # Trigger lazy loading so chunk ids are available
+        _ = self.index
+        wanted = set(file_paths)
+        found: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        
+        for chunk_id in self._all_chunk_ids():
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if not metadata_entry:
+                continue
+            
+            metadata = metadata_entry['metadata']
+            if project_name and metadata.get('project_name') != project_name:
+                continue
+            
+            if metadata.get('relative_path') in wanted:
+                key = metadata['relative_path']
+            elif metadata.get('file_path') in wanted:
+                key = metadata['file_path']
+            else:
+                continue
+            found.setdefault(key, []).append((chunk_id, metadata))
+        
+        return found
+    
+    @_synchronized
+    def update_chunk_metadata(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Update metadata fields of existing chunks without touching their vectors.
+        
+        Args:
+            updates: Dictionary mapping chunk_id to fields to overwrite
+            
+        Returns:
+            Number of chunks updated
+        """
+        updated = 0
+        for chunk_id, fields in updates.items():
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if metadata_entry is None:
+                continue
+            metadata_entry['metadata'].update(fields)
+            self.metadata_db[chunk_id] = metadata_entry
+            updated += 1
+        
+        if updated:
+            try:
+                self.metadata_db.commit()
+            except Exception:
+                pass
+            self._bump_generation()
+        return updated
+    
+    @_synchronized
+    def rename_chunks(self, renames: Dict[str, str]) -> int:
+        """Move chunks to new ids without touching their vectors.
+        
+        Chunk ids encode line ranges, so chunks whose lines shifted are
+        moved to the id they would get if embedded now.
+        
+        Args:
+            renames: Dictionary mapping old to new chunk ids; all moves are
+                applied together, so ids may be swapped
+            
+        Returns:
+            Number of chunks renamed
+        """
+        # Trigger lazy loading so chunk ids are available
+        _ = self.index
+        moved = {}
+        for chunk_id, new_id in renames.items():
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if metadata_entry is not None and new_id != chunk_id:
+                moved[chunk_id] = (new_id, metadata_entry)
+        if not moved:
+            return 0
+        
+        slot_renames: Dict[int, Dict[str, str]] = {}
+        for chunk_id, (new_id, metadata_entry) in moved.items():
+            del self.metadata_db[chunk_id]
+            slot_renames.setdefault(metadata_entry['index_id'], {})[chunk_id] = new_id
+        for new_id, metadata_entry in moved.values():
+            self.metadata_db[new_id] = metadata_entry
+        for chunk_id, (new_id, _) in moved.items():
+            self._chunk_id_bytes += len(new_id) - len(chunk_id)
+        for slot, slot_moves in slot_renames.items():
+            self._chunk_ids[slot] = slot_moves.get(self._chunk_ids[slot], self._chunk_ids[slot])
+            if slot in self._shared_chunk_ids:
+                self._shared_chunk_ids[slot] = [
+                    slot_moves.get(chunk_id, chunk_id) for chunk_id in self._shared_chunk_ids[slot]
+                ]
+        self.bm25.rename({chunk_id: new_id for chunk_id, (new_id, _) in moved.items()})
+        
+        try:
+            self.metadata_db.commit()
+        except Exception:
+            pass
+        self._bump_generation()
+        return len(moved)
+    
+    @_synchronized
+    def remove_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Remove specific chunks from the metadata store.
+        
+        Args:
+            chunk_ids: Chunk IDs to remove
+            
+        Returns:
+            Number of chunks removed
+        """
+        removed = 0
+        released: Dict[str, int] = {}
+        bm25 = self.bm25
+        for chunk_id in chunk_ids:
+            metadata_entry = self.metadata_db.get(chunk_id)
+            if metadata_entry is not None:
+                del self.metadata_db[chunk_id]
+                bm25.remove(chunk_id)
+                _count_content_hash(released, metadata_entry['metadata'])
+                removed += 1
+        
+        if removed:
+            try:
+                self.metadata_db.commit()
+            except Exception:
+                pass
+            self._content_store.release(released)
+            self._bump_generation()
+        return removed
+    
+    @_synchronized
     def remove_file_chunks(self, file_path: str, project_name: Optional[str] = None) -> int:
         """Remove all chunks from a specific file.
         
@@ -279,9 +978,13 @@ class CodeIndexManager:
             Number of chunks removed
         """
         chunks_to_remove = []
+        released: Dict[str, int] = {}
         
-        # Find chunks to remove
-        for chunk_id in self._chunk_ids:
+        # Trigger lazy loading so chunk ids are available
+        _ = self.index
+        
+        # Find chunks to remove (chunk ids may repeat after re-adds)
+        for chunk_id in self._all_chunk_ids():
             metadata_entry = self.metadata_db.get(chunk_id)
             if not metadata_entry:
                 continue
@@ -299,10 +1002,13 @@ class CodeIndexManager:
                 if project_name and metadata.get('project_name') != project_name:
                     continue
                 chunks_to_remove.append(chunk_id)
+                _count_content_hash(released, metadata)
         
         # Remove chunks from metadata
+        bm25 = self.bm25
         for chunk_id in chunks_to_remove:
             del self.metadata_db[chunk_id]
+            bm25.remove(chunk_id)
         
         # Note: We don't remove from FAISS index directly as it's complex
         # Instead, we'll rebuild the index periodically or on demand
@@ -314,8 +1020,12 @@ class CodeIndexManager:
             self.metadata_db.commit()
         except Exception:
             pass
+        if chunks_to_remove:
+            self._content_store.release(released)
+            self._bump_generation()
         return len(chunks_to_remove)
     
+    @_synchronized
     def save_index(self):
         """Save the FAISS index and chunk IDs to disk."""
         if self._index is not None:
@@ -339,12 +1049,34 @@ class CodeIndexManager:
         with open(self.chunk_id_path, 'wb') as f:
             pickle.dump(self._chunk_ids, f)
         
+        self._prune_shared_chunk_ids()
+        with open(self.shared_vectors_path, 'wb') as f:
+            pickle.dump({'slots': self._vector_slots, 'shared': self._shared_chunk_ids}, f)
+        
+        if self._bm25 is not None:
+            self._bm25.save(self.bm25_path)
+        
         self._update_stats()
     
+    def _prune_shared_chunk_ids(self) -> None:
+        """Forget removed chunks, and chunks re-added elsewhere, from shared vectors."""
+        for slot, chunk_ids in list(self._shared_chunk_ids.items()):
+            live = []
+            for chunk_id in chunk_ids:
+                metadata_entry = self.metadata_db.get(chunk_id)
+                if metadata_entry is not None and metadata_entry['index_id'] == slot:
+                    live.append(chunk_id)
+            self._chunk_id_bytes -= _id_bytes(chunk_ids) - _id_bytes(live)
+            if live:
+                self._shared_chunk_ids[slot] = live
+            else:
+                del self._shared_chunk_ids[slot]
+    
     def _update_stats(self):
         """Update index statistics."""
         stats = {
             'total_chunks': len(self._chunk_ids),
+            'shared_vector_chunks': sum(len(chunk_ids) for chunk_ids in self._shared_chunk_ids.values()),
             'index_size': self._index.ntotal if self._index else 0,
             'embedding_dimension': self._index.d if self._index else 0,
             'index_type': type(self._index).__name__ if self._index else 'None'
@@ -356,7 +1088,7 @@ class CodeIndexManager:
         chunk_type_counts = {}
         tag_counts = {}
         
-        for chunk_id in self._chunk_ids:
+        for chunk_id in itertools.chain(self._chunk_ids, *self._shared_chunk_ids.values()):
             metadata_entry = self.metadata_db.get(chunk_id)
             if not metadata_entry:
                 continue
@@ -403,29 +1135,55 @@ class CodeIndexManager:
                 'files_indexed': 0
             }
     
+    @_synchronized
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the loaded index in bytes (0 if not loaded).
+        
+        Takes constant time: the chunk id lists are accounted for as they
+        change rather than walked here.
+        """
+        if self._index is None:
+            return 0
+        # Stored vectors plus the chunk id lists; IVF lists are about the same size
+        vector_bytes = getattr(self._index, 'code_size', self._index.d * 4)
+        graph_bytes = self._knn_graph.nbytes if self._knn_graph is not None else 0
+        return self._index.ntotal * vector_bytes + self._chunk_id_bytes + graph_bytes
+
     def get_index_size(self) -> int:
         """Get the number of chunks in the index."""
         return len(self._chunk_ids)
     
+    @_synchronized
     def clear_index(self):
         """Clear the entire index and metadata."""
-        # Close database connection
+        # Close database connections
         if self._metadata_db is not None:
             self._metadata_db.close()
             self._metadata_db = None
+        self._content_store.close()
         
         # Remove files
-        for file_path in [self.index_path, self.metadata_path, self.chunk_id_path, self.stats_path]:
+        for file_path in [self.index_path, self.metadata_path, self.chunk_id_path, self.stats_path, self.bm25_path,
+                          self.content_path, self.shared_vectors_path, self.knn_graph_path]:
             if file_path.exists():
                 file_path.unlink()
         
         # Reset in-memory state
         self._index = None
         self._chunk_ids = []
+        self._vector_slots = {}
+        self._shared_chunk_ids = {}
+        self._chunk_id_bytes = 0
+        self._bm25 = None
+        self._knn_graph = None
+        self._bump_generation()
         
         self._logger.info("Index cleared")
     
     def __del__(self):
         """Cleanup when object is destroyed."""
-        if self._metadata_db is not None:
+        # Attributes are missing if __init__ raised
+        if getattr(self, '_metadata_db', None) is not None:
             self._metadata_db.close()
+        if hasattr(self, '_content_store'):
+            self._content_store.close()
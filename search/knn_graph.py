@@ -0,0 +1,129 @@
+"""Precomputed nearest-neighbour graph over all vectors of an index."""
+
+import logging
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per vector, besides the vector itself
+DEFAULT_NEIGHBORS = 10
+
+
+class KnnGraph:
+    """The nearest neighbours of every vector, found in one batched pass.
+
+    Row i holds the positions and similarities of the vectors closest to
+    vector i, best first. The vector itself is kept in its row, so chunks
+    sharing it are found like in a live search. Rows of an approximate
+    index (IVF) are approximate as well.
+    """
+
+    def __init__(self, neighbors: np.ndarray, similarities: np.ndarray):
+        """Initialize the graph.
+
+        Args:
+            neighbors: Neighbour positions, one row per vector (-1 for none)
+            similarities: Cosine similarity of each neighbour
+        """
+        self.neighbors = neighbors
+        self.similarities = similarities
+
+    @classmethod
+    def build(cls, index, k: int = DEFAULT_NEIGHBORS, batch_size: int = 1024) -> "KnnGraph":
+        """Search every vector of a FAISS index against the whole index.
+
+        Args:
+            index: FAISS index of normalized vectors
+            k: Neighbours kept per vector, besides the vector itself
+            batch_size: Vectors searched per FAISS call
+
+        Returns:
+            The graph
+        """
+        n = index.ntotal
+        width = min(k + 1, n)
+        neighbors = np.empty((n, width), dtype=np.int32)
+        similarities = np.empty((n, width), dtype=np.float32)
+        for start in range(0, n, batch_size):
+            stop = min(start + batch_size, n)
+            batch_similarities, batch_neighbors = index.search(index.reconstruct_n(start, stop - start), width)
+            neighbors[start:stop] = batch_neighbors
+            similarities[start:stop] = batch_similarities
+        logger.info(f"Built {width - 1}-NN graph over {n} vectors")
+        return cls(neighbors, similarities)
+
+    @property
+    def width(self) -> int:
+        """Entries per row, the vector itself included."""
+        return self.neighbors.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.neighbors)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the graph."""
+        return self.neighbors.nbytes + self.similarities.nbytes
+
+    def row(self, position: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the (similarities, positions) of a vector's neighbours, best first."""
+        return self.similarities[position], self.neighbors[position]
+
+    def clusters(self, threshold: float, live: Optional[Set[int]] = None) -> List[Tuple[List[int], float]]:
+        """Group vectors linked by neighbour edges at or above a similarity.
+
+        Args:
+            threshold: Minimum cosine similarity of an edge
+            live: Optional positions to keep; edges to other positions are
+                ignored, so removed chunks do not join clusters
+
+        Returns:
+            (positions, lowest similarity of the joining edges) per group of
+            two or more vectors
+        """
+        sources = np.repeat(np.arange(len(self), dtype=np.int32), self.width)
+        targets = self.neighbors.ravel()
+        weights = self.similarities.ravel()
+        mask = (weights >= threshold) & (targets != sources) & (targets != -1)
+
+        parent = {}
+
+        def find(position: int) -> int:
+            root = position
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while parent[position] != root:
+                parent[position], position = root, parent[position]
+            return root
+
+        # Strongest edges first, so each group records its weakest necessary link
+        order = np.argsort(-weights[mask], kind='stable')
+        edges = zip(sources[mask][order].tolist(), targets[mask][order].tolist(), weights[mask][order].tolist())
+        lowest = {}
+        for source, target, weight in edges:
+            if live is not None and (source not in live or target not in live):
+                continue
+            source_root, target_root = find(source), find(target)
+            if source_root == target_root:
+                continue
+            parent[target_root] = source_root
+            lowest[source_root] = min(weight, lowest.get(source_root, 1.0), lowest.pop(target_root, 1.0))
+
+        groups = {}
+        for position in parent:
+            groups.setdefault(find(position), []).append(position)
+        return [(sorted(positions), lowest[root]) for root, positions in groups.items() if len(positions) > 1]
+
+    def save(self, path: Path) -> None:
+        """Save the graph to an .npz file."""
+        with open(path, 'wb') as f:
+            np.savez(f, neighbors=self.neighbors, similarities=self.similarities)
+
+    @classmethod
+    def load(cls, path: Path) -> "KnnGraph":
+        """Load a graph saved with save()."""
+        with np.load(path) as data:
+            return cls(data['neighbors'], data['similarities'])
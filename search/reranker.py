@@ -0,0 +1,205 @@
+"""Optional second-stage re-ranking of the top search candidates."""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class PairScorer(Protocol):
+    """Scores how well each candidate text answers a query."""
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        """Score candidate texts against a query, higher is better."""
+        ...
+
+
+class CrossEncoderScorer:
+    """Local sentence-transformers cross-encoder, loaded in a background thread.
+
+    score() never waits for the model: until it is loaded, scoring fails
+    at once and the reranker keeps the heuristic ranking, so a cold start
+    does not count against any query's budget. Call start_preload() at
+    startup to have the model ready by the first search.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER, cache_dir: Optional[str] = None, device: Optional[str] = None):
+        """Initialize the scorer.
+
+        Args:
+            model_name: Cross-encoder model name or local path
+            cache_dir: Directory to cache the model
+            device: Device to run on (default: chosen by sentence-transformers)
+        """
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.device = device
+        self._load_lock = threading.Lock()
+        # Resolves to the model once it is loaded (see start_preload)
+        self._model_ready: Optional[Future] = None
+
+    def start_preload(self) -> Future:
+        """Start loading the model in a background thread.
+
+        Safe to call repeatedly; the load runs once. A failed load is retried
+        on the next call.
+
+        Returns:
+            Future resolving to the loaded model
+        """
+        with self._load_lock:
+            if self._model_ready is not None and not (
+                self._model_ready.done() and self._model_ready.exception() is not None
+            ):
+                return self._model_ready
+
+            future: Future = Future()
+            self._model_ready = future
+
+        def _preload():
+            try:
+                # Imported here so that the reranker costs nothing when disabled
+                from sentence_transformers import CrossEncoder
+
+                logger.info(f"Loading cross-encoder: {self.model_name}")
+                future.set_result(CrossEncoder(self.model_name, cache_folder=self.cache_dir, device=self.device))
+                logger.info("Cross-encoder loaded")
+            except Exception as e:
+                logger.warning(f"Cross-encoder load failed: {e}")
+                future.set_exception(e)
+
+        threading.Thread(target=_preload, name="cross-encoder-preload", daemon=True).start()
+        return future
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        """Score candidate texts against a query, higher is better.
+
+        Raises:
+            RuntimeError: If the model is still loading (the load is started
+                if it was not) or failed to load
+        """
+        future = self.start_preload()
+        if not future.done():
+            raise RuntimeError("cross-encoder is still loading")
+        model = future.result()
+        return np.asarray(model.predict(
+            [(query, text) for text in texts], batch_size=len(texts), show_progress_bar=False
+        ))
+
+
+class Reranker:
+    """Re-score the top candidates of a search within a latency budget.
+
+    The top_n candidates are scored in batches, on their full source when a
+    content lookup is given and on the search preview otherwise. If the
+    budget runs out,
+    or the next batch is not expected to fit in it, re-ranking is abandoned
+    and the heuristic ranking is returned unchanged, so a slow model or a
+    busy machine costs at most the budget. Scoring errors fall back the
+    same way.
+    """
+
+    def __init__(
+        self,
+        scorer: PairScorer,
+        top_n: int = 20,
+        budget_ms: float = 150.0,
+        batch_size: int = 8,
+        content_chars: int = 600
+    ):
+        """Initialize the reranker.
+
+        Args:
+            scorer: Model scoring (query, candidate text) pairs
+            top_n: Number of top candidates re-scored
+            budget_ms: Maximum milliseconds spent re-scoring one query
+            batch_size: Candidates scored per model call
+            content_chars: Characters of a candidate's source scored, which
+                bounds the model input and so the time per batch
+        """
+        self.scorer = scorer
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.content_chars = content_chars
+        # Searches of several tool calls may re-rank at once
+        self._lock = threading.Lock()
+        self.reranked = 0
+        self.fallbacks = 0
+
+    def candidate_text(self, result: Any, content: Optional[str] = None) -> str:
+        """Build the text a candidate is scored on, from its source if given."""
+        header = ' '.join(part for part in (result.relative_path, result.parent_name, result.name) if part)
+        body = content[:self.content_chars] if content else result.content_preview
+        return '\n'.join(part for part in (header, result.docstring, body) if part)
+
+    def rerank(
+        self,
+        query: str,
+        scored: List[Tuple[float, Any]],
+        content: Optional[Callable[[str], Optional[str]]] = None
+    ) -> List[Tuple[float, Any]]:
+        """Reorder the top candidates by the scorer.
+
+        The re-ranked candidates take over the rank scores of the top_n
+        slots in their new order, so scores stay on the heuristic scale
+        and descending across the whole list.
+
+        Args:
+            query: Search query
+            scored: (rank score, result) pairs, best first
+            content: Optional lookup of a chunk's full source by chunk id,
+                called only for the top_n candidates
+
+        Returns:
+            Re-ranked pairs, or scored unchanged if over budget
+        """
+        head, tail = scored[:self.top_n], scored[self.top_n:]
+        if len(head) < 2:
+            return scored
+
+        start = time.perf_counter()
+        scores = []
+        try:
+            texts = [
+                self.candidate_text(result, content(result.chunk_id) if content is not None else None)
+                for _, result in head
+            ]
+            for i in range(0, len(texts), self.batch_size):
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if i and elapsed_ms + elapsed_ms / i * self.batch_size > self.budget_ms:
+                    return self._fall_back(scored, f"over budget after {i} of {len(texts)} candidates")
+                scores.extend(np.ravel(self.scorer.score(query, texts[i:i + self.batch_size])).tolist())
+        except Exception as e:
+            return self._fall_back(scored, f"scoring failed: {e}")
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > self.budget_ms:
+            return self._fall_back(scored, f"took {elapsed_ms:.0f} ms")
+
+        order = sorted(range(len(head)), key=lambda i: scores[i], reverse=True)
+        with self._lock:
+            self.reranked += 1
+        return [(head[slot][0], head[i][1]) for slot, i in enumerate(order)] + tail
+
+    def _fall_back(self, scored: List[Tuple[float, Any]], reason: str) -> List[Tuple[float, Any]]:
+        with self._lock:
+            self.fallbacks += 1
+        logger.info(f"Re-ranking skipped ({reason}), keeping heuristic ranking")
+        return scored
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get re-ranking statistics.
+
+        Returns:
+            Dictionary with the re-ranked and fallen back query counts
+        """
+        with self._lock:
+            return {'reranked': self.reranked, 'fallbacks': self.fallbacks}
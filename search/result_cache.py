@@ -0,0 +1,115 @@
+"""LRU cache of search responses keyed by index generation."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class SearchResultCache:
+    """Bounded LRU cache of serialized search responses.
+
+    Entries are keyed by an index identity, the index generation and the
+    search parameters. Every committed change to an index gives it a new
+    generation, so stale responses are never returned; when a newer
+    generation of an index is seen, that index's older entries are dropped
+    at once instead of waiting to age out. Memory is bounded by both the
+    number of entries and the total size of the stored responses.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 ** 2):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total length of the cached responses
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, int, Hashable], str]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, index_key: str, generation: int, params: Hashable) -> Optional[str]:
+        """Look up a response.
+
+        Args:
+            index_key: Identity of the searched index (e.g. its storage path)
+            generation: Current generation of the index
+            params: Hashable search parameters
+
+        Returns:
+            The cached response, or None
+        """
+        key = (index_key, generation, params)
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, index_key: str, generation: int, params: Hashable, response: str) -> None:
+        """Store a response.
+
+        Args:
+            index_key: Identity of the searched index
+            generation: Generation of the index the response was computed at
+            params: Hashable search parameters
+            response: Serialized response
+        """
+        if len(response) > self.max_bytes:
+            return
+        with self._lock:
+            latest = self._generations.get(index_key)
+            if latest is not None and generation < latest:
+                # Computed against an index that has changed since
+                return
+            if latest != generation:
+                self._generations[index_key] = generation
+                self._drop_index(index_key, keep_generation=generation)
+
+            key = (index_key, generation, params)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = response
+            self._bytes += len(response)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, size and hit counters
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _drop_index(self, index_key: str, keep_generation: int) -> None:
+        stale = [key for key in self._entries if key[0] == index_key and key[1] != keep_generation]
+        for key in stale:
+            self._bytes -= len(self._entries.pop(key))
@@ -1,13 +1,25 @@
 """Intelligent search functionality with query optimization."""
 
+import itertools
 import re
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from search.indexer import CodeIndexManager
+import numpy as np
+
+from search.bm25 import normalize_to_tokens, path_tokens
+from search.indexer import CodeIndexManager, SearchStats
+from search.reranker import Reranker
 from embeddings.embedder import CodeEmbedder
 
+# Rank offset of reciprocal rank fusion; damps the weight of the very top ranks
+RRF_K = 60
+# Weight of the BM25 ranking when the query is a single identifier
+IDENTIFIER_LEXICAL_WEIGHT = 2.0
+# One token shaped like code: snake_case, CamelCase, dotted or with a call suffix
+IDENTIFIER_QUERY = re.compile(r'^[A-Za-z_$][\w$]*(?:(?:\.|::)[A-Za-z_$][\w$]*)*(?:\(\))?$')
+
 
 @dataclass
 class SearchResult:
@@ -26,43 +38,117 @@ class SearchResult:
     docstring: Optional[str]
     tags: List[str]
     context_info: Dict[str, Any]
+    # Ranking tokens stored at index time (None for older indexes)
+    name_tokens: Optional[List[str]] = None
+    path_tokens: Optional[List[str]] = None
+    # Hash of the embedding input; identical chunks share it and their vector
+    embedding_hash: Optional[str] = None
+    # Chunk ids of identical chunks folded into this result
+    duplicates: List[str] = field(default_factory=list)
+
+
+@dataclass
+class QueryFeatures:
+    """Query properties used to re-rank candidates, computed once per query."""
+    query_lower: str
+    tokens: frozenset
+    is_entity_query: bool
+    type_boosts: Dict[str, float]
+    intent_tags: frozenset
+
+
+# Intent vocabulary: intent name -> patterns searched in the lowercased query.
+# Detected intents boost results carrying a tag of the same name.
+DEFAULT_QUERY_PATTERNS: Dict[str, List[str]] = {
+    'function_search': [
+        r'\bfunction\b', r'\bdef\b', r'\bmethod\b', r'\bclass\b',
+        r'how.*work', r'implement.*', r'algorithm.*'
+    ],
+    'error_handling': [
+        r'\berror\b', r'\bexception\b', r'\btry\b', r'\bcatch\b',
+        r'handle.*error', r'exception.*handling'
+    ],
+    'database': [
+        r'\bdatabase\b', r'\bdb\b', r'\bquery\b', r'\bsql\b',
+        r'\bmodel\b', r'\btable\b', r'connection'
+    ],
+    'api': [
+        r'\bapi\b', r'\bendpoint\b', r'\broute\b', r'\brequest\b',
+        r'\bresponse\b', r'\bhttp\b', r'rest.*api'
+    ],
+    'authentication': [
+        r'\bauth\b', r'\blogin\b', r'\btoken\b', r'\bpassword\b',
+        r'\bsession\b', r'authenticate', r'permission'
+    ],
+    'testing': [
+        r'\btest\b', r'\bmock\b', r'\bassert\b', r'\bfixture\b',
+        r'unit.*test', r'integration.*test'
+    ]
+}
+
+# Patterns that match a single whole word, merged per intent when compiling
+WHOLE_WORD_PATTERN = re.compile(r'^\\b(\w+)\\b$')
 
 
 class IntelligentSearcher:
     """Intelligent code search with query optimization and context awareness."""
     
-    def __init__(self, index_manager: CodeIndexManager, embedder: CodeEmbedder):
+    def __init__(
+        self,
+        index_manager: CodeIndexManager,
+        embedder: CodeEmbedder,
+        extra_intents: Optional[Dict[str, List[str]]] = None,
+        reranker: Optional[Reranker] = None
+    ):
+        """Initialize the searcher.
+        
+        Args:
+            index_manager: Index of the project
+            embedder: Embedder for queries
+            extra_intents: Domain intents added to DEFAULT_QUERY_PATTERNS; patterns
+                of an existing intent extend it
+            reranker: Optional second stage re-scoring the top candidates
+        """
         self.index_manager = index_manager
         self.embedder = embedder
+        self.reranker = reranker
         self._logger = logging.getLogger(__name__)
         
         # Query patterns for intent detection
-        self.query_patterns = {
-            'function_search': [
-                r'\bfunction\b', r'\bdef\b', r'\bmethod\b', r'\bclass\b',
-                r'how.*work', r'implement.*', r'algorithm.*'
-            ],
-            'error_handling': [
-                r'\berror\b', r'\bexception\b', r'\btry\b', r'\bcatch\b',
-                r'handle.*error', r'exception.*handling'
-            ],
-            'database': [
-                r'\bdatabase\b', r'\bdb\b', r'\bquery\b', r'\bsql\b',
-                r'\bmodel\b', r'\btable\b', r'connection'
-            ],
-            'api': [
-                r'\bapi\b', r'\bendpoint\b', r'\broute\b', r'\brequest\b',
-                r'\bresponse\b', r'\bhttp\b', r'rest.*api'
-            ],
-            'authentication': [
-                r'\bauth\b', r'\blogin\b', r'\btoken\b', r'\bpassword\b',
-                r'\bsession\b', r'authenticate', r'permission'
-            ],
-            'testing': [
-                r'\btest\b', r'\bmock\b', r'\bassert\b', r'\bfixture\b',
-                r'unit.*test', r'integration.*test'
-            ]
-        }
+        self.query_patterns = {intent: list(patterns) for intent, patterns in DEFAULT_QUERY_PATTERNS.items()}
+        for intent, patterns in (extra_intents or {}).items():
+            self.query_patterns.setdefault(intent, []).extend(patterns)
+        self._compile_intent_patterns()
+    
+    def add_intent(self, intent: str, patterns: List[str]) -> None:
+        """Add a domain intent, or more patterns for an existing one.
+        
+        Args:
+            intent: Intent name, matched against chunk tags when ranking
+            patterns: Regular expressions searched in the lowercased query
+        """
+        self.query_patterns.setdefault(intent, []).extend(patterns)
+        self._compile_intent_patterns()
+    
+    def _compile_intent_patterns(self) -> None:
+        """Compile all intent patterns into one regular expression.
+        
+        Each intent becomes an optional lookahead that scans the whole query
+        for any of its patterns, so one match call finds every intent even
+        when their matches overlap. Whole-word patterns of an intent share
+        one word-boundary group. Intents are captured in groups named by
+        position, since intent names need not be identifiers.
+        """
+        self._intent_names = list(self.query_patterns)
+        lookaheads = []
+        for i, intent in enumerate(self._intent_names):
+            patterns = self.query_patterns[intent]
+            words = [m.group(1) for m in map(WHOLE_WORD_PATTERN.match, patterns) if m]
+            alternatives = [rf"\b(?:{'|'.join(words)})\b"] if words else []
+            alternatives += [f'(?:{p})' for p in patterns if not WHOLE_WORD_PATTERN.match(p)]
+            if alternatives:
+                lookaheads.append(f"(?=(?s:.*?)(?P<intent{i}>{'|'.join(alternatives)}))?")
+        self._intent_regex = re.compile(''.join(lookaheads))
     
     def search(
         self,
@@ -70,34 +156,74 @@ class IntelligentSearcher:
         k: int = 5,
         search_mode: str = "semantic",
         context_depth: int = 1,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        stats: Optional[SearchStats] = None,
+        collapse_duplicates: bool = False
     ) -> List[SearchResult]:
-        """Semantic search for code understanding.
+        """Search code by meaning, identifiers, or both.
         
-        This provides semantic search capabilities. For complete search coverage:
-        - Use this tool for conceptual/functionality queries
-        - Use Claude Code's Grep for exact term matching
-        - Combine both for comprehensive results
+        Semantic search finds code by functionality. Hybrid search fuses it
+        with a BM25 search over identifier-split names, paths and source,
+        so exact identifiers such as ``parse_config`` or ``UserAccount``
+        rank at the top without a separate text search.
         
         Args:
-            query: Natural language query
+            query: Natural language query or identifier
             k: Number of results
-            search_mode: Currently "semantic" only
+            search_mode: "semantic", or "hybrid" (also used for "auto")
             context_depth: Include related chunks
             filters: Optional filters
+            query_embedding: Precomputed embedding of the query (e.g. shared across projects)
+            stats: Optional SearchStats updated with how far filtered searches widened
+            collapse_duplicates: Return identical chunks (e.g. vendored copies) as one
+                result listing the other locations in its duplicates
         """
+        if search_mode in ("hybrid", "auto"):
+            return self._hybrid_search(query, k, context_depth, filters, query_embedding, stats, collapse_duplicates)
         
         # Focus on semantic search - our specialty
-        return self._semantic_search(query, k, context_depth, filters)
+        return self._semantic_search(query, k, context_depth, filters, query_embedding, stats, collapse_duplicates)
     
     def _semantic_search(
         self,
         query: str,
         k: int = 5,
         context_depth: int = 1,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        stats: Optional[SearchStats] = None,
+        collapse_duplicates: bool = False
     ) -> List[SearchResult]:
         """Pure semantic search implementation."""
+        scored = self.search_scored(query, k, filters, query_embedding, stats, collapse_duplicates)
+        
+        # Context is only gathered for the results that are returned
+        return [self.add_context(result, context_depth) for _, result in scored[:k]]
+    
+    def search_scored(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        stats: Optional[SearchStats] = None,
+        collapse_duplicates: bool = False
+    ) -> List[Tuple[float, SearchResult]]:
+        """Rank all candidates fetched for a query, keeping their rank scores.
+        
+        Args:
+            query: Natural language query
+            k: Number of results wanted (candidates are over-fetched)
+            filters: Optional filters
+            query_embedding: Precomputed embedding of the query
+            stats: Optional SearchStats updated with how far filtered searches widened
+            collapse_duplicates: Fold identical chunks into one candidate
+            
+        Returns:
+            List of (rank score, result) for every candidate, best first,
+            without context information
+        """
         
         # Detect query intent and optimize
         optimized_query = self._optimize_query(query)
@@ -106,33 +232,213 @@ class IntelligentSearcher:
         self._logger.info(f"Searching for: '{optimized_query}' with intent: {intent_tags}")
         
         # Generate query embedding
-        query_embedding = self.embedder.embed_query(optimized_query)
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_query(optimized_query)
         
         # Search with expanded result set for better filtering and recall
-        search_k = min(k * 10, 200)  # Increased from k*3 to k*10 for better recall
+        search_k = self._candidate_count(k)
         self._logger.info(f"Query embedding shape: {query_embedding.shape if hasattr(query_embedding, 'shape') else 'unknown'}")
         self._logger.info(f"Using original filters: {filters}")
         self._logger.info(f"Calling index_manager.search with k={search_k}")
         
+        # The index widens its search if filters leave fewer than k candidates
         raw_results = self.index_manager.search(
             query_embedding, 
             search_k, 
-            filters
+            filters,
+            min_results=k,
+            stats=stats,
+            collapse_duplicates=collapse_duplicates
         )
         self._logger.info(f"Index manager returned {len(raw_results)} raw results")
         
-        # Convert to rich search results
+        return self._score_raw_results(raw_results, query, intent_tags)
+    
+    @staticmethod
+    def _candidate_count(k: int) -> int:
+        """Number of candidates fetched for re-ranking when k results are wanted."""
+        # Expanded result set for better filtering and recall
+        return max(k, min(k * 10, 200))
+    
+    def _hybrid_search(
+        self,
+        query: str,
+        k: int = 5,
+        context_depth: int = 1,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        stats: Optional[SearchStats] = None,
+        collapse_duplicates: bool = False
+    ) -> List[SearchResult]:
+        """Fuse semantic and BM25 candidates with reciprocal rank fusion."""
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_query(self._optimize_query(query))
+        
+        scored = self.search_scored(query, k, filters, query_embedding, stats, collapse_duplicates)
+        return self._fuse_with_lexical(query, scored, query_embedding, k, context_depth, filters, collapse_duplicates)
+    
+    def _fuse_with_lexical(
+        self,
+        query: str,
+        scored: List[Tuple[float, SearchResult]],
+        query_embedding: np.ndarray,
+        k: int,
+        context_depth: int,
+        filters: Optional[Dict[str, Any]],
+        collapse_duplicates: bool = False
+    ) -> List[SearchResult]:
+        """Fuse ranked semantic results with the query's BM25 results."""
+        semantic = [result for _, result in scored]
+        lexical = self.index_manager.lexical_search(query, min(k * 10, 200), filters)
+        if collapse_duplicates:
+            lexical = self._collapse_lexical(lexical, semantic)
+        self._logger.info(f"Hybrid search fusing {len(semantic)} semantic and {len(lexical)} lexical candidates")
+        
+        lexical_weight = IDENTIFIER_LEXICAL_WEIGHT if self._is_identifier_query(query) else 1.0
+        fused = self._fuse_rankings(
+            [[result.chunk_id for result in semantic], list(dict.fromkeys(chunk_id for chunk_id, _, _ in lexical))],
+            [1.0, lexical_weight]
+        )
+        
+        results = {result.chunk_id: result for result in semantic}
+        top_ids = [chunk_id for chunk_id, _ in fused[:k]]
+        
+        # Lexical-only hits get their real cosine similarity for display
+        missing = [chunk_id for chunk_id in top_ids if chunk_id not in results]
+        if missing:
+            lexical_metadata = {chunk_id: metadata for chunk_id, _, metadata in lexical if metadata is not None}
+            similarities = self.index_manager.similarities(query_embedding, missing)
+            for chunk_id, similarity in zip(missing, similarities):
+                results[chunk_id] = self._create_search_result(
+                    chunk_id, similarity, lexical_metadata[chunk_id], context_depth=0
+                )
+        
+        return [self.add_context(results[chunk_id], context_depth) for chunk_id in top_ids]
+    
+    @staticmethod
+    def _collapse_lexical(
+        lexical: List[Tuple[str, float, Dict[str, Any]]],
+        semantic: List[SearchResult]
+    ) -> List[Tuple[str, float, Optional[Dict[str, Any]]]]:
+        """Fold BM25 hits on identical chunks into one hit per embedding input.
+        
+        Hits identical to a semantic result rank as that result (returned
+        with metadata None) and are listed in its duplicates.
+        """
+        semantic_heads = {result.embedding_hash: result for result in semantic if result.embedding_hash}
+        lexical_heads: Dict[str, Dict[str, Any]] = {}
+        collapsed = []
+        for chunk_id, score, metadata in lexical:
+            embedding_hash = metadata.get('embedding_hash')
+            if not embedding_hash:
+                collapsed.append((chunk_id, score, metadata))
+            elif embedding_hash in semantic_heads:
+                head = semantic_heads[embedding_hash]
+                if chunk_id != head.chunk_id and chunk_id not in head.duplicates:
+                    head.duplicates.append(chunk_id)
+                collapsed.append((head.chunk_id, score, None))
+            elif embedding_hash in lexical_heads:
+                lexical_heads[embedding_hash].setdefault('duplicate_chunk_ids', []).append(chunk_id)
+            else:
+                lexical_heads[embedding_hash] = metadata
+                collapsed.append((chunk_id, score, metadata))
+        return collapsed
+    
+    @staticmethod
+    def _is_identifier_query(query: str) -> bool:
+        """Detect queries that name a code identifier rather than describe behavior."""
+        query = query.strip()
+        if not IDENTIFIER_QUERY.match(query):
+            return False
+        # Plain words like "authentication" are better served by meaning
+        return bool(re.search(r'[a-z][A-Z]|_|\.|::|\(', query))
+    
+    @staticmethod
+    def _fuse_rankings(
+        rankings: List[List[str]],
+        weights: Optional[List[float]] = None
+    ) -> List[Tuple[str, float]]:
+        """Combine ranked chunk id lists with reciprocal rank fusion.
+        
+        Args:
+            rankings: Chunk ids of each retriever, best first
+            weights: Optional weight of each ranking (default 1.0)
+            
+        Returns:
+            List of (chunk_id, fused score), best first
+        """
+        weights = weights or [1.0] * len(rankings)
+        scores: Dict[str, float] = {}
+        for ranking, weight in zip(rankings, weights):
+            for rank, chunk_id in enumerate(ranking, start=1):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (RRF_K + rank)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    
+    def search_many(
+        self,
+        queries: List[str],
+        k: int = 5,
+        context_depth: int = 1,
+        filters: Optional[Dict[str, Any]] = None,
+        search_mode: str = "semantic",
+        stats: Optional[SearchStats] = None
+    ) -> List[List[SearchResult]]:
+        """Search for several queries at once.
+        
+        All queries are embedded in one model batch and searched with one
+        multi-row FAISS call; ranking is the same as for search().
+        
+        Args:
+            queries: Natural language queries
+            k: Number of results per query
+            context_depth: Include related chunks
+            filters: Optional filters applied to every query
+            search_mode: "semantic", or "hybrid" (also used for "auto")
+            stats: Optional SearchStats updated with how far filtered searches widened
+            
+        Returns:
+            List of results for each query, in query order
+        """
+        if not queries:
+            return []
+        
+        query_embeddings = self.embedder.embed_queries([self._optimize_query(q) for q in queries])
+        search_k = self._candidate_count(k)
+        raw_results_per_query = self.index_manager.search_many(
+            query_embeddings, search_k, filters, min_results=k, stats=stats
+        )
+        self._logger.info(f"Batch search for {len(queries)} queries with k={search_k}")
+        
+        results = []
+        for query, query_embedding, raw_results in zip(queries, query_embeddings, raw_results_per_query):
+            scored = self._score_raw_results(raw_results, query, self._detect_query_intent(query))
+            if search_mode in ("hybrid", "auto"):
+                results.append(self._fuse_with_lexical(query, scored, query_embedding, k, context_depth, filters))
+            else:
+                results.append([self.add_context(result, context_depth) for _, result in scored[:k]])
+        return results
+    
+    def _score_raw_results(
+        self,
+        raw_results: List[Tuple[str, float, Dict[str, Any]]],
+        query: str,
+        intent_tags: List[str]
+    ) -> List[Tuple[float, SearchResult]]:
+        """Convert index hits to rich search results and rank them."""
         search_results = []
         for chunk_id, similarity, metadata in raw_results:
             result = self._create_search_result(
-                chunk_id, similarity, metadata, context_depth
+                chunk_id, similarity, metadata, context_depth=0
             )
             search_results.append(result)
         
         # Post-process and rank results
-        ranked_results = self._rank_results(search_results, query, intent_tags)
-        
-        return ranked_results[:k]
+        scored = self._score_results(search_results, query, intent_tags)
+        if self.reranker is not None:
+            # Full bodies are read from the content store only for the re-scored candidates
+            content = self.index_manager.get_chunk_content if self.index_manager is not None else None
+            scored = self.reranker.rerank(query, scored, content)
+        return scored
     
     def _optimize_query(self, query: str) -> str:
         """Optimize query for better embedding generation."""
@@ -142,17 +448,11 @@ class IntelligentSearcher:
     
     def _detect_query_intent(self, query: str) -> List[str]:
         """Detect the intent/domain of the search query."""
-        query_lower = query.lower()
-        detected_intents = []
-        
-        for intent, patterns in self.query_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, query_lower):
-                    detected_intents.append(intent)
-                    break
-        
-        return detected_intents
-    
+        groups = self._intent_regex.match(query.lower()).groupdict()
+        return [
+            intent for i, intent in enumerate(self._intent_names)
+            if groups.get(f'intent{i}') is not None
+        ]
     
     def _create_search_result(
         self, 
@@ -169,29 +469,7 @@ class IntelligentSearcher:
         relative_path = metadata.get('relative_path', '')
         folder_structure = metadata.get('folder_structure', [])
         
-        # Context information
-        context_info = {}
-        
-        if context_depth > 0:
-            # Add related chunks context
-            similar_chunks = self.index_manager.get_similar_chunks(chunk_id, k=3)
-            context_info['similar_chunks'] = [
-                {
-                    'chunk_id': cid,
-                    'similarity': sim,
-                    'name': meta.get('name'),
-                    'chunk_type': meta.get('chunk_type')
-                }
-                for cid, sim, meta in similar_chunks[:2]  # Top 2 similar
-            ]
-            
-            # Add file context
-            context_info['file_context'] = {
-                'total_chunks_in_file': self._count_chunks_in_file(relative_path),
-                'folder_path': '/'.join(folder_structure) if folder_structure else None
-            }
-        
-        return SearchResult(
+        result = SearchResult(
             chunk_id=chunk_id,
             similarity_score=similarity,
             content_preview=content_preview,
@@ -205,8 +483,45 @@ class IntelligentSearcher:
             end_line=metadata.get('end_line', 0),
             docstring=metadata.get('docstring'),
             tags=metadata.get('tags', []),
-            context_info=context_info
+            context_info={},
+            name_tokens=metadata.get('name_tokens'),
+            path_tokens=metadata.get('path_tokens'),
+            embedding_hash=metadata.get('embedding_hash'),
+            duplicates=list(metadata.get('duplicate_chunk_ids', ()))
         )
+        return self.add_context(result, context_depth)
+    
+    def add_context(self, result: SearchResult, context_depth: int) -> SearchResult:
+        """Attach related chunks and file context to a search result.
+        
+        Args:
+            result: Search result to extend in place
+            context_depth: Include related chunks if greater than 0
+            
+        Returns:
+            The same result
+        """
+        if context_depth <= 0:
+            return result
+        
+        # Add related chunks context
+        similar_chunks = self.index_manager.get_similar_chunks(result.chunk_id, k=3)
+        result.context_info['similar_chunks'] = [
+            {
+                'chunk_id': cid,
+                'similarity': sim,
+                'name': meta.get('name'),
+                'chunk_type': meta.get('chunk_type')
+            }
+            for cid, sim, meta in similar_chunks[:2]  # Top 2 similar
+        ]
+        
+        # Add file context
+        result.context_info['file_context'] = {
+            'total_chunks_in_file': self._count_chunks_in_file(result.relative_path),
+            'folder_path': '/'.join(result.folder_structure) if result.folder_structure else None
+        }
+        return result
     
     def _count_chunks_in_file(self, relative_path: str) -> int:
         """Count total chunks in a specific file."""
@@ -224,84 +539,120 @@ class IntelligentSearcher:
         intent_tags: List[str]
     ) -> List[SearchResult]:
         """Advanced ranking based on multiple factors."""
+        return [result for _, result in self._score_results(results, original_query, intent_tags)]
+    
+    def _score_results(
+        self, 
+        results: List[SearchResult], 
+        original_query: str,
+        intent_tags: List[str]
+    ) -> List[Tuple[float, SearchResult]]:
+        """Score results by multiple factors, best first.
         
-        def calculate_rank_score(result: SearchResult) -> float:
-            score = result.similarity_score
-            
-            # Detect if query looks like an entity/class name
-            query_tokens = self._normalize_to_tokens(original_query.lower())
-            is_entity_query = self._is_entity_like_query(original_query, query_tokens)
-            has_class_keyword = 'class' in original_query.lower()
-            
-            # Dynamic chunk type boosts based on query type
-            if has_class_keyword:
-                # Strong preference for classes when "class" is mentioned
-                type_boosts = {
-                    'class': 1.3,
-                    'function': 1.05,
-                    'method': 1.05,
-                    'module': 0.9
-                }
-            elif is_entity_query:
-                # Moderate preference for classes on entity-like queries
-                type_boosts = {
-                    'class': 1.15,
-                    'function': 1.1,
-                    'method': 1.1,
-                    'module': 0.92
-                }
-            else:
-                # Default boosts for general queries
-                type_boosts = {
-                    'function': 1.1,
-                    'method': 1.1,
-                    'class': 1.05,
-                    'module': 0.95
-                }
-            
-            score *= type_boosts.get(result.chunk_type, 1.0)
-            
-            # Enhanced name matching with token-based comparison
-            name_boost = self._calculate_name_boost(result.name, original_query, query_tokens)
-            score *= name_boost
-            
-            # Path/filename relevance boost
-            path_boost = self._calculate_path_boost(result.relative_path, query_tokens)
-            score *= path_boost
-            
-            # Boost based on tag matches
-            if intent_tags and result.tags:
-                tag_overlap = len(set(intent_tags) & set(result.tags))
-                score *= (1.0 + tag_overlap * 0.1)
-            
-            # Boost based on docstring presence (but less for module chunks on entity queries)
-            if result.docstring:
-                if is_entity_query and result.chunk_type == 'module':
-                    score *= 1.02  # Smaller boost for module docstrings on entity queries
-                else:
-                    score *= 1.05
-            
-            # Slight penalty for very complex chunks (might be too specific)
-            if len(result.content_preview) > 1000:
-                score *= 0.98
-            
-            return score
+        One pass over the results collects every per-result feature into a
+        row; the factors are then computed as arrays over the candidate set.
+        """
+        if not results:
+            return []
+        
+        features = self._query_features(original_query, intent_tags)
+        query_tokens = features.tokens
+        type_boosts = features.type_boosts
+        
+        rows = []
+        for r in results:
+            name_overlap, exact_name = 0, False
+            if r.name:
+                name_tokens = r.name_tokens if r.name_tokens is not None else self._normalize_to_tokens(r.name)
+                name_overlap = len(query_tokens.intersection(name_tokens))
+                exact_name = r.name.lower() == features.query_lower
+            result_path_tokens = r.path_tokens if r.path_tokens is not None else path_tokens(r.relative_path or '')
+            docstring_boost = 1.0
+            if r.docstring:
+                # Less for module chunks on entity queries
+                docstring_boost = 1.02 if features.is_entity_query and r.chunk_type == 'module' else 1.05
+            rows.append((
+                r.similarity_score,
+                # Dynamic chunk type boosts based on query type
+                type_boosts.get(r.chunk_type, 1.0),
+                name_overlap,
+                exact_name,
+                len(query_tokens.intersection(result_path_tokens)),
+                len(features.intent_tags.intersection(r.tags)) if r.tags else 0,
+                docstring_boost,
+                len(r.content_preview) > 1000,
+            ))
+        (similarity, type_boost, name_overlap, exact_name,
+         path_overlap, tag_overlap, docstring_boost, long_preview) = np.fromiter(
+            itertools.chain.from_iterable(rows), dtype=np.float64, count=len(rows) * len(rows[0])
+        ).reshape(len(rows), -1).T
+        
+        # Enhanced name matching with token-based comparison
+        name_boost = self._name_boosts(name_overlap, exact_name.astype(bool), features)
+        
+        # Path/filename relevance boost: 5% per matching token
+        path_boost = 1.0 + 0.05 * path_overlap
+        
+        # Boost based on tag matches
+        tag_boost = 1.0 + 0.1 * tag_overlap
+        
+        # Slight penalty for very complex chunks (might be too specific)
+        length_penalty = np.where(long_preview > 0, 0.98, 1.0)
+        
+        scores = similarity * type_boost * name_boost * path_boost * tag_boost * docstring_boost * length_penalty
+        
+        # Stable sort keeps the index order among equal scores
+        order = np.argsort(-scores, kind='stable')
+        return [(float(scores[i]), results[i]) for i in order]
+    
+    def _query_features(self, original_query: str, intent_tags: List[str]) -> QueryFeatures:
+        """Compute the query properties used by _score_results."""
+        query_lower = original_query.lower()
+        query_tokens = self._normalize_to_tokens(query_lower)
+        is_entity_query = self._is_entity_like_query(original_query, query_tokens)
+        
+        if 'class' in query_lower:
+            # Strong preference for classes when "class" is mentioned
+            type_boosts = {'class': 1.3, 'function': 1.05, 'method': 1.05, 'module': 0.9}
+        elif is_entity_query:
+            # Moderate preference for classes on entity-like queries
+            type_boosts = {'class': 1.15, 'function': 1.1, 'method': 1.1, 'module': 0.92}
+        else:
+            # Default boosts for general queries
+            type_boosts = {'function': 1.1, 'method': 1.1, 'class': 1.05, 'module': 0.95}
+        
+        return QueryFeatures(
+            query_lower=query_lower,
+            tokens=frozenset(query_tokens),
+            is_entity_query=is_entity_query,
+            type_boosts=type_boosts,
+            intent_tags=frozenset(intent_tags)
+        )
+    
+    @staticmethod
+    def _name_boosts(overlap: np.ndarray, exact: np.ndarray, features: QueryFeatures) -> np.ndarray:
+        """Boost results whose name matches the query exactly or by tokens.
         
-        # Sort by calculated rank score
-        ranked_results = sorted(results, key=calculate_rank_score, reverse=True)
-        return ranked_results
+        Args:
+            overlap: Distinct query tokens found in each result's name
+            exact: Whether each name equals the query (case insensitive)
+            features: Query features
+        """
+        ratio = overlap / max(len(features.tokens), 1)
+        
+        # Strong boost for high overlap
+        boosts = np.select(
+            [overlap == 0, ratio >= 0.8, ratio >= 0.5, ratio >= 0.3],
+            [1.0, 1.3, 1.2, 1.1],
+            default=1.05
+        )
+        
+        # Exact match (case insensitive)
+        return np.where(exact, 1.4, boosts)
     
     def _normalize_to_tokens(self, text: str) -> List[str]:
         """Convert text to normalized tokens, handling CamelCase."""
-        import re
-        
-        # Split CamelCase and snake_case
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        text = text.replace('_', ' ').replace('-', ' ')
-        
-        # Extract alphanumeric tokens
-        tokens = re.findall(r'\w+', text.lower())
-        return tokens
+        return normalize_to_tokens(text)
     
     def _is_entity_like_query(self, query: str, query_tokens: List[str]) -> bool:
         """Detect if query looks like an entity/type name."""
@@ -325,61 +676,6 @@ class IntelligentSearcher:
         
         return len(query_tokens) <= 2  # Short noun phrases
     
-    def _calculate_name_boost(self, name: Optional[str], original_query: str, query_tokens: List[str]) -> float:
-        """Calculate boost based on name matching with robust token comparison."""
-        if not name:
-            return 1.0
-        
-        name_tokens = self._normalize_to_tokens(name)
-        
-        # Exact match (case insensitive)
-        if original_query.lower() == name.lower():
-            return 1.4
-        
-        # Token overlap calculation
-        query_set = set(query_tokens)
-        name_set = set(name_tokens)
-        
-        if not query_set or not name_set:
-            return 1.0
-        
-        overlap = len(query_set & name_set)
-        total_query_tokens = len(query_set)
-        
-        if overlap == 0:
-            return 1.0
-        
-        # Strong boost for high overlap
-        overlap_ratio = overlap / total_query_tokens
-        if overlap_ratio >= 0.8:  # 80%+ of query tokens match
-            return 1.3
-        elif overlap_ratio >= 0.5:  # 50%+ match
-            return 1.2
-        elif overlap_ratio >= 0.3:  # 30%+ match
-            return 1.1
-        else:
-            return 1.05
-    
-    def _calculate_path_boost(self, relative_path: str, query_tokens: List[str]) -> float:
-        """Calculate boost based on path/filename relevance."""
-        if not relative_path or not query_tokens:
-            return 1.0
-        
-        # Extract path components and filename
-        path_parts = relative_path.lower().replace('/', ' ').replace('\\', ' ')
-        path_tokens = self._normalize_to_tokens(path_parts)
-        
-        # Check for token overlap with path
-        query_set = set(query_tokens)
-        path_set = set(path_tokens)
-        
-        overlap = len(query_set & path_set)
-        if overlap > 0:
-            # Modest boost for path relevance
-            return 1.0 + (overlap * 0.05)  # 5% boost per matching token
-        
-        return 1.0
-    
     def search_by_file_pattern(
         self, 
         query: str, 
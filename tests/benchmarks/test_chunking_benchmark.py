@@ -0,0 +1,50 @@
+"""Per-language chunking micro-benchmark.
+
+Reports chunks/sec for each language using the multi-language sample files,
+replicated to a few hundred kilobytes. Run with ``pytest -m slow -s
+tests/benchmarks`` to see the numbers.
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from chunking.tree_sitter import TreeSitterChunker
+
+
+TEST_DATA_DIR = Path(__file__).parent.parent / 'test_data' / 'multi_language'
+TARGET_SIZE = 256 * 1024
+ROUNDS = 3
+
+
+@pytest.mark.slow
+@pytest.mark.chunking
+class TestChunkingBenchmark:
+    """Measure chunk_code throughput per language."""
+
+    @pytest.mark.parametrize(
+        'sample',
+        sorted(p.name for p in TEST_DATA_DIR.iterdir() if p.is_file()),
+    )
+    def test_chunks_per_second(self, sample):
+        """Benchmark chunking one replicated sample file."""
+        chunker = TreeSitterChunker().get_chunker(sample)
+        if chunker is None:
+            pytest.skip(f"No chunker available for {sample}")
+
+        source = (TEST_DATA_DIR / sample).read_text(encoding='utf-8')
+        source = '\n'.join([source] * max(1, TARGET_SIZE // len(source)))
+
+        best = float('inf')
+        chunk_count = 0
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            chunk_count = len(chunker.chunk_code(source))
+            best = min(best, time.perf_counter() - start)
+
+        assert chunk_count > 0
+        print(
+            f"\n{chunker.language_name:>10} {sample:<16} {len(source) / 1024:7.0f} KiB "
+            f"{chunk_count:6d} chunks {chunk_count / best:10.0f} chunks/sec"
+        )
@@ -0,0 +1,82 @@
+"""Import-time checks for MCP server startup.
+
+Runs ``python -X importtime`` on the server entry point in a fresh
+interpreter and fails if importing it pulls in the embedding model stack or,
+when run with ``pytest -m benchmark``, takes longer than the budget. Override
+the budget with ``IMPORT_TIME_BUDGET_MS`` on slow machines.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '2000'))
+# Modules that must only load once a tool needs them
+DEFERRED_MODULES = ('torch', 'sentence_transformers', 'transformers', 'faiss')
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def run_python(args, env=None) -> subprocess.CompletedProcess:
+    """Run the interpreter in a fresh process from the project root."""
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True,
+        cwd=PROJECT_ROOT, env=env,
+    )
+
+
+def server_import_times() -> dict:
+    """Cumulative import microseconds per module for the server entry point."""
+    result = run_python(['-X', 'importtime', '-c', 'import mcp_server.server'])
+
+    cumulative_us = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative_us[match.group(4)] = int(match.group(2))
+    return cumulative_us
+
+
+@pytest.mark.slow
+@pytest.mark.mcp
+class TestImportTime:
+    """Keep MCP server startup free of heavy imports."""
+
+    def test_server_import_defers_model_stack(self):
+        """Test that importing the server entry point loads no model libraries."""
+        loaded = [name for name in DEFERRED_MODULES if name in server_import_times()]
+        assert not loaded, f"Server import loads {loaded}"
+
+    @pytest.mark.benchmark
+    def test_server_import_budget(self):
+        """Test the cumulative import time of the server entry point."""
+        total_ms = server_import_times()['mcp_server.server'] / 1000
+        print(f"\nmcp_server.server import: {total_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+        assert total_ms < IMPORT_TIME_BUDGET_MS
+
+    def test_status_tools_without_torch(self, tmp_path):
+        """Test that list_projects and get_index_status do not load the model stack."""
+        script = (
+            "import json, sys\n"
+            "from mcp_server.code_search_server import CodeSearchServer\n"
+            "server = CodeSearchServer()\n"
+            "assert 'projects' in json.loads(server.list_projects())\n"
+            "status = json.loads(server.get_index_status())\n"
+            "assert status['model_information'] == {'status': 'not_loaded'}, status\n"
+            f"print([m for m in {DEFERRED_MODULES[:3]!r} if m in sys.modules])\n"
+        )
+        project = tmp_path / 'project'
+        project.mkdir()
+        env = dict(os.environ, CODE_SEARCH_STORAGE=str(tmp_path / 'storage'))
+
+        # The status tools use the working directory as the current project
+        setup = f"import os, sys\nsys.path.insert(0, {str(PROJECT_ROOT)!r})\nos.chdir({str(project)!r})\n"
+
+        result = run_python(['-c', setup + script], env=env)
+
+        assert result.stdout.strip() == '[]'
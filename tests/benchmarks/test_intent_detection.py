@@ -0,0 +1,43 @@
+"""Per-query overhead of intent detection.
+
+Compares one ``re.search`` per intent pattern (the approach before the
+vocabulary was compiled into a single expression) with
+IntelligentSearcher._detect_query_intent, and fails if the compiled
+detection exceeds the budget. Run with ``pytest -m benchmark``; override
+the budget with ``INTENT_BUDGET_US`` on slow machines.
+"""
+
+import os
+import timeit
+
+import pytest
+
+from search.searcher import DEFAULT_QUERY_PATTERNS, IntelligentSearcher
+from tests.fixtures.intent_queries import QUERIES, detect_separately
+
+INTENT_BUDGET_US = float(os.getenv('INTENT_BUDGET_US', '100'))
+ROUNDS = 2000
+
+
+def per_query_us(func) -> float:
+    """Best-of-five mean microseconds per query over all benchmark queries."""
+    timer = timeit.Timer(lambda: [func(query) for query in QUERIES])
+    return min(timer.repeat(repeat=5, number=ROUNDS // 10)) / (ROUNDS // 10) / len(QUERIES) * 1e6
+
+
+@pytest.mark.slow
+@pytest.mark.search
+class TestIntentDetectionSpeed:
+    """Keep intent detection cheap on every query."""
+
+    @pytest.mark.benchmark
+    def test_intent_detection_overhead(self):
+        """Test the per-query time of compiled against separate pattern searches."""
+        searcher = IntelligentSearcher(index_manager=None, embedder=None)
+
+        before_us = per_query_us(lambda query: detect_separately(DEFAULT_QUERY_PATTERNS, query))
+        after_us = per_query_us(searcher._detect_query_intent)
+
+        print(f"\nIntent detection per query: {before_us:.1f} us separate, {after_us:.1f} us compiled "
+              f"({before_us / after_us:.1f}x, budget {INTENT_BUDGET_US:.0f} us)")
+        assert after_us < INTENT_BUDGET_US
@@ -0,0 +1,45 @@
+"""Latency budget for re-ranking search candidates.
+
+Scores a large candidate set with IntelligentSearcher._score_results and
+fails if the median run exceeds the budget of 1 ms per 200 candidates.
+Run with ``pytest -m benchmark``; override the budget with
+``RERANK_BUDGET_MS`` on slow machines.
+"""
+
+import os
+import random
+import statistics
+import time
+
+import pytest
+
+from search.searcher import IntelligentSearcher
+from tests.fixtures.search_results import make_results
+
+RERANK_BUDGET_MS = float(os.getenv('RERANK_BUDGET_MS', '1'))
+
+
+@pytest.mark.slow
+@pytest.mark.search
+class TestRerankSpeed:
+    """Keep re-ranking cheap as search_k grows."""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize('n_candidates', [200, 1000])
+    def test_rerank_budget(self, n_candidates):
+        """Test the median time to score the candidates of one query."""
+        searcher = IntelligentSearcher(index_manager=None, embedder=None)
+        results = make_results(n_candidates, random.Random(0))
+        query = 'UserAccount login'
+        intent_tags = searcher._detect_query_intent(query)
+
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            searcher._score_results(results, query, intent_tags)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        median_ms = statistics.median(timings)
+        budget_ms = RERANK_BUDGET_MS * n_candidates / 200
+        print(f"\nRe-ranking {n_candidates} candidates: {median_ms:.3f} ms (budget {budget_ms:.1f} ms)")
+        assert median_ms < budget_ms
@@ -0,0 +1,75 @@
+"""Embedding results, code chunks and a query embedder for index and search tests."""
+
+import numpy as np
+
+from chunking.code_chunk import CodeChunk
+from embeddings.embedder import EmbeddingResult
+
+DIMENSION = 16
+
+
+def random_vector(seed, dimension=DIMENSION):
+    """Return a float32 vector drawn from a seeded generator."""
+    return np.random.RandomState(seed).randn(dimension).astype(np.float32)
+
+
+def make_result(path, name, embedding, lines=(1, 2), chunk_type='function', content=None, **metadata):
+    """Build the embedding result of a chunk; extra keyword arguments go into its metadata."""
+    start_line, end_line = lines
+    return EmbeddingResult(
+        embedding=embedding,
+        chunk_id=f'{path}:{start_line}-{end_line}:{chunk_type}:{name}',
+        metadata={
+            'file_path': f'/project/{path}',
+            'relative_path': path,
+            'folder_structure': path.split('/')[:-1],
+            'chunk_type': chunk_type,
+            'name': name,
+            'start_line': start_line,
+            'end_line': end_line,
+            'tags': [],
+            **metadata,
+        },
+        content=content
+    )
+
+
+def make_results(count, rng, dimension=DIMENSION):
+    """Build results for functions f0..f{count-1}, one per module, with random vectors."""
+    return [
+        make_result(f'module{i}.py', f'f{i}', rng.randn(dimension).astype(np.float32))
+        for i in range(count)
+    ]
+
+
+def make_chunk(path, content, name, chunk_type='function'):
+    """Build a two-line code chunk of `path`."""
+    return CodeChunk(
+        content=content, chunk_type=chunk_type, start_line=1, end_line=2,
+        file_path=f'/project/{path}', relative_path=path, folder_structure=[], name=name
+    )
+
+
+class FakeEmbedder:
+    """Embeds each query text to a fixed random vector and counts model calls.
+
+    With `vector` set, every query embeds to that vector instead.
+    """
+
+    def __init__(self, vector=None, dimension=DIMENSION):
+        self.vector = vector
+        self.dimension = dimension
+        self.calls = 0
+
+    def _vector(self, query):
+        if self.vector is not None:
+            return self.vector
+        return random_vector(sum(map(ord, query)), self.dimension)
+
+    def embed_query(self, query):
+        self.calls += 1
+        return self._vector(query)
+
+    def embed_queries(self, queries):
+        self.calls += 1
+        return np.stack([self._vector(q) for q in queries])
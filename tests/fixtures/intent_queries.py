@@ -0,0 +1,23 @@
+"""Queries and the pre-compilation intent detection, for intent tests and benchmarks."""
+
+import re
+
+QUERIES = [
+    'how does error handling work',
+    'user authentication and login',
+    'HTTP API request handlers',
+    'database connection and queries',
+    'unit test fixtures for the db model',
+    'parseConfigFile',
+    'multi\nline query with an exception',
+    '',
+]
+
+
+def detect_separately(patterns, query):
+    """Intent detection with one re.search per pattern, as before compilation."""
+    query_lower = query.lower()
+    return [
+        intent for intent, intent_patterns in patterns.items()
+        if any(re.search(pattern, query_lower) for pattern in intent_patterns)
+    ]
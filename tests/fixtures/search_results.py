@@ -0,0 +1,35 @@
+"""Randomized search candidates for re-ranking tests and benchmarks."""
+
+from search.bm25 import normalize_to_tokens, path_tokens
+from search.searcher import SearchResult
+
+NAMES = ['UserAccount', 'parse_config', 'login', 'handle_error', 'DatabaseConnection', None, 'user']
+PATHS = ['src/auth/user_account.py', 'config/parser.py', 'db/connection.py', 'README.md', '']
+TYPES = ['function', 'method', 'class', 'module', 'unknown']
+
+
+def make_results(n, rng, stored_tokens=True):
+    """Build n search results with random names, paths, types and tags."""
+    results = []
+    for i in range(n):
+        name = rng.choice(NAMES)
+        path = rng.choice(PATHS)
+        results.append(SearchResult(
+            chunk_id=f'chunk{i}', similarity_score=rng.random(), content_preview='x' * rng.choice([10, 1200]),
+            file_path=path, relative_path=path, folder_structure=[], chunk_type=rng.choice(TYPES),
+            name=name, parent_name=None, start_line=1, end_line=2,
+            docstring=rng.choice([None, 'Docs.']), tags=rng.sample(['auth', 'database', 'api', 'testing'], 2),
+            context_info={},
+            name_tokens=normalize_to_tokens(name or '') if stored_tokens else None,
+            path_tokens=path_tokens(path) if stored_tokens else None
+        ))
+    return results
+
+
+def make_search_result(chunk_id, score):
+    """Build a bare search result whose name and path are its chunk id."""
+    return SearchResult(
+        chunk_id=chunk_id, similarity_score=score, content_preview='', file_path=chunk_id,
+        relative_path=chunk_id, folder_structure=[], chunk_type='function', name=chunk_id,
+        parent_name=None, start_line=1, end_line=2, docstring=None, tags=[], context_info={}
+    )
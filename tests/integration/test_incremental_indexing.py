@@ -1,6 +1,7 @@
 """Integration tests for incremental indexing."""
 
 import tempfile
+import threading
 import time
 from pathlib import Path
 from unittest import TestCase
@@ -199,6 +200,137 @@ class Calculator:
         assert result2.chunks_removed > 0
         assert result2.chunks_added > 0
     
+    def test_unchanged_chunks_reused(self):
+        """Test that unchanged chunks of a modified file keep their vectors."""
+        indexer = Indexer(storage_dir=str(self.index_dir))
+        embedder = CodeEmbedder()
+        chunker = MultiLanguageChunker(str(self.test_path))
+        
+        incremental_indexer = IncrementalIndexer(
+            indexer=indexer,
+            embedder=embedder,
+            chunker=chunker,
+            snapshot_manager=self.snapshot_manager
+        )
+        incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        
+        before = indexer.get_chunks_for_files(['utils.py'])['utils.py']
+        before_ids = {chunk_id: metadata for chunk_id, metadata in before}
+        subtract_id = next(cid for cid, m in before if m.get('name') == 'subtract')
+        
+        # Shift everything down two lines and change only helper's body
+        (self.test_path / 'utils.py').write_text('''
+# Utilities
+
+def helper(x, y):
+    """Helper function."""
+    return x * y
+
+class Calculator:
+    """Simple calculator."""
+    
+    def add(self, a, b):
+        return a + b
+    
+    def subtract(self, a, b):
+        return a - b
+''')
+        
+        result = incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        
+        assert result.success
+        assert result.files_modified == 1
+        assert result.chunks_reused > 0
+        # Only the helper chunk is re-embedded
+        assert result.chunks_added == 1
+        assert result.chunks_removed == 1
+        
+        after = dict(indexer.get_chunks_for_files(['utils.py'])['utils.py'])
+        start, end = before_ids[subtract_id]['start_line'] + 2, before_ids[subtract_id]['end_line'] + 2
+        moved_id = subtract_id.replace(f"{start - 2}-{end - 2}", f"{start}-{end}")
+        # Kept chunks move to the id encoding their current lines
+        assert subtract_id not in after
+        assert after[moved_id]['start_line'] == start
+        for chunk_id, metadata in after.items():
+            assert chunk_id.split(':')[1] == f"{metadata['start_line']}-{metadata['end_line']}"
+        assert indexer.get_index_size() == len(indexer._chunk_ids)
+        lexical = [chunk_id for chunk_id, _, _ in indexer.lexical_search('subtract', k=10)]
+        assert moved_id in lexical and subtract_id not in lexical
+    
+    def test_failed_embedding_leaves_index_unchanged(self):
+        """Test that a modified file keeps its chunks when embedding fails."""
+        indexer = Indexer(storage_dir=str(self.index_dir))
+        embedder = CodeEmbedder()
+        incremental_indexer = IncrementalIndexer(
+            indexer=indexer,
+            embedder=embedder,
+            chunker=MultiLanguageChunker(str(self.test_path)),
+            snapshot_manager=self.snapshot_manager
+        )
+        incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        before = sorted(indexer.get_chunks_for_files(['utils.py'])['utils.py'])
+        
+        (self.test_path / 'utils.py').write_text('\n# Utilities\n\ndef helper(x, y):\n    return x * y\n')
+        embed_chunks = embedder.embed_chunks
+        
+        def crash(*args, **kwargs):
+            raise RuntimeError("model crashed")
+        
+        embedder.embed_chunks = crash
+        
+        failed = incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        
+        assert not failed.success
+        assert failed.error == 'model crashed'
+        assert sorted(indexer.get_chunks_for_files(['utils.py'])['utils.py']) == before
+        
+        # The snapshot was not advanced, so the next run picks the change up again
+        embedder.embed_chunks = embed_chunks
+        result = incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        assert result.success
+        assert result.files_modified == 1
+        names = {m['name'] for _, m in indexer.get_chunks_for_files(['utils.py'])['utils.py']}
+        assert names == {'helper'}
+    
+    def test_ivf_index_reuses_vectors(self):
+        """Test that a modified file reindexes on an IVF index and reuses known vectors."""
+        (self.test_path / 'handlers.py').write_text(''.join(
+            f'def handle_{i}(request):\n    """Handle request {i}."""\n    return request.reply({i})\n\n\n'
+            for i in range(150)
+        ))
+        indexer = Indexer(storage_dir=str(self.index_dir))
+        # Small projects get flat indexes; force the type used above 10000 chunks
+        create_index = indexer.create_index
+        indexer.create_index = lambda dimension, index_type='flat': create_index(dimension, 'ivf')
+        embedder = CodeEmbedder()
+        incremental_indexer = IncrementalIndexer(
+            indexer=indexer,
+            embedder=embedder,
+            chunker=MultiLanguageChunker(str(self.test_path)),
+            snapshot_manager=self.snapshot_manager
+        )
+        incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        assert type(indexer.index).__name__ == 'IndexIVFFlat'
+        encoded = []
+        encode = embedder._model.encode
+        embedder._model.encode = lambda texts, **kwargs: encoded.extend(texts) or encode(texts, **kwargs)
+        vectors_before = indexer.index.ntotal
+        
+        # A copy of an indexed function reuses its stored vector
+        copy = 'def handle_7(request):\n    """Handle request 7."""\n    return request.reply(7)\n'
+        (self.test_path / 'utils.py').write_text(
+            (self.test_path / 'utils.py').read_text() + '\n\n' + copy
+        )
+        
+        result = incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        
+        assert result.success
+        assert result.files_modified == 1
+        names = [m.get('name') for _, m in indexer.get_chunks_for_files(['utils.py'])['utils.py']]
+        assert 'handle_7' in names and 'helper' in names
+        assert indexer.index.ntotal == vectors_before
+        assert encoded == []
+    
     def test_file_addition(self):
         """Test incremental indexing when files are added."""
         indexer = Indexer(storage_dir=str(self.index_dir))
@@ -275,6 +407,41 @@ class NewClass:
         assert result2.files_modified == 0
         assert result2.chunks_removed > 0
     
+    def test_cancelled_index_leaves_index_unchanged(self):
+        """Test that a cancelled run stops before modifying the index."""
+        indexer = Indexer(storage_dir=str(self.index_dir))
+        cancel_event = threading.Event()
+        incremental_indexer = IncrementalIndexer(
+            indexer=indexer,
+            embedder=CodeEmbedder(),
+            chunker=MultiLanguageChunker(str(self.test_path)),
+            snapshot_manager=self.snapshot_manager,
+            cancel_event=cancel_event
+        )
+        
+        incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        total_before = indexer.get_stats()['total_chunks']
+        
+        (self.test_path / 'utils.py').unlink()
+        (self.test_path / 'new_module.py').write_text('def added():\n    return 1\n')
+        cancel_event.set()
+        
+        cancelled = incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        assert not cancelled.success
+        assert cancelled.error == 'Indexing cancelled'
+        assert indexer.get_stats()['total_chunks'] == total_before
+        
+        forced = incremental_indexer.incremental_index(str(self.test_path), 'test_project', force_full=True)
+        assert not forced.success
+        assert indexer.get_stats()['total_chunks'] == total_before
+        
+        # The changes are still pending for the next run
+        cancel_event.clear()
+        result = incremental_indexer.incremental_index(str(self.test_path), 'test_project')
+        assert result.success
+        assert result.files_added == 1
+        assert result.files_removed == 1
+    
     def test_change_detection(self):
         """Test change detection using Merkle trees."""
         detector = ChangeDetector(self.snapshot_manager)
@@ -106,3 +106,116 @@ class TestMCPProjectStorage:
         projects = projects_data.get("projects", [])
         for project in projects:
             assert "project_hash" in project, "Project should have a hash for isolation"
+
+    def test_search_named_project_without_switching(self, tmp_path):
+        """Test that searches can target a project without reloading or switching."""
+        self.server.index_test_project()
+        test_project = self.server._current_project
+
+        other = tmp_path / 'other_project'
+        other.mkdir()
+        (other / 'billing.py').write_text('def charge_card(amount):\n    return amount\n')
+        result = json.loads(self.server.index_directory(str(other)))
+        assert result.get('success'), result
+        assert self.server._current_project == str(other.resolve())
+
+        pool = self.server._get_index_pool()
+        loads = pool.loads
+        for project in [test_project, str(other), test_project, str(other)]:
+            search_data = json.loads(self.server.search_code("charge", k=2, project=project))
+            assert "results" in search_data, search_data
+
+        assert pool.loads == loads
+        assert self.server._current_project == str(other.resolve())
+
+        missing = json.loads(self.server.search_code("charge", project=str(tmp_path / 'missing')))
+        assert "error" in missing
+
+    def test_search_code_batch(self, tmp_path):
+        """Test several queries in one call."""
+        project = tmp_path / 'project'
+        project.mkdir()
+        (project / 'billing.py').write_text('def charge_card(amount):\n    return amount\n')
+        (project / 'accounts.py').write_text('class UserAccount:\n    def login(self):\n        pass\n')
+        assert json.loads(self.server.index_directory(str(project))).get('success')
+
+        queries = ["charge a card", "user login"]
+        data = json.loads(self.server.search_code_batch(queries, k=2, project=str(project)))
+
+        assert "error" not in data, data.get("error")
+        assert [entry['query'] for entry in data['results']] == queries
+        assert all(0 < len(entry['results']) <= 2 for entry in data['results'])
+        assert "error" in json.loads(self.server.search_code_batch([]))
+
+    def test_search_response_cache(self, tmp_path):
+        """Test that repeated searches are cached until the index changes."""
+        project = tmp_path / 'project'
+        project.mkdir()
+        (project / 'billing.py').write_text('def charge_card(amount):\n    return amount\n')
+        assert json.loads(self.server.index_directory(str(project))).get('success')
+
+        first = self.server.search_code("charge", k=2, project=str(project), auto_reindex=False)
+        assert self.server.search_code("charge", k=2, project=str(project), auto_reindex=False) == first
+        assert self.server._result_cache.hits == 1
+
+        self.server.search_code("charge", k=3, project=str(project), auto_reindex=False)
+        assert self.server._result_cache.hits == 1
+
+        (project / 'accounts.py').write_text('class UserAccount:\n    def login(self):\n        pass\n')
+        assert json.loads(self.server.index_directory(str(project))).get('success')
+        self.server.search_code("charge", k=2, project=str(project), auto_reindex=False)
+        assert self.server._result_cache.hits == 1
+
+        status = json.loads(self.server.get_index_status(project=str(project)))
+        assert status['result_cache']['entries'] == 1
+
+    def test_find_duplicate_code(self, tmp_path):
+        """Test clusters of copied code."""
+        project = tmp_path / 'project'
+        (project / 'vendor').mkdir(parents=True)
+        code = 'def charge_card(amount):\n    return amount\n'
+        (project / 'billing.py').write_text(code)
+        (project / 'vendor' / 'billing.py').write_text(code)
+        (project / 'accounts.py').write_text('class UserAccount:\n    def login(self):\n        pass\n')
+        assert json.loads(self.server.index_directory(str(project))).get('success')
+
+        assert 'suggestion' in json.loads(self.server.find_duplicate_code(project=str(project)))
+        data = json.loads(self.server.find_duplicate_code(project=str(project), rebuild=True))
+
+        assert "error" not in data, data.get("error")
+        assert data['total_clusters'] == 1
+        assert sorted(chunk['file'] for chunk in data['clusters'][0]['chunks']) == ['billing.py', 'vendor/billing.py']
+
+        # Re-indexing keeps the built graph current
+        (project / 'orders.py').write_text('def place_order(items):\n    return list(items)\n')
+        assert json.loads(self.server.index_directory(str(project))).get('success')
+        data = json.loads(self.server.find_duplicate_code(project=str(project)))
+        assert "error" not in data, data.get("error")
+        assert data['total_clusters'] == 1
+
+    def test_federated_search(self, tmp_path, monkeypatch):
+        """Test one query across all indexed projects."""
+        from common_utils import get_storage_dir
+
+        monkeypatch.setenv('CODE_SEARCH_STORAGE', str(tmp_path / 'storage'))
+        get_storage_dir.cache_clear()
+        try:
+            for name, code in [('billing', 'def charge_card(amount):\n    return amount\n'),
+                               ('accounts', 'class UserAccount:\n    def login(self):\n        pass\n')]:
+                project = tmp_path / name
+                project.mkdir()
+                (project / f'{name}.py').write_text(code)
+                assert json.loads(self.server.index_directory(str(project))).get('success')
+
+            data = json.loads(self.server.search_code("charge", k=10, search_mode="federated"))
+            assert data['projects_searched'] == 2
+            assert {r['project'] for r in data['results']} == {'billing', 'accounts'}
+            assert all('calibrated_score' in r for r in data['results'])
+
+            data = json.loads(self.server.search_code("charge", projects=[str(tmp_path / 'billing')]))
+            assert {r['project'] for r in data['results']} == {'billing'}
+
+            data = json.loads(self.server.search_code("charge", projects=[str(tmp_path)]))
+            assert 'error' in data
+        finally:
+            get_storage_dir.cache_clear()
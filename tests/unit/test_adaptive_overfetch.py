@@ -0,0 +1,71 @@
+"""Unit tests for widening filtered searches until enough results pass."""
+
+import numpy as np
+import pytest
+
+from search.indexer import CodeIndexManager, SearchStats
+from tests.fixtures.index_results import DIMENSION, make_result
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestAdaptiveOverfetch:
+    """Test geometric expansion of the candidate count."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test fixtures."""
+        rng = np.random.RandomState(0)
+        self.query = np.ones(DIMENSION, dtype=np.float32)
+        results = []
+        for i in range(500):
+            # Most chunks point towards the query; the rare classes point away
+            is_class = i in (10, 20, 30)
+            direction = -self.query if is_class else self.query
+            results.append(make_result(
+                'models.py' if is_class else f'module{i}.py', f'f{i}',
+                (direction + rng.rand(DIMENSION) * 0.5).astype(np.float32),
+                chunk_type='class' if is_class else 'function'
+            ))
+        self.index_manager = CodeIndexManager(str(tmp_path / 'index'))
+        self.index_manager.add_embeddings(results)
+
+    def test_selective_filter_widens_search(self):
+        """Test that rare matches are found behind many filtered-out candidates."""
+        stats = SearchStats()
+
+        results = self.index_manager.search(self.query, k=3, filters={'chunk_type': 'class'}, stats=stats)
+
+        assert sorted(chunk_id for chunk_id, _, _ in results) == [
+            'models.py:1-2:class:f10', 'models.py:1-2:class:f20', 'models.py:1-2:class:f30'
+        ]
+        assert stats.expansions > 0
+        assert stats.candidates == 500
+        assert stats.exhausted == 0
+
+    def test_unfiltered_search_does_not_widen(self):
+        """Test that searches with enough candidates run once."""
+        stats = SearchStats()
+
+        results = self.index_manager.search(self.query, k=5, stats=stats)
+
+        assert len(results) == 5
+        assert stats.expansions == 0
+        assert stats.candidates == 15
+
+    def test_min_results_and_exhaustion(self):
+        """Test the minimum worth widening for, and queries the whole index cannot satisfy."""
+        stats = SearchStats()
+        queries = np.stack([self.query, -self.query])
+
+        results = self.index_manager.search_many(
+            queries, k=5, filters={'chunk_type': 'class'}, min_results=3, stats=stats
+        )
+
+        assert [len(r) for r in results] == [3, 3]
+        assert stats.exhausted == 0
+
+        stats = SearchStats()
+        results = self.index_manager.search(self.query, k=5, filters={'chunk_type': 'class'}, stats=stats)
+        assert len(results) == 3
+        assert stats.exhausted == 1
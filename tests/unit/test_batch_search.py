@@ -0,0 +1,53 @@
+"""Unit tests for searching many queries in one call."""
+
+import numpy as np
+import pytest
+
+from search.indexer import CodeIndexManager
+from search.searcher import IntelligentSearcher
+from tests.fixtures.index_results import DIMENSION, FakeEmbedder, make_result
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestBatchSearch:
+    """Test that batch search matches separate searches."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test fixtures."""
+        rng = np.random.RandomState(0)
+        self.index_manager = CodeIndexManager(str(tmp_path / 'index'))
+        self.index_manager.add_embeddings([
+            make_result(
+                f'src/module{i % 4}.py', f'f{i}', rng.randn(DIMENSION).astype(np.float32), lines=(i, i + 1),
+                chunk_type='function' if i % 2 else 'class', content_preview=f'def f{i}(): pass'
+            )
+            for i in range(40)
+        ])
+        self.embedder = FakeEmbedder()
+        self.searcher = IntelligentSearcher(self.index_manager, self.embedder)
+        self.queries = ['parse config', 'handle error', 'open database connection']
+
+    def test_index_search_many_matches_search(self):
+        """Test that one multi-row FAISS search returns the per-query results."""
+        embeddings = self.embedder.embed_queries(self.queries)
+        original = embeddings.copy()
+
+        batch = self.index_manager.search_many(embeddings, k=5, filters={'chunk_type': 'function'})
+
+        assert batch == [
+            self.index_manager.search(row, k=5, filters={'chunk_type': 'function'}) for row in embeddings
+        ]
+        assert all(len(results) == 5 for results in batch)
+        np.testing.assert_array_equal(embeddings, original)
+
+    def test_searcher_search_many_matches_search(self):
+        """Test that batch search embeds once and ranks like separate searches."""
+        batch = self.searcher.search_many(self.queries, k=3, context_depth=0)
+
+        assert self.embedder.calls == 1
+        expected = [self.searcher.search(q, k=3, context_depth=0) for q in self.queries]
+        assert [[r.chunk_id for r in results] for results in batch] == \
+            [[r.chunk_id for r in results] for results in expected]
+        assert self.searcher.search_many([]) == []
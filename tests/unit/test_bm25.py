@@ -0,0 +1,135 @@
+"""Unit tests for the BM25 index and hybrid search."""
+
+import numpy as np
+import pytest
+
+from search.bm25 import BM25Index, normalize_to_tokens
+from search.indexer import CodeIndexManager
+from search.searcher import IntelligentSearcher
+from tests.fixtures.index_results import DIMENSION, FakeEmbedder, make_result, random_vector
+
+# Every query embeds to the same random vector, so semantic ranks are noise
+QUERY = random_vector(1)
+
+
+@pytest.mark.unit
+class TestBM25Index:
+    """Test tokenization, scoring and incremental updates."""
+
+    def test_identifier_tokens(self):
+        """Test that identifiers split on case and separators."""
+        assert normalize_to_tokens('parseHTTPConfig load_user-id') == ['parse', 'httpconfig', 'load', 'user', 'id']
+        assert normalize_to_tokens('UserAccount') == ['user', 'account']
+
+    def test_rare_terms_score_higher(self):
+        """Test that matches on rare tokens beat matches on common ones."""
+        index = BM25Index()
+        index.add('a', ['user', 'session', 'token'])
+        index.add('b', ['user', 'profile'])
+        index.add('c', ['user', 'settings'])
+
+        ranked = index.search(['user', 'token'])
+
+        assert [chunk_id for chunk_id, _ in ranked][0] == 'a'
+        assert len(ranked) == 3
+        assert index.search(['missing']) == []
+
+    def test_add_replace_remove(self, tmp_path):
+        """Test that updates keep postings consistent and survive a reload."""
+        index = BM25Index()
+        index.add('a', ['alpha', 'beta'])
+        index.add('a', ['gamma'])
+        index.add('b', ['gamma', 'gamma'])
+
+        assert index.search(['alpha']) == []
+        assert index.remove('b')
+        assert not index.remove('b')
+        assert [chunk_id for chunk_id, _ in index.search(['gamma'])] == ['a']
+
+        index.save(tmp_path / 'bm25.pkl')
+        loaded = BM25Index.load(tmp_path / 'bm25.pkl')
+        assert len(loaded) == 1
+        assert loaded.search(['gamma']) == index.search(['gamma'])
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestHybridSearch:
+    """Test BM25 alongside FAISS and reciprocal rank fusion."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test fixtures."""
+        rng = np.random.RandomState(0)
+        names = [f'helper_{i}' for i in range(30)] + ['parse_config_file']
+        self.storage_dir = tmp_path / 'index'
+        self.index_manager = CodeIndexManager(str(self.storage_dir))
+        results = []
+        for i, name in enumerate(names):
+            content = f'def {name}(path):\n    # long body\n    return load_settings(path)\n'
+            results.append(make_result(
+                f'src/module{i}.py', name, rng.randn(DIMENSION).astype(np.float32), lines=(1, 5),
+                content=content, content_preview=content[:20]
+            ))
+        # The target points away from every query, so vector search ranks it last
+        results[-1].embedding = -QUERY
+        self.results = results
+        self.index_manager.add_embeddings(results)
+        self.searcher = IntelligentSearcher(self.index_manager, FakeEmbedder(QUERY))
+        self.target = 'src/module30.py:1-5:function:parse_config_file'
+
+    def test_identifier_query_ranks_exact_match_first(self):
+        """Test that hybrid search finds an identifier the embedding misses."""
+        semantic = self.searcher.search('parseConfigFile', k=2, search_mode='semantic', context_depth=0)
+        hybrid = self.searcher.search('parseConfigFile', k=2, search_mode='hybrid', context_depth=0)
+
+        assert self.target not in [r.chunk_id for r in semantic]
+        assert hybrid[0].chunk_id == self.target
+        assert hybrid[0].similarity_score == pytest.approx(-1.0, abs=1e-5)
+
+    def test_hybrid_search_on_ivf_index(self, tmp_path):
+        """Test that lexical-only hits get dense scores from an IVF index."""
+        index_manager = CodeIndexManager(str(tmp_path / 'ivf'))
+        index_manager.create_index(DIMENSION, 'ivf')
+        index_manager.add_embeddings(self.results)
+        searcher = IntelligentSearcher(index_manager, FakeEmbedder(QUERY))
+
+        hybrid = searcher.search('parseConfigFile', k=2, search_mode='hybrid', context_depth=0)
+
+        assert hybrid[0].chunk_id == self.target
+        assert hybrid[0].similarity_score == pytest.approx(-1.0, abs=1e-5)
+
+        index_manager.save_index()
+        reloaded = CodeIndexManager(str(tmp_path / 'ivf'))
+        assert reloaded.similarities(QUERY, [self.target]) == pytest.approx([-1.0], abs=1e-5)
+
+    def test_identifier_queries(self):
+        """Test which queries count as identifiers."""
+        for query in ['parseConfigFile', 'parse_config_file', 'config.load', 'Parser::parse', 'load()']:
+            assert IntelligentSearcher._is_identifier_query(query), query
+        for query in ['authentication', 'parse config file', 'Config']:
+            assert not IntelligentSearcher._is_identifier_query(query), query
+
+    def test_full_content_is_indexed(self):
+        """Test that tokens beyond the stored preview are searchable."""
+        ranked = self.index_manager.lexical_search('load settings', k=50)
+        assert len(ranked) == 31
+
+    def test_removals_update_lexical_index(self):
+        """Test that removed chunks drop out of lexical results."""
+        self.index_manager.remove_file_chunks('src/module30.py')
+        assert self.index_manager.lexical_search('parse_config_file') == []
+
+    def test_missing_bm25_file_is_rebuilt(self):
+        """Test that indexes saved before BM25 existed get a lexical index on load."""
+        self.index_manager.save_index()
+        (self.storage_dir / 'bm25.pkl').unlink()
+
+        reloaded = CodeIndexManager(str(self.storage_dir))
+
+        assert reloaded.lexical_search('parse_config_file')[0][0] == self.target
+
+    def test_fuse_rankings(self):
+        """Test that items ranked by both retrievers win."""
+        fused = IntelligentSearcher._fuse_rankings([['a', 'b', 'c'], ['b', 'd', 'a']])
+        assert [chunk_id for chunk_id, _ in fused][:2] == ['b', 'a']
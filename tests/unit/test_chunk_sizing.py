@@ -0,0 +1,74 @@
+"""Unit tests for size-bounded chunk splitting and merging."""
+
+import pytest
+
+from chunking.chunk_sizing import ChunkSizeLimits, estimate_tokens
+from chunking.languages import JavaScriptChunker, PythonChunker
+
+
+@pytest.mark.unit
+class TestChunkSizing:
+    """Test splitting of large and merging of small chunks."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test fixtures."""
+        try:
+            self.python = PythonChunker()
+            self.javascript = JavaScriptChunker()
+        except ValueError:
+            pytest.skip("tree-sitter-python or tree-sitter-javascript not installed")
+
+    def test_limits_from_max_seq_length(self):
+        """Test deriving token targets from the model's sequence length."""
+        limits = ChunkSizeLimits.from_max_seq_length(2048)
+
+        assert limits.max_tokens < 2048
+        assert limits.min_tokens < limits.merge_tokens < limits.max_tokens
+        assert 0 < limits.overlap_tokens < limits.max_tokens
+
+    def test_split_at_statement_boundaries(self):
+        """Test that an oversized function is split into overlapping parts."""
+        body = '\n'.join(f'    value_{i} = compute_something(value_{i - 1}, {i})' for i in range(1, 80))
+        code = f'def long_function(value_0):\n{body}\n    return value_79\n'
+        self.python.size_limits = ChunkSizeLimits(max_tokens=300, min_tokens=0, merge_tokens=0, overlap_tokens=40)
+
+        parts = self.python.chunk_code(code)
+
+        assert len(parts) > 2
+        assert parts[0].start_line == 1
+        assert parts[-1].end_line == 81
+        for previous, part in zip(parts, parts[1:]):
+            # Consecutive parts overlap by a few lines and never skip any
+            assert previous.start_line < part.start_line <= previous.end_line
+        for part in parts:
+            assert estimate_tokens(part.content) <= 300 + 20
+            assert part.metadata['name'] == 'long_function'
+            assert part.metadata['part_count'] == len(parts)
+        assert [p.metadata['part'] for p in parts] == list(range(1, len(parts) + 1))
+
+    def test_small_chunks_within_limit_are_kept(self):
+        """Test that chunks between the limits are left untouched."""
+        code = 'def small(a):\n    return a + 1\n\ndef other(b):\n    return b * 2\n'
+        self.python.size_limits = ChunkSizeLimits(max_tokens=300, min_tokens=5, merge_tokens=75, overlap_tokens=30)
+
+        chunks = self.python.chunk_code(code)
+
+        assert [c.metadata['name'] for c in chunks] == ['small', 'other']
+
+    def test_merge_small_siblings(self):
+        """Test that runs of tiny sibling functions are packed together."""
+        handlers = '\n'.join(f'function on{i}(e) {{ return e.id; }}' for i in range(6))
+        code = f'{handlers}\n\nclass Store {{\n  get(id) {{ return this.items[id]; }}\n}}\n'
+        self.javascript.size_limits = ChunkSizeLimits(max_tokens=200, min_tokens=20, merge_tokens=45, overlap_tokens=20)
+
+        chunks = self.javascript.chunk_code(code)
+
+        merged = [c for c in chunks if c.metadata.get('merged_count')]
+        assert merged
+        assert merged[0].metadata['name'].startswith('on0, on1')
+        assert sum(c.metadata['merged_count'] for c in merged) == 6
+        assert all(estimate_tokens(c.content) <= 45 + 2 for c in merged)
+        # Containers and chunks under a different parent are not merged in
+        assert any(c.node_type == 'class_declaration' for c in chunks)
+        assert any(c.node_type == 'method_definition' for c in chunks)
@@ -0,0 +1,100 @@
+"""Unit tests for out-of-line storage of chunk content."""
+
+import pytest
+
+from search.content_store import ContentStore, _encode, content_hash
+from search.indexer import CodeIndexManager
+from tests.fixtures.index_results import make_result, random_vector
+
+
+@pytest.mark.unit
+class TestContentStore:
+    """Test the compressed content-addressed store."""
+
+    def test_roundtrip_and_compression(self, tmp_path):
+        """Test that bodies survive a reopen and are stored compressed."""
+        content = "def handler(request):\n    return request\n" * 200
+        digest = content_hash(content)
+
+        store = ContentStore(tmp_path / 'content.db')
+        assert store.put_many({digest: content}) == 1
+        assert store.put_many({digest: content}) == 0
+        store.close()
+
+        reopened = ContentStore(tmp_path / 'content.db')
+        assert reopened.get(digest) == content
+        assert reopened.get('missing') is None
+        assert len(reopened) == 1
+        reopened.close()
+        assert len(_encode(content)) < len(content) / 10
+
+    def test_bodies_are_deleted_with_their_last_reference(self, tmp_path):
+        """Test reference counting, across a reopen, and that uncounted bodies are kept."""
+        store = ContentStore(tmp_path / 'content.db')
+        store.add_references({content_hash(text): text for text in ('a', 'b')}, {content_hash('a'): 2, content_hash('b'): 1})
+        store.put_many({content_hash('c'): 'c'})
+        store.close()
+
+        reopened = ContentStore(tmp_path / 'content.db')
+        assert reopened.release({content_hash('a'): 1, content_hash('b'): 1, content_hash('c'): 1}) == 1
+        assert content_hash('b') not in reopened
+        assert content_hash('a') in reopened and content_hash('c') in reopened
+        assert reopened.release({content_hash('a'): 1}) == 1
+        assert len(reopened) == 1
+        reopened.close()
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestIndexContent:
+    """Test that the index keeps bodies out of its metadata rows."""
+
+    def test_metadata_rows_hold_only_the_hash(self, tmp_path):
+        """Test that content is fetched lazily by hash and shared between identical chunks."""
+        manager = CodeIndexManager(str(tmp_path / 'index'))
+        manager.add_embeddings([
+            make_result('a.py', 'f', random_vector(0), content='def f(): pass'),
+            make_result('b.py', 'f', random_vector(1), content='def f(): pass'),
+            make_result('c.py', 'g', random_vector(2), content='def g(): pass'),
+        ])
+
+        metadata = manager.get_chunk_by_id('a.py:1-2:function:f')
+        assert 'content' not in metadata
+        assert metadata['content_hash'] == content_hash('def f(): pass')
+        assert manager.get_chunk_content('b.py:1-2:function:f') == 'def f(): pass'
+        assert manager.get_chunk_content('missing') is None
+        assert len(manager._content_store) == 2
+
+    def test_inline_content_is_moved_out(self, tmp_path):
+        """Test that callers still passing content in metadata get it stored out-of-line."""
+        manager = CodeIndexManager(str(tmp_path / 'index'))
+        result = make_result('a.py', 'f', random_vector(0))
+        result.metadata['content'] = 'def f(): pass'
+        manager.add_embeddings([result])
+
+        assert 'content' not in manager.get_chunk_by_id('a.py:1-2:function:f')
+        assert manager.get_chunk_content('a.py:1-2:function:f') == 'def f(): pass'
+
+    def test_removal_drops_unreferenced_bodies(self, tmp_path):
+        """Test that bodies go with their last chunk, without a save, and are cleared with the index."""
+        manager = CodeIndexManager(str(tmp_path / 'index'))
+        manager.add_embeddings([
+            make_result('a.py', 'f', random_vector(0), content='def f(): pass'),
+            make_result('b.py', 'g', random_vector(1), content='def g(): pass'),
+            make_result('c.py', 'g', random_vector(2), content='def g(): pass'),
+            make_result('d.py', 'h', random_vector(3), content='def h(): pass'),
+        ])
+        # Re-adding a chunk with new content releases its old body
+        manager.add_embeddings([make_result('d.py', 'h', random_vector(3), content='def h(): return 1')])
+
+        manager.remove_file_chunks('b.py')
+        assert content_hash('def g(): pass') in manager._content_store
+        manager.remove_chunks(['c.py:1-2:function:g'])
+
+        assert content_hash('def f(): pass') in manager._content_store
+        assert content_hash('def g(): pass') not in manager._content_store
+        assert content_hash('def h(): pass') not in manager._content_store
+        assert manager.get_chunk_content('d.py:1-2:function:h') == 'def h(): return 1'
+
+        manager.clear_index()
+        assert not manager.content_path.exists()
@@ -0,0 +1,179 @@
+"""Unit tests for sharing one vector between identical chunks."""
+
+import faiss
+import numpy as np
+import pytest
+
+from embeddings.embedder import embedding_input_hash
+from search.indexer import CodeIndexManager
+from search.searcher import IntelligentSearcher
+from tests.fixtures.index_results import DIMENSION, make_chunk, make_result, random_vector
+
+HELPER = "def slugify(text):\n    return text.lower().replace(' ', '-')"
+
+
+@pytest.mark.unit
+@pytest.mark.embeddings
+class TestEmbedderDeduplication:
+    """Test that identical embedding inputs are encoded once."""
+
+    def test_identical_inputs_are_encoded_once(self, embedder_with_cleanup):
+        """Test that copies share the embedding of a single model input."""
+        encoded = []
+        encode = embedder_with_cleanup._model.encode
+        embedder_with_cleanup._model.encode = lambda texts, **kwargs: encoded.extend(texts) or encode(texts, **kwargs)
+        chunks = [
+            make_chunk('a.py', HELPER, 'slugify'), make_chunk('vendor/a.py', HELPER, 'slugify'),
+            make_chunk('b.py', 'def other(): pass', 'other')
+        ]
+
+        results = embedder_with_cleanup.embed_chunks(chunks)
+
+        assert len(encoded) == 2
+        assert [r.chunk_id for r in results] == ['a.py:1-2:function:slugify', 'vendor/a.py:1-2:function:slugify',
+                                                 'b.py:1-2:function:other']
+        assert results[0].metadata['embedding_hash'] == results[1].metadata['embedding_hash']
+        assert np.array_equal(results[0].embedding, results[1].embedding)
+
+    def test_reuse_skips_known_inputs(self, embedder_with_cleanup):
+        """Test that inputs already in an index are not encoded again."""
+        encoded = []
+        encode = embedder_with_cleanup._model.encode
+        embedder_with_cleanup._model.encode = lambda texts, **kwargs: encoded.extend(texts) or encode(texts, **kwargs)
+        known = np.ones(768, dtype=np.float32)
+        helper_chunk = make_chunk('a.py', HELPER, 'slugify')
+        helper_hash = embedding_input_hash(embedder_with_cleanup.create_embedding_content(helper_chunk))
+
+        results = embedder_with_cleanup.embed_chunks(
+            [helper_chunk, make_chunk('b.py', 'def other(): pass', 'other')],
+            reuse=lambda embedding_hash: known if embedding_hash == helper_hash else None
+        )
+
+        assert len(encoded) == 1
+        assert results[0].embedding is known
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestSharedVectors:
+    """Test that the index stores one vector per embedding input."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test fixtures."""
+        self.storage_dir = tmp_path / 'index'
+        self.index_manager = CodeIndexManager(str(self.storage_dir))
+        self.index_manager.add_embeddings([
+            make_result('a.py', 'slugify', random_vector(1), embedding_hash='helper'),
+            make_result('vendor/a.py', 'slugify', random_vector(1), embedding_hash='helper'),
+            make_result('b.py', 'other', random_vector(2), embedding_hash='other'),
+        ])
+        self.query = random_vector(1)
+
+    def test_copies_share_one_vector_and_expand_in_search(self):
+        """Test that a hit on a shared vector returns every location."""
+        self.index_manager.add_embeddings([
+            make_result('gen/a.py', 'slugify', random_vector(3), embedding_hash='helper')
+        ])
+
+        assert self.index_manager.index.ntotal == 2
+        results = self.index_manager.search(self.query, k=5)
+        assert [chunk_id for chunk_id, _, _ in results[:3]] == [
+            'a.py:1-2:function:slugify', 'vendor/a.py:1-2:function:slugify', 'gen/a.py:1-2:function:slugify'
+        ]
+        assert len({similarity for _, similarity, _ in results[:3]}) == 1
+
+    def test_collapsed_search_lists_duplicates(self):
+        """Test that collapsing returns one result per vector, honouring filters."""
+        results = self.index_manager.search(self.query, k=2, collapse_duplicates=True)
+
+        assert [chunk_id for chunk_id, _, _ in results] == ['a.py:1-2:function:slugify', 'b.py:1-2:function:other']
+        assert results[0][2]['duplicate_chunk_ids'] == ['vendor/a.py:1-2:function:slugify']
+
+        results = self.index_manager.search(
+            self.query, k=1, filters={'file_pattern': ['vendor/']}, collapse_duplicates=True
+        )
+        assert [chunk_id for chunk_id, _, _ in results] == ['vendor/a.py:1-2:function:slugify']
+        assert 'duplicate_chunk_ids' not in results[0][2]
+
+    def test_removal_and_reload_keep_remaining_locations(self):
+        """Test that removing one copy keeps the others, also after a reload."""
+        self.index_manager.remove_file_chunks('vendor/a.py')
+        self.index_manager.add_embeddings([
+            make_result('c.py', 'slugify', random_vector(4), embedding_hash='helper')
+        ])
+        self.index_manager.save_index()
+
+        reloaded = CodeIndexManager(str(self.storage_dir))
+        results = reloaded.search(self.query, k=5)
+
+        assert [chunk_id for chunk_id, _, _ in results] == [
+            'a.py:1-2:function:slugify', 'c.py:1-2:function:slugify', 'b.py:1-2:function:other'
+        ]
+        assert reloaded.index.ntotal == 2
+        assert reloaded.get_vector('helper') is not None
+        assert reloaded.get_vector('unknown') is None
+        assert reloaded.get_stats()['shared_vector_chunks'] == 1
+
+    def test_renames_follow_shared_vectors(self):
+        """Test that swapped ids keep their metadata, vectors and lexical entries."""
+        renamed = self.index_manager.rename_chunks({
+            'a.py:1-2:function:slugify': 'vendor/a.py:1-2:function:slugify',
+            'vendor/a.py:1-2:function:slugify': 'a.py:1-2:function:slugify',
+            'b.py:1-2:function:other': 'b.py:3-4:function:other',
+            'missing': 'elsewhere',
+        })
+        self.index_manager.save_index()
+        reloaded = CodeIndexManager(str(self.storage_dir))
+
+        assert renamed == 3
+        assert reloaded.get_chunk_by_id('vendor/a.py:1-2:function:slugify')['relative_path'] == 'a.py'
+        assert reloaded.get_chunk_by_id('b.py:1-2:function:other') is None
+        assert [chunk_id for chunk_id, _, _ in reloaded.search(self.query, k=5)] == [
+            'vendor/a.py:1-2:function:slugify', 'a.py:1-2:function:slugify', 'b.py:3-4:function:other'
+        ]
+        assert [chunk_id for chunk_id, _ in reloaded.bm25.search(['other'])] == ['b.py:3-4:function:other']
+
+    def test_memory_estimate_follows_updates(self):
+        """Test that the running chunk id estimate matches a full recount."""
+        def recount(manager):
+            chunk_ids = list(manager._chunk_ids) + [c for ids in manager._shared_chunk_ids.values() for c in ids]
+            return manager.index.ntotal * DIMENSION * 4 + sum(len(c) + 56 for c in chunk_ids)
+
+        self.index_manager.add_embeddings([
+            make_result('gen/a.py', 'slugify', random_vector(3), embedding_hash='helper')
+        ])
+        self.index_manager.rename_chunks({'b.py:1-2:function:other': 'b.py:10-20:function:other'})
+        assert self.index_manager.memory_usage() == recount(self.index_manager)
+
+        self.index_manager.remove_file_chunks('vendor/a.py')
+        self.index_manager.save_index()
+        assert self.index_manager.memory_usage() == recount(self.index_manager)
+        reloaded = CodeIndexManager(str(self.storage_dir))
+        assert reloaded.index is not None and reloaded.memory_usage() == recount(self.index_manager)
+
+        self.index_manager.clear_index()
+        assert self.index_manager.memory_usage() == 0
+
+    def test_hybrid_search_collapses_lexical_copies(self):
+        """Test that BM25 hits on copies fold into the semantic result."""
+        searcher = IntelligentSearcher(self.index_manager, embedder=None)
+
+        results = searcher.search('slugify', k=2, search_mode='hybrid', context_depth=0,
+                                  query_embedding=self.query, collapse_duplicates=True)
+
+        assert [r.chunk_id for r in results] == ['a.py:1-2:function:slugify', 'b.py:1-2:function:other']
+        assert results[0].duplicates == ['vendor/a.py:1-2:function:slugify']
+
+    def test_unreadable_vector_is_embedded_again(self, tmp_path):
+        """Test that IVF indexes without a direct map report no vector instead of raising."""
+        manager = CodeIndexManager(str(tmp_path / 'ivf'))
+        manager.create_index(DIMENSION, 'ivf')
+        manager.add_embeddings([
+            make_result(f'm{i}.py', f'f{i}', random_vector(i), embedding_hash=f'h{i}') for i in range(40)
+        ])
+        assert manager.get_vector('h3') is not None
+
+        faiss.extract_index_ivf(manager.index).set_direct_map_type(faiss.DirectMap.NoMap)
+
+        assert manager.get_vector('h3') is None
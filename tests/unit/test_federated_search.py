@@ -0,0 +1,77 @@
+"""Unit tests for federated search across project indexes."""
+
+import time
+
+import pytest
+
+from search.federated import FederatedSearcher
+from tests.fixtures.index_results import FakeEmbedder
+from tests.fixtures.search_results import make_search_result
+
+
+class FakeSearcher:
+    def __init__(self, scores, delay=0.0, error=None):
+        self.scores = scores
+        self.delay = delay
+        self.error = error
+        self.embeddings = []
+        self.with_context = []
+
+    def search_scored(self, query, k, filters, query_embedding):
+        self.embeddings.append(query_embedding)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [(score, make_search_result(f'{chunk}', score)) for chunk, score in self.scores]
+
+    def add_context(self, result, context_depth):
+        self.with_context.append(result.chunk_id)
+        return result
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestFederatedSearcher:
+    """Test fan-out, calibration and timeouts."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test fixtures."""
+        self.embedder = FakeEmbedder()
+        self.federated = FederatedSearcher(self.embedder, max_workers=4, timeout=1.0)
+        yield
+        self.federated.shutdown()
+
+    def test_one_embedding_and_calibrated_merge(self):
+        """Test that a project's standout result beats uniformly high scores elsewhere."""
+        # Every candidate of the boilerplate project scores high
+        boilerplate = FakeSearcher([(f'b{i}', 0.80 - i * 0.001) for i in range(20)])
+        # One clear match among weak candidates
+        service = FakeSearcher([('s0', 0.75)] + [(f's{i}', 0.30) for i in range(1, 20)])
+
+        response = self.federated.search(
+            'query', {'boilerplate': lambda: boilerplate, 'service': lambda: service}, k=3, context_depth=1
+        )
+
+        assert self.embedder.calls == 1
+        assert boilerplate.embeddings[0] is service.embeddings[0]
+        assert [r.result.chunk_id for r in response.results][0] == 's0'
+        assert len(response.results) == 3
+        assert response.projects_searched == ['boilerplate', 'service']
+        assert service.with_context == ['s0']
+
+    def test_timeouts_and_failures_are_reported(self):
+        """Test that slow and failing projects do not hold back the others."""
+        projects = {
+            'fast': lambda: FakeSearcher([('f0', 0.5), ('f1', 0.4)]),
+            'slow': lambda: FakeSearcher([('x0', 0.9)], delay=0.5),
+            'broken': lambda: FakeSearcher([], error=RuntimeError('index missing')),
+        }
+
+        start = time.monotonic()
+        response = self.federated.search('query', projects, k=5, timeout=0.1)
+
+        assert time.monotonic() - start < 0.4
+        assert [r.result.chunk_id for r in response.results] == ['f0', 'f1']
+        assert response.timed_out == ['slow']
+        assert response.failed == {'broken': 'index missing'}
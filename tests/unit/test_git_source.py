@@ -0,0 +1,134 @@
+"""Unit tests for the git-aware change source."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from merkle.change_detector import ChangeDetector
+from merkle.git_source import GitIndex, GitMerkleDAG, find_git_dir, git_blob_hash
+from merkle.snapshot_manager import SnapshotManager
+
+
+class TestGitSource(TestCase):
+    """Test GitIndex and GitMerkleDAG."""
+
+    def setUp(self):
+        """Set up a small git repository."""
+        if shutil.which('git') is None:
+            self.skipTest("git not installed")
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_path = Path(self.temp_dir) / 'repo'
+        self.test_path.mkdir()
+
+        (self.test_path / 'src').mkdir()
+        (self.test_path / 'main.py').write_text('def main(): pass\n')
+        (self.test_path / 'src' / 'utils.py').write_text('def helper(): pass\n')
+        (self.test_path / '.gitignore').write_text('*.log\ngenerated/\n')
+
+        self.git('init', '-q')
+        self.git('add', '.')
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def git(self, *args):
+        """Run a git command inside the test repository."""
+        subprocess.run(
+            ['git', *args],
+            cwd=self.test_path,
+            check=True,
+            capture_output=True,
+            env={**os.environ, 'GIT_CONFIG_GLOBAL': os.devnull, 'GIT_CONFIG_SYSTEM': os.devnull}
+        )
+
+    def ls_files(self):
+        """Get path -> blob sha from git itself."""
+        output = subprocess.run(
+            ['git', 'ls-files', '-s'],
+            cwd=self.test_path,
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        result = {}
+        for line in output.splitlines():
+            meta, path = line.split('\t', 1)
+            result[path] = meta.split()[1]
+        return result
+
+    def test_index_reader_matches_git(self):
+        """Test parsing .git/index for every supported version."""
+        for version in ('2', '3', '4'):
+            self.git('update-index', '--index-version', version)
+            index = GitIndex(find_git_dir(str(self.test_path)))
+            assert index.load()
+            shas = {path: entry.sha for path, entry in index.entries.items()}
+            assert shas == self.ls_files(), f"Mismatch for index version {version}"
+
+    def test_blob_hash_matches_git(self):
+        """Test computing git blob hashes from the working tree."""
+        expected = self.ls_files()['main.py']
+        sha, size = git_blob_hash(self.test_path / 'main.py')
+        assert sha == expected
+        assert size == len('def main(): pass\n')
+
+    def test_tracked_files_keyed_by_blob_sha(self):
+        """Test that clean tracked files reuse index hashes."""
+        dag = GitMerkleDAG(str(self.test_path))
+        dag.build()
+
+        file_hashes = dag.get_file_hashes()
+        assert file_hashes['main.py'] == self.ls_files()['main.py']
+        assert file_hashes['src/utils.py'] == self.ls_files()['src/utils.py']
+        assert dag.reused_hashes >= 2
+
+    def test_modified_and_untracked_files(self):
+        """Test modified tracked files and untracked fallback hashing."""
+        (self.test_path / 'main.py').write_text('def main(): return 1\n')
+        (self.test_path / 'new.py').write_text('x = 1\n')
+
+        dag = GitMerkleDAG(str(self.test_path))
+        dag.build()
+
+        file_hashes = dag.get_file_hashes()
+        assert file_hashes['main.py'] == git_blob_hash(self.test_path / 'main.py')[0]
+        assert file_hashes['main.py'] != self.ls_files()['main.py']
+        # Untracked files use the regular SHA-256 filesystem hash
+        assert len(file_hashes['new.py']) == 64
+
+    def test_gitignore_respected(self):
+        """Test that ignored untracked paths are skipped."""
+        (self.test_path / 'debug.log').write_text('log')
+        (self.test_path / 'generated').mkdir()
+        (self.test_path / 'generated' / 'client.py').write_text('x = 1')
+
+        dag = GitMerkleDAG(str(self.test_path))
+        dag.build()
+
+        all_files = dag.get_all_files()
+        assert 'debug.log' not in all_files
+        assert 'generated/client.py' not in all_files
+        assert 'main.py' in all_files
+
+    def test_change_detector_uses_git_source(self):
+        """Test ChangeDetector picks the git source for git work trees."""
+        snapshot_manager = SnapshotManager(Path(self.temp_dir) / 'snapshots')
+        detector = ChangeDetector(snapshot_manager)
+
+        dag = detector.build_dag(str(self.test_path))
+        assert isinstance(dag, GitMerkleDAG)
+        snapshot_manager.save_snapshot(dag)
+
+        (self.test_path / 'src' / 'utils.py').write_text('def helper(): return 2\n')
+        changes, _ = detector.detect_changes_from_snapshot(str(self.test_path))
+
+        assert changes.modified == ['src/utils.py']
+        assert 'main.py' in changes.unchanged
+
+        plain = ChangeDetector(snapshot_manager, use_git=False).build_dag(str(self.test_path))
+        assert not isinstance(plain, GitMerkleDAG)
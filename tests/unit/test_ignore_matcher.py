@@ -0,0 +1,133 @@
+"""Unit tests for the gitignore-aware matcher and walker."""
+
+import tempfile
+import shutil
+from pathlib import Path
+from unittest import TestCase
+
+from merkle.ignore_matcher import IgnoreMatcher, IgnoreRules, walk_files
+from merkle.merkle_dag import MerkleDAG
+from chunking.multi_language_chunker import MultiLanguageChunker
+
+
+class TestIgnoreRules(TestCase):
+    """Test gitignore pattern semantics."""
+
+    def test_unanchored_and_anchored_patterns(self):
+        """Test basename patterns match at any depth, slashed ones only at the root."""
+        rules = IgnoreRules(['*.log', '/only_root.txt', 'docs/build'])
+
+        assert rules.match('debug.log', False)
+        assert rules.match('a/b/debug.log', False)
+        assert rules.match('only_root.txt', False)
+        assert rules.match('sub/only_root.txt', False) is None
+        assert rules.match('docs/build', True)
+        assert rules.match('src/docs/build', True) is None
+
+    def test_directory_only_patterns(self):
+        """Test trailing slash restricts a pattern to directories."""
+        rules = IgnoreRules(['cache/'])
+
+        assert rules.match('cache', True)
+        assert rules.match('cache', False) is None
+
+    def test_double_star(self):
+        """Test leading, middle and trailing '**'."""
+        rules = IgnoreRules(['**/fixtures', 'a/**/z.py', 'vendor/**'])
+
+        assert rules.match('fixtures', True)
+        assert rules.match('x/y/fixtures', True)
+        assert rules.match('a/z.py', False)
+        assert rules.match('a/b/c/z.py', False)
+        assert rules.match('vendor/lib/x.js', False)
+        assert rules.match('vendor', True) is None
+
+    def test_negation_last_rule_wins(self):
+        """Test negations re-include and later rules override earlier ones."""
+        rules = IgnoreRules(['*.py', '!keep.py', 'keep.py'])
+        assert rules.match('keep.py', False) is True
+
+        rules = IgnoreRules(['*.py', '!keep.py'])
+        assert rules.match('keep.py', False) is False
+        assert rules.match('drop.py', False) is True
+
+    def test_comments_escapes_and_classes(self):
+        """Test comments, escaped characters and character classes."""
+        rules = IgnoreRules(['# comment', r'\#literal', 'file[0-9].txt', 'x[!a].md'])
+
+        assert rules.match('# comment', False) is None
+        assert rules.match('#literal', False)
+        assert rules.match('file7.txt', False)
+        assert rules.match('filex.txt', False) is None
+        assert rules.match('xb.md', False)
+        assert rules.match('xa.md', False) is None
+
+
+class TestIgnoreMatcher(TestCase):
+    """Test nested .gitignore handling and traversal."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_path = Path(self.temp_dir)
+
+        (self.test_path / 'src' / 'gen').mkdir(parents=True)
+        (self.test_path / 'data').mkdir()
+        (self.test_path / 'node_modules' / 'pkg').mkdir(parents=True)
+
+        (self.test_path / '.gitignore').write_text('data/\n*.tmp\n')
+        (self.test_path / 'src' / '.gitignore').write_text('gen/\n!keep.tmp\n')
+
+        (self.test_path / 'main.py').write_text('x = 1')
+        (self.test_path / 'scratch.tmp').write_text('tmp')
+        (self.test_path / 'src' / 'app.py').write_text('x = 2')
+        (self.test_path / 'src' / 'keep.tmp').write_text('keep')
+        (self.test_path / 'src' / 'gen' / 'client.py').write_text('x = 3')
+        (self.test_path / 'data' / 'big.py').write_text('x = 4')
+        (self.test_path / 'node_modules' / 'pkg' / 'index.js').write_text('x = 5')
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_nested_gitignore_precedence(self):
+        """Test deeper .gitignore files override shallower ones."""
+        matcher = IgnoreMatcher(self.temp_dir)
+
+        assert matcher.is_ignored('scratch.tmp', False)
+        assert not matcher.is_ignored('src/keep.tmp', False)
+        assert matcher.is_ignored('src/gen', True)
+        assert matcher.is_ignored('data', True)
+        assert matcher.is_ignored('node_modules', True)
+        assert not matcher.is_ignored('src/app.py', False)
+
+    def test_walk_files_single_pass(self):
+        """Test the walker prunes ignored directories."""
+        matcher = IgnoreMatcher(self.temp_dir)
+        files = sorted(path for path, _ in walk_files(self.temp_dir, matcher))
+
+        assert files == ['.gitignore', 'main.py', 'src/.gitignore', 'src/app.py', 'src/keep.tmp']
+
+    def test_merkle_dag_uses_gitignore(self):
+        """Test MerkleDAG honours .gitignore files."""
+        dag = MerkleDAG(self.temp_dir)
+        dag.build()
+        all_files = dag.get_all_files()
+
+        assert 'main.py' in all_files
+        assert 'src/keep.tmp' in all_files
+        assert 'scratch.tmp' not in all_files
+        assert 'data/big.py' not in all_files
+        assert 'src/gen/client.py' not in all_files
+
+        dag.use_gitignore = False
+        dag.build()
+        assert 'data/big.py' in dag.get_all_files()
+
+    def test_chunk_directory_uses_gitignore(self):
+        """Test MultiLanguageChunker skips ignored files."""
+        chunker = MultiLanguageChunker(self.temp_dir)
+        chunks = chunker.chunk_directory(self.temp_dir)
+        paths = {chunk.relative_path for chunk in chunks}
+
+        assert paths == {'main.py', 'src/app.py'}
@@ -0,0 +1,101 @@
+"""Unit tests for the per-project index pool."""
+
+import time
+
+import pytest
+
+from search.index_pool import IndexPool
+
+
+class FakeIndexManager:
+    """Index manager stand-in with a fixed memory footprint."""
+
+    def __init__(self, project_path, size=0):
+        self.project_path = project_path
+        self.size = size
+
+    def memory_usage(self):
+        return self.size
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestIndexPool:
+    """Test LRU, memory budget and idle eviction."""
+
+    def make_pool(self, sizes=None, **kwargs):
+        sizes = sizes or {}
+        return IndexPool(lambda path: FakeIndexManager(path, sizes.get(path.rsplit('/', 1)[-1], 0)), **kwargs)
+
+    def test_reuses_loaded_projects(self, tmp_path):
+        """Test that alternating projects does not reload their indexes."""
+        pool = self.make_pool()
+        a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+
+        first = pool.get(a).index_manager
+        for _ in range(3):
+            pool.get(b)
+            assert pool.get(a).index_manager is first
+
+        assert pool.loads == 2
+        assert pool.projects() == [str(tmp_path / 'b'), str(tmp_path / 'a')]
+
+    def test_project_limit_evicts_least_recently_used(self, tmp_path):
+        """Test LRU eviction once max_projects is exceeded."""
+        pool = self.make_pool(max_projects=2)
+        a, b, c = (str(tmp_path / name) for name in 'abc')
+
+        pool.get(a)
+        pool.get(b)
+        pool.get(a)
+        pool.get(c)
+
+        assert b not in pool
+        assert a in pool and c in pool
+        assert pool.evictions == 1
+
+    def test_memory_budget(self, tmp_path):
+        """Test that large indexes are evicted to stay within the budget."""
+        pool = self.make_pool({'a': 60, 'b': 30, 'c': 50}, memory_budget=100)
+        a, b, c = (str(tmp_path / name) for name in 'abc')
+
+        pool.get(a)
+        pool.get(b)
+        assert pool.memory_usage() == 90
+
+        pool.get(c)
+        assert pool.projects() == [str(tmp_path / 'b'), str(tmp_path / 'c')]
+
+        # The requested project is kept even when it alone exceeds the budget
+        pool = self.make_pool({'a': 500}, memory_budget=100)
+        pool.get(a)
+        assert a in pool
+
+    def test_only_requested_project_is_measured(self, tmp_path):
+        """Test that fetching a project does not wait on the other managers."""
+        pool = self.make_pool({'a': 60, 'b': 30}, memory_budget=100)
+        a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+        busy = pool.get(a).index_manager
+
+        def blocked():
+            raise AssertionError("measured a project that was not requested")
+
+        busy.memory_usage = blocked
+        pool.get(b)
+
+        assert pool.get_stats()['memory_usage'] == 90
+
+    def test_idle_eviction(self, tmp_path):
+        """Test that projects unused for idle_timeout are dropped."""
+        pool = self.make_pool(idle_timeout=0.05)
+        a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+
+        pool.get(a)
+        time.sleep(0.1)
+        pool.get(b)
+
+        assert a not in pool
+        assert pool.evict_idle() == []
+        time.sleep(0.1)
+        assert pool.evict_idle() == [str(tmp_path / 'b')]
+        assert len(pool) == 0
@@ -70,3 +70,13 @@ const blockArrow = (x) => {
         for chunk in chunks:
             assert isinstance(chunk.content, str), "Content should be string"
             assert len(chunk.content) > 0, "Content should not be empty"
+
+    def test_deeply_nested_code(self):
+        """Test that deeply nested (e.g. minified) code does not recurse."""
+        depth = 3000
+        code = 'const data = ' + '[' * depth + ']' * depth + ';\nfunction after() { return 1; }\n'
+
+        chunks = self.chunker.chunk_code(code)
+
+        names = [c.metadata.get('name') for c in chunks]
+        assert 'after' in names
@@ -0,0 +1,155 @@
+"""Unit tests for the precomputed nearest-neighbour graph."""
+
+import threading
+
+import faiss
+import numpy as np
+import pytest
+
+from search.indexer import CodeIndexManager
+from search.knn_graph import KnnGraph
+from tests.fixtures.index_results import DIMENSION, make_result, make_results
+
+
+def normalized(vectors):
+    vectors = np.array(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestKnnGraph:
+    """Test building, storing and clustering the graph."""
+
+    def test_build_matches_exhaustive_search(self, tmp_path):
+        """Test that every row holds the exact neighbours of a flat index, across batches."""
+        vectors = normalized(np.random.RandomState(0).randn(50, DIMENSION))
+        index = faiss.IndexFlatIP(DIMENSION)
+        index.add(vectors)
+
+        graph = KnnGraph.build(index, k=4, batch_size=16)
+
+        expected = np.argsort(-(vectors @ vectors.T), axis=1)[:, :5]
+        assert graph.width == 5 and len(graph) == 50
+        assert np.array_equal(graph.neighbors, expected)
+        assert np.array_equal(graph.neighbors[:, 0], np.arange(50))
+
+        graph.save(tmp_path / 'graph.npz')
+        loaded = KnnGraph.load(tmp_path / 'graph.npz')
+        assert np.array_equal(loaded.neighbors, graph.neighbors)
+        assert np.array_equal(loaded.similarities, graph.similarities)
+
+    def test_clusters_follow_edges_above_threshold(self):
+        """Test that chains join one cluster reporting their weakest link."""
+        neighbors = np.array([[0, 1, 3], [1, 0, 2], [2, 1, 3], [3, 2, 0], [4, 3, 0]], dtype=np.int32)
+        similarities = np.array([
+            [1.0, 0.99, 0.5], [1.0, 0.99, 0.96], [1.0, 0.96, 0.3], [1.0, 0.3, 0.5], [1.0, 0.2, 0.1]
+        ], dtype=np.float32)
+        graph = KnnGraph(neighbors, similarities)
+
+        clusters = graph.clusters(0.95)
+        assert [positions for positions, _ in clusters] == [[0, 1, 2]]
+        assert clusters[0][1] == pytest.approx(0.96)
+
+        assert [positions for positions, _ in graph.clusters(0.95, live={0, 1, 3, 4})] == [[0, 1]]
+        assert graph.clusters(0.999) == []
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestIndexGraph:
+    """Test similar-chunk lookups and duplicate clusters of the index."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test fixtures."""
+        rng = np.random.RandomState(1)
+        base = rng.randn(DIMENSION).astype(np.float32)
+        results = make_results(30, rng)
+        # A near-duplicate pair and two identical copies sharing one vector
+        results.append(make_result('module30.py', 'f30', base))
+        results.append(make_result('module31.py', 'f31', base + 0.01))
+        results.append(make_result('module32.py', 'f32', -base, embedding_hash='copy'))
+        results.append(make_result('module33.py', 'f33', -base, embedding_hash='copy'))
+        self.index_manager = CodeIndexManager(str(tmp_path / 'index'))
+        self.index_manager.add_embeddings(results)
+
+    def test_similar_chunks_come_from_the_graph(self, monkeypatch):
+        """Test that a current graph answers without searching, with the same results."""
+        expected = self.index_manager.get_similar_chunks('module5.py:1-2:function:f5', k=3)
+        self.index_manager.build_knn_graph(k=5)
+
+        def no_search(*args, **kwargs):
+            raise AssertionError("searched despite a current graph")
+
+        monkeypatch.setattr(self.index_manager, 'search', no_search)
+        results = self.index_manager.get_similar_chunks('module5.py:1-2:function:f5', k=3)
+
+        assert [chunk_id for chunk_id, _, _ in results] == [chunk_id for chunk_id, _, _ in expected]
+        assert [sim for _, sim, _ in results] == pytest.approx([sim for _, sim, _ in expected], abs=1e-5)
+        assert [c for c, _, _ in self.index_manager.get_similar_chunks('module32.py:1-2:function:f32', k=1)] == [
+            'module33.py:1-2:function:f33'
+        ]
+
+    def test_outdated_graph_falls_back_to_search(self):
+        """Test that vectors added after the graph was built are still found."""
+        self.index_manager.build_knn_graph(k=5)
+        embedding = self.index_manager.index.reconstruct(5) + 0.001
+        self.index_manager.add_embeddings([make_result('module40.py', 'f40', embedding)])
+
+        results = self.index_manager.get_similar_chunks('module5.py:1-2:function:f5', k=1)
+
+        assert [chunk_id for chunk_id, _, _ in results] == ['module40.py:1-2:function:f40']
+
+    def test_duplicate_clusters(self):
+        """Test that near-duplicates and shared copies form clusters once a graph is built."""
+        assert self.index_manager.find_duplicate_clusters(threshold=0.99) is None
+
+        self.index_manager.build_knn_graph()
+        clusters = self.index_manager.find_duplicate_clusters(threshold=0.99)
+
+        assert self.index_manager.knn_graph_path.exists()
+        assert sorted(sorted(chunk_id for chunk_id, _ in cluster['chunks']) for cluster in clusters) == [
+            ['module30.py:1-2:function:f30', 'module31.py:1-2:function:f31'],
+            ['module32.py:1-2:function:f32', 'module33.py:1-2:function:f33'],
+        ]
+
+        self.index_manager.remove_chunks(['module31.py:1-2:function:f31'])
+        clusters = self.index_manager.find_duplicate_clusters(threshold=0.99)
+        assert [[chunk_id for chunk_id, _ in cluster['chunks']] for cluster in clusters] == [
+            ['module32.py:1-2:function:f32', 'module33.py:1-2:function:f33']
+        ]
+        assert clusters[0]['similarity'] == 1.0
+
+    def test_graph_is_built_outside_the_lock(self, monkeypatch):
+        """Test that other threads can use the index while the graph is computed."""
+        build = KnnGraph.build
+        acquired = []
+
+        def search_concurrently():
+            acquired.append(self.index_manager._lock.acquire(timeout=5))
+            self.index_manager._lock.release()
+
+        def build_while_searching(index, k, batch_size):
+            thread = threading.Thread(target=search_concurrently)
+            thread.start()
+            thread.join()
+            return build(index, k, batch_size)
+
+        monkeypatch.setattr(KnnGraph, 'build', build_while_searching)
+        graph = self.index_manager.build_knn_graph(k=3)
+
+        assert acquired == [True]
+        assert self.index_manager.knn_graph is graph and graph.width == 4
+
+    def test_refresh_rebuilds_only_stale_graphs(self):
+        """Test that refreshing keeps a current graph and extends an outdated one."""
+        assert self.index_manager.refresh_knn_graph() is None
+
+        graph = self.index_manager.build_knn_graph(k=12)
+        assert self.index_manager.refresh_knn_graph() is graph
+
+        self.index_manager.add_embeddings([make_result('module40.py', 'f40', np.ones(DIMENSION, dtype=np.float32))])
+        refreshed = self.index_manager.refresh_knn_graph()
+        assert refreshed is not graph and len(refreshed) == 34 and refreshed.width == 13
@@ -1,6 +1,11 @@
 """Unit tests for MCP server functionality."""
 
+import json
+import threading
+
 import pytest
+
+
 class TestMCPServerImport:
     """Test that MCP server can be imported."""
 
@@ -16,4 +21,74 @@ class TestMCPServerImport:
 
 # Note: Most MCP server functionality is tested in integration tests
 # where the actual decorators and FastMCP framework are working properly.
-# Unit tests here would just be testing mocks, not real functionality.
\ No newline at end of file
+# Unit tests here would just be testing mocks, not real functionality.
+
+class _SlowModelEmbedder:
+    """Embedder stand-in whose model load blocks until released."""
+
+    def __init__(self, error=None):
+        self.release = threading.Event()
+        self.error = error
+
+    @property
+    def model(self):
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return object()
+
+
+@pytest.mark.unit
+class TestModelPreload:
+    """Test background model loading in CodeSearchServer."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        """Setup test fixtures."""
+        from common_utils import get_storage_dir
+        from mcp_server.code_search_server import CodeSearchServer
+
+        monkeypatch.setenv('CODE_SEARCH_STORAGE', str(tmp_path))
+        get_storage_dir.cache_clear()
+        self.server = CodeSearchServer()
+        yield
+        get_storage_dir.cache_clear()
+
+    def test_preload_runs_in_background(self):
+        """Test that tools not needing the model answer while it loads."""
+        embedder = self.server._embedder = _SlowModelEmbedder()
+
+        future = self.server.start_model_preload()
+        assert self.server.start_model_preload() is future
+        assert self.server.get_model_status() == 'loading'
+        assert json.loads(self.server.list_projects())['count'] == 0
+
+        embedder.release.set()
+        assert self.server.wait_for_model(timeout=5) is embedder
+        assert self.server.get_model_status() == 'ready'
+
+    def test_failed_preload_is_retried(self):
+        """Test that a failed load is reported and restarted on the next call."""
+        embedder = self.server._embedder = _SlowModelEmbedder(error=RuntimeError('no model'))
+        embedder.release.set()
+
+        with pytest.raises(RuntimeError, match='failed to load: no model'):
+            self.server.wait_for_model(timeout=5)
+        assert self.server.get_model_status() == 'failed'
+
+        embedder.error = None
+        assert self.server.wait_for_model(timeout=5) is embedder
+
+    def test_slow_load_becomes_error_response(self, tmp_path):
+        """Test that tools return an error when the model does not load in time."""
+        embedder = self.server._embedder = _SlowModelEmbedder()
+        self.server.model_load_timeout = 0.05
+
+        response = json.loads(self.server.search_code('query', project=str(tmp_path)))
+        assert 'still loading' in response['error']
+        response = json.loads(self.server.index_directory(str(tmp_path)))
+        assert 'still loading' in response['error']
+
+        # The load goes on in the background and later calls get the model
+        embedder.release.set()
+        assert self.server.wait_for_model(timeout=5) is embedder
@@ -24,6 +24,10 @@ class TestMCPToolDescriptions:
         """Test search_code tool has description."""
         self._assert_description_length('search_code')
        
+    def test_search_code_batch_description(self):
+        """Test search_code_batch tool has description."""
+        self._assert_description_length('search_code_batch')
+
     def test_index_directory_description(self):
         """Test index_directory tool has description."""
         self._assert_description_length('index_directory')
@@ -32,6 +36,10 @@ class TestMCPToolDescriptions:
         """Test find_similar_code tool has description."""
         self._assert_description_length('find_similar_code')
        
+    def test_find_duplicate_code_description(self):
+        """Test find_duplicate_code tool has description."""
+        self._assert_description_length('find_duplicate_code')
+       
     def test_get_index_status_description(self):
         """Test get_index_status tool has description."""
         self._assert_description_length('get_index_status')
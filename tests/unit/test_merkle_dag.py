@@ -147,3 +147,31 @@ class TestMerkleDAG(TestCase):
         assert dag2.root_path == dag1.root_path
         assert dag2.get_root_hash() == dag1.get_root_hash()
         assert dag2.get_all_files() == dag1.get_all_files()
+
+    def test_content_filter_records_stat_only(self):
+        """Test files rejected by the content filter are not read."""
+        self.create_test_files()
+        (self.test_path / 'logo.png').write_bytes(b'\x89PNG' + b'\0' * 100)
+
+        seen = []
+
+        def content_filter(relative_path, size):
+            seen.append((relative_path, size))
+            return relative_path.endswith('.py')
+
+        dag = MerkleDAG(self.temp_dir, content_filter=content_filter)
+        hashed = []
+        original_hash_file = dag.hash_file
+        dag.hash_file = lambda path: hashed.append(path.name) or original_hash_file(path)
+        dag.build()
+
+        # Only Python files are read; others are tracked by size and mtime
+        assert sorted(hashed) == ['main.py', 'test_main.py', 'utils.py']
+        assert ('logo.png', 104) in seen
+        assert dag.find_node('logo.png').size == 104
+
+        # Stat-only hashes still change when the file changes
+        logo_hash = dag.find_node('logo.png').hash
+        (self.test_path / 'logo.png').write_bytes(b'\x89PNG' + b'\1' * 200)
+        dag.build()
+        assert dag.find_node('logo.png').hash != logo_hash
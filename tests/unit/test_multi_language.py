@@ -37,6 +37,17 @@ class TestMultiLanguageChunker:
         assert chunker.is_supported("test.rs")
         assert not chunker.is_supported("test.txt")
     
+    def test_is_indexable(self, tmp_path):
+        """Test the size-aware predicate used by the Merkle DAG builder."""
+        chunker = MultiLanguageChunker(max_file_size=100)
+        assert chunker.is_indexable("src/test.py", 100)
+        assert not chunker.is_indexable("src/test.py", 101)
+        assert not chunker.is_indexable("assets/logo.png", 10)
+        
+        big_file = tmp_path / "bundle.js"
+        big_file.write_text("function f() {}\n" * 20)
+        assert chunker.chunk_file(str(big_file)) == []
+    
     def test_chunk_python_file(self, chunker, test_data_dir):
         """Test chunking Python file."""
         file_path = test_data_dir / "example.py"
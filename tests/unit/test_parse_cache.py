@@ -0,0 +1,121 @@
+"""Unit tests for incremental reparsing with the parse-tree cache."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from chunking.parse_cache import TREE_NODE_BYTES, ParseTreeCache, compute_edit
+from chunking.tree_sitter import TreeSitterChunker
+
+
+@pytest.mark.unit
+class TestComputeEdit:
+    """Test byte diff based edit computation."""
+
+    def test_identical_sources(self):
+        """Test that identical sources need no edit."""
+        assert compute_edit(b'x = 1\n', b'x = 1\n') is None
+
+    def test_insertion(self):
+        """Test an insertion on a later line."""
+        old = b'a = 1\nb = 2\n'
+        new = b'a = 1\nb = 22\n'
+        edit = compute_edit(old, new)
+
+        assert edit.start_byte == 11
+        assert edit.old_end_byte == 11
+        assert edit.new_end_byte == 12
+        assert edit.start_point == (1, 5)
+        assert edit.old_end_point == (1, 5)
+        assert edit.new_end_point == (1, 6)
+
+    def test_replacement_with_multibyte_text(self):
+        """Test that points use byte columns."""
+        old = 's = "é"\nt = 1\n'.encode('utf-8')
+        new = 's = "é"\nt = 10\nu = 2\n'.encode('utf-8')
+        edit = compute_edit(old, new)
+
+        assert new[:edit.start_byte] == old[:edit.start_byte]
+        assert old[edit.old_end_byte:] == new[edit.new_end_byte:]
+        assert edit.start_point == (1, 5)
+        assert edit.new_end_point == (2, 5)
+
+
+@pytest.mark.unit
+class TestParseTreeCache:
+    """Test the bounded cache and incremental chunking."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        yield
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_eviction_bounds(self):
+        """Test eviction by entry count and total source size."""
+        cache = ParseTreeCache(max_entries=2, max_bytes=10)
+        cache.put('a', b'1234', 'tree-a')
+        cache.put('b', b'1234', 'tree-b')
+        cache.put('c', b'1234', 'tree-c')
+        assert len(cache) == 2
+        assert cache.take('a') is None
+
+        cache.put('d', b'12345678', 'tree-d')
+        assert len(cache) == 1
+        assert cache.take('d') == (b'12345678', 'tree-d')
+        # Taken entries are checked out of the cache
+        assert cache.take('d') is None
+
+    def test_trees_count_against_the_memory_bound(self):
+        """Test that a tree is charged by its node count, not just its source."""
+        import chunking.tree_sitter as tsf
+
+        if 'python' not in tsf.AVAILABLE_LANGUAGES:
+            pytest.skip("tree-sitter-python not installed")
+
+        source = b'def first():\n    return 1\n'
+        chunker = TreeSitterChunker().get_chunker('module.py')
+        tree = chunker.parse(source)
+        size = len(source) + tree.root_node.descendant_count * TREE_NODE_BYTES
+
+        cache = ParseTreeCache(max_bytes=size * 2)
+        cache.put('a', source, tree)
+        cache.put('b', source, chunker.parse(source))
+        assert cache._size == size * 2
+
+        cache.put('c', source, chunker.parse(source))
+        assert len(cache) == 2 and cache.take('a') is None
+
+        small = ParseTreeCache(max_bytes=size - 1)
+        small.put('a', source, tree)
+        assert len(small) == 0
+
+    def test_incremental_reparse_matches_full_parse(self):
+        """Test that edited files chunk the same as with a fresh parse."""
+        import chunking.tree_sitter as tsf
+
+        if 'python' not in tsf.AVAILABLE_LANGUAGES:
+            pytest.skip("tree-sitter-python not installed")
+
+        cache = ParseTreeCache()
+        cached_chunker = TreeSitterChunker(tree_cache=cache)
+        plain_chunker = TreeSitterChunker()
+
+        file_path = Path(self.temp_dir) / 'module.py'
+        versions = [
+            'def first():\n    return 1\n\nclass Service:\n    def run(self):\n        pass\n',
+            'def first():\n    return 1\n\ndef second():\n    return 2\n\nclass Service:\n    def run(self):\n        pass\n',
+            'def first():\n    return "ü"\n\nclass Service:\n    def stop(self):\n        pass\n',
+            'def first():\n    return "ü"\n\nclass Service:\n    def stop(self):\n        pass\n',
+        ]
+        for source in versions:
+            file_path.write_text(source, encoding='utf-8')
+            cached = cached_chunker.chunk_file(str(file_path))
+            fresh = plain_chunker.chunk_file(str(file_path))
+            assert [c.to_dict() for c in cached] == [c.to_dict() for c in fresh]
+
+        assert cache.hits == len(versions) - 1
+        assert len(cache) == 1
@@ -0,0 +1,76 @@
+"""Unit tests for lazy grammar loading and the shared parser pool."""
+
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from chunking.available_languages import get_language
+from chunking.languages import PythonChunker
+from chunking.parser_pool import ParserPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.mark.unit
+class TestParserPool:
+    """Test the parser pool and language singletons."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test fixtures."""
+        if get_language('python') is None:
+            pytest.skip("tree-sitter-python not installed")
+
+    def test_grammars_load_on_demand(self):
+        """Test that importing chunking loads no grammar until a language is used."""
+        script = (
+            "import sys\n"
+            "from chunking.multi_language_chunker import MultiLanguageChunker\n"
+            "loaded = lambda: sorted(m for m in sys.modules if m.startswith('tree_sitter_') and '.' not in m)\n"
+            "print(loaded())\n"
+            "MultiLanguageChunker('.').tree_sitter_chunker.get_chunker('a.py')\n"
+            "print(loaded())\n"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+        ).stdout.splitlines()
+
+        assert output == ['[]', "['tree_sitter_python']"]
+
+    def test_languages_are_singletons(self):
+        """Test that chunkers share one Language per grammar."""
+        assert PythonChunker().language is PythonChunker().language
+        assert get_language('no_such_language') is None
+
+    def test_parsers_are_reused(self):
+        """Test that released parsers are handed out again."""
+        pool = ParserPool(max_idle_per_language=1)
+
+        with pool.parser('python') as first:
+            with pool.parser('python') as second:
+                assert first is not second
+        assert pool.created == 2
+        assert pool.idle_count('python') == 1
+
+        with pool.parser('python'):
+            pass
+        assert pool.created == 2
+
+        with pytest.raises(ValueError):
+            pool.acquire('no_such_language')
+
+    def test_concurrent_chunking(self):
+        """Test that one chunker can be used from many threads at once."""
+        chunker = PythonChunker()
+        sources = [f'def f{i}(a):\n    return a + {i}\n\nclass C{i}:\n    pass\n' for i in range(64)]
+
+        def chunk(source):
+            return [c.metadata['name'] for c in chunker.chunk_code(source)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(chunk, sources))
+
+        assert results == [[f'f{i}', f'C{i}'] for i in range(64)]
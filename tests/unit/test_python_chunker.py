@@ -17,6 +17,26 @@ class TestPythonChunker:
         except ValueError:
             pytest.skip("tree-sitter-python not installed")
 
+    def test_decorator_docstring_and_parameter_metadata(self):
+        """Test decorators, docstrings and parameter counts."""
+        code = '''
+@app.route("/")
+@cached
+def index(request, page: int, size=10, *args):
+    """Render the index."""
+    return page
+'''
+        chunks = self.chunker.chunk_code(code)
+
+        metadata = chunks[0].metadata
+        assert metadata['name'] == 'index'
+        assert metadata['decorators'] == ['@app.route("/")', '@cached']
+        assert metadata['docstring'] == 'Render the index.'
+        assert 'param_count' not in metadata
+
+        function_chunk = self.chunker.chunk_code(code.replace('@app.route("/")\n@cached\n', ''))[0]
+        assert function_chunk.metadata['param_count'] == 3
+
     def test_function_chunking(self):
         """Test chunking of Python functions."""
         code = '''
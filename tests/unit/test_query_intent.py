@@ -0,0 +1,37 @@
+"""Unit tests for query intent detection."""
+
+import pytest
+
+from search.searcher import DEFAULT_QUERY_PATTERNS, IntelligentSearcher
+from tests.fixtures.intent_queries import QUERIES, detect_separately
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestQueryIntent:
+    """Test the compiled intent vocabulary."""
+
+    def test_matches_separate_searches(self):
+        """Test that the compiled pattern finds the same intents, overlaps included."""
+        searcher = IntelligentSearcher(index_manager=None, embedder=None)
+
+        for query in QUERIES:
+            assert searcher._detect_query_intent(query) == detect_separately(DEFAULT_QUERY_PATTERNS, query), query
+
+        # "how.*work" spans the whole query, yet "error" is still found
+        assert searcher._detect_query_intent('how does error handling work') == ['function_search', 'error_handling']
+
+    def test_extra_intents(self):
+        """Test that domain intents extend the default vocabulary."""
+        searcher = IntelligentSearcher(
+            index_manager=None, embedder=None,
+            extra_intents={'payments': [r'\binvoice\b', r'charg(e|ing)'], 'testing': [r'\bspec\b']}
+        )
+
+        assert searcher._detect_query_intent('charge the invoice') == ['payments']
+        assert searcher._detect_query_intent('login spec') == ['authentication', 'testing']
+        assert searcher.query_patterns['testing'][-1] == r'\bspec\b'
+        assert r'\bspec\b' not in DEFAULT_QUERY_PATTERNS['testing']
+
+        searcher.add_intent('ci-cd', [r'\bpipeline\b'])
+        assert searcher._detect_query_intent('deploy pipeline') == ['ci-cd']
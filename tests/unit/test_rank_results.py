@@ -0,0 +1,79 @@
+"""Unit tests for the vectorized re-ranking of search candidates."""
+
+import random
+
+import pytest
+
+from search.bm25 import normalize_to_tokens, path_tokens
+from search.searcher import IntelligentSearcher
+from tests.fixtures.search_results import make_results
+
+QUERIES = ['UserAccount', 'user', 'class user account', 'how to handle database errors', 'parse config', '']
+
+
+def reference_score(searcher, result, query, intent_tags):
+    """Per-result scoring as implemented before vectorization."""
+    score = result.similarity_score
+    query_tokens = normalize_to_tokens(query.lower())
+    is_entity_query = searcher._is_entity_like_query(query, query_tokens)
+    if 'class' in query.lower():
+        type_boosts = {'class': 1.3, 'function': 1.05, 'method': 1.05, 'module': 0.9}
+    elif is_entity_query:
+        type_boosts = {'class': 1.15, 'function': 1.1, 'method': 1.1, 'module': 0.92}
+    else:
+        type_boosts = {'function': 1.1, 'method': 1.1, 'class': 1.05, 'module': 0.95}
+    score *= type_boosts.get(result.chunk_type, 1.0)
+
+    name_boost = 1.0
+    if result.name:
+        name_set = set(normalize_to_tokens(result.name))
+        query_set = set(query_tokens)
+        if query.lower() == result.name.lower():
+            name_boost = 1.4
+        elif query_set and name_set and query_set & name_set:
+            ratio = len(query_set & name_set) / len(query_set)
+            name_boost = 1.3 if ratio >= 0.8 else 1.2 if ratio >= 0.5 else 1.1 if ratio >= 0.3 else 1.05
+    score *= name_boost
+
+    if result.relative_path and query_tokens:
+        score *= 1.0 + len(set(query_tokens) & set(path_tokens(result.relative_path))) * 0.05
+
+    if intent_tags and result.tags:
+        score *= 1.0 + len(set(intent_tags) & set(result.tags)) * 0.1
+
+    if result.docstring:
+        score *= 1.02 if is_entity_query and result.chunk_type == 'module' else 1.05
+
+    if len(result.content_preview) > 1000:
+        score *= 0.98
+    return score
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestRankResults:
+    """Test that vectorized scoring matches per-result scoring."""
+
+    @pytest.mark.parametrize('stored_tokens', [True, False])
+    def test_matches_reference_scoring(self, stored_tokens):
+        """Test scores and order against the scalar implementation."""
+        searcher = IntelligentSearcher(index_manager=None, embedder=None)
+        rng = random.Random(7)
+
+        for query in QUERIES:
+            intent_tags = searcher._detect_query_intent(query)
+            results = make_results(200, rng, stored_tokens)
+
+            scored = searcher._score_results(results, query, intent_tags)
+
+            expected = sorted(
+                ((reference_score(searcher, r, query, intent_tags), r) for r in results),
+                key=lambda item: item[0], reverse=True
+            )
+            assert [r.chunk_id for _, r in scored] == [r.chunk_id for _, r in expected]
+            assert [s for s, _ in scored] == pytest.approx([s for s, _ in expected])
+
+    def test_empty_candidates(self):
+        """Test that no candidates give no results."""
+        searcher = IntelligentSearcher(index_manager=None, embedder=None)
+        assert searcher._score_results([], 'query', []) == []
@@ -0,0 +1,155 @@
+"""Unit tests for second-stage re-ranking under a latency budget."""
+
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from search.reranker import CrossEncoderScorer, Reranker
+from search.searcher import IntelligentSearcher, SearchResult
+
+
+def make_result(name, preview=''):
+    return SearchResult(
+        chunk_id=name, similarity_score=0.5, content_preview=preview, file_path=f'{name}.py',
+        relative_path=f'{name}.py', folder_structure=[], chunk_type='function', name=name,
+        parent_name=None, start_line=1, end_line=2, docstring=None, tags=[], context_info={}
+    )
+
+
+class KeywordScorer:
+    """Scores texts by whether they contain the query, optionally slowly."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+
+    def score(self, query, texts):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return np.array([float(query in text) for text in texts])
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestReranker:
+    """Test re-scoring, batching and fallbacks."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.scored = [(1.0 - i * 0.1, make_result(f'r{i}', 'needle' if i == 4 else '')) for i in range(8)]
+
+    def test_reranks_top_candidates_in_batches(self):
+        """Test that the scorer's best candidate moves up, keeping the score scale."""
+        scorer = KeywordScorer()
+        reranker = Reranker(scorer, top_n=6, budget_ms=1000, batch_size=4)
+
+        reranked = reranker.rerank('needle', self.scored)
+
+        assert [r.chunk_id for _, r in reranked] == ['r4', 'r0', 'r1', 'r2', 'r3', 'r5', 'r6', 'r7']
+        assert [s for s, _ in reranked] == [s for s, _ in self.scored]
+        assert scorer.batches == [4, 2]
+        assert reranker.reranked == 1
+
+    def test_over_budget_keeps_heuristic_ranking(self):
+        """Test that a slow scorer is abandoned before exceeding the budget by a batch."""
+        scorer = KeywordScorer(delay=0.03)
+        reranker = Reranker(scorer, top_n=8, budget_ms=50, batch_size=2)
+
+        assert reranker.rerank('needle', self.scored) == self.scored
+        assert len(scorer.batches) < 4
+        assert reranker.fallbacks == 1
+
+    def test_scoring_error_keeps_heuristic_ranking(self):
+        """Test that model errors do not fail the search."""
+        reranker = Reranker(KeywordScorer(error=RuntimeError('no model')), budget_ms=1000)
+        assert reranker.rerank('needle', self.scored) == self.scored
+        assert reranker.fallbacks == 1
+
+    def test_candidates_are_scored_on_their_source(self):
+        """Test that bodies are looked up for the top candidates only and cut to content_chars."""
+        bodies = {'r3': 'x' * 20 + 'needle', 'r6': 'needle'}
+        looked_up = []
+
+        def content(chunk_id):
+            looked_up.append(chunk_id)
+            return bodies.get(chunk_id)
+
+        reranker = Reranker(KeywordScorer(), top_n=5, budget_ms=1000, content_chars=30)
+        reranked = reranker.rerank('needle', self.scored, content)
+
+        assert [r.chunk_id for _, r in reranked][:2] == ['r3', 'r4']
+        assert looked_up == ['r0', 'r1', 'r2', 'r3', 'r4']
+        reranker.content_chars = 10
+        assert [r.chunk_id for _, r in reranker.rerank('needle', self.scored, content)][:2] == ['r4', 'r0']
+
+    def test_searcher_applies_reranker(self):
+        """Test that the searcher re-ranks candidates after the heuristics."""
+        searcher = IntelligentSearcher(index_manager=None, embedder=None, reranker=Reranker(KeywordScorer(), budget_ms=1000))
+        raw = [(f'r{i}', 0.9 - i * 0.1, {'relative_path': f'r{i}.py', 'name': f'r{i}', 'chunk_type': 'function',
+                                           'content_preview': 'needle' if i == 2 else ''}) for i in range(4)]
+
+        scored = searcher._score_raw_results(raw, 'needle', [])
+
+        assert scored[0][1].chunk_id == 'r2'
+
+    def test_counters_are_exact_under_concurrency(self):
+        """Test that re-ranks and fallbacks from many threads are all counted."""
+        reranker = Reranker(KeywordScorer(), budget_ms=1000)
+        failing = Reranker(KeywordScorer(error=RuntimeError('no model')), budget_ms=1000)
+
+        def run():
+            for _ in range(50):
+                reranker.rerank('needle', self.scored)
+                failing.rerank('needle', self.scored)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert reranker.get_stats() == {'reranked': 400, 'fallbacks': 0}
+        assert failing.get_stats() == {'reranked': 0, 'fallbacks': 400}
+
+
+class SlowCrossEncoder:
+    """sentence-transformers CrossEncoder stand-in that loads once released."""
+
+    release = threading.Event()
+
+    def __init__(self, model_name, cache_folder=None, device=None):
+        self.release.wait(5)
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        return [float(query in text) for query, text in pairs]
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestCrossEncoderScorer:
+    """Test that the model loads in the background instead of within a query."""
+
+    def test_queries_fall_back_while_the_model_loads(self, monkeypatch):
+        """Test that scoring fails fast until the preloaded model is ready."""
+        monkeypatch.setitem(sys.modules, 'sentence_transformers', types.SimpleNamespace(CrossEncoder=SlowCrossEncoder))
+        scorer = CrossEncoderScorer('test-model')
+        reranker = Reranker(scorer, budget_ms=1000)
+        scored = [(1.0, make_result('a')), (0.9, make_result('b', 'needle'))]
+
+        loading = scorer.start_preload()
+        start = time.perf_counter()
+        assert reranker.rerank('needle', scored) == scored
+        assert time.perf_counter() - start < 1
+        assert reranker.fallbacks == 1
+
+        SlowCrossEncoder.release.set()
+        loading.result(timeout=5)
+        assert scorer.start_preload() is loading
+        assert [r.chunk_id for _, r in reranker.rerank('needle', scored)] == ['b', 'a']
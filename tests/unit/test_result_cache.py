@@ -0,0 +1,86 @@
+"""Unit tests for the search response cache and index generations."""
+
+import numpy as np
+import pytest
+
+from search.indexer import CodeIndexManager
+from search.result_cache import SearchResultCache
+from tests.fixtures.index_results import DIMENSION, make_result, random_vector
+
+
+@pytest.mark.unit
+class TestSearchResultCache:
+    """Test keys, LRU eviction and generation invalidation."""
+
+    def test_hit_requires_same_generation_and_params(self):
+        """Test that responses are only returned for the exact index state and query."""
+        cache = SearchResultCache()
+        cache.put('project', 1, ('query', 5), 'response')
+
+        assert cache.get('project', 1, ('query', 5)) == 'response'
+        assert cache.get('project', 2, ('query', 5)) is None
+        assert cache.get('project', 1, ('query', 10)) is None
+        assert cache.get('other', 1, ('query', 5)) is None
+        assert (cache.hits, cache.misses) == (1, 3)
+
+    def test_new_generation_drops_older_entries(self):
+        """Test that a changed index frees its stale responses and rejects late ones."""
+        cache = SearchResultCache()
+        cache.put('project', 1, 'a', 'old')
+        cache.put('other', 1, 'a', 'kept')
+        cache.put('project', 2, 'b', 'new')
+
+        assert len(cache) == 2
+        cache.put('project', 1, 'c', 'late')
+        assert cache.get('project', 1, 'c') is None
+        assert cache.get('other', 1, 'a') == 'kept'
+
+    def test_bounded_by_entries_and_bytes(self):
+        """Test least-recently-used eviction under both limits."""
+        cache = SearchResultCache(max_entries=2, max_bytes=10)
+        cache.put('p', 1, 'a', 'xxx')
+        cache.put('p', 1, 'b', 'xxx')
+        cache.get('p', 1, 'a')
+        cache.put('p', 1, 'c', 'xxx')
+
+        assert cache.get('p', 1, 'b') is None
+        assert cache.get('p', 1, 'a') == 'xxx'
+
+        cache.put('p', 1, 'd', 'x' * 8)
+        assert cache.get_stats()['bytes'] <= 10
+        cache.put('p', 1, 'e', 'x' * 11)
+        assert cache.get('p', 1, 'e') is None
+
+
+@pytest.mark.unit
+class TestIndexGeneration:
+    """Test that committed index changes move the generation."""
+
+    def test_generation_changes_on_commits(self, tmp_path):
+        """Test adds, updates, removals and clears."""
+        manager = CodeIndexManager(str(tmp_path / 'index'))
+        other = CodeIndexManager(str(tmp_path / 'other'))
+        assert manager.generation != other.generation
+
+        seen = [manager.generation]
+        manager.add_embeddings([
+            make_result(f'{name}.py', name, random_vector(seed)) for seed, name in enumerate('abc')
+        ])
+        seen.append(manager.generation)
+
+        manager.search(np.ones(DIMENSION, dtype=np.float32), k=2)
+        assert manager.generation == seen[-1]
+
+        manager.update_chunk_metadata({'a.py:1-2:function:a': {'start_line': 3}})
+        seen.append(manager.generation)
+        manager.remove_chunks(['b.py:1-2:function:b'])
+        seen.append(manager.generation)
+        manager.remove_file_chunks('c.py')
+        seen.append(manager.generation)
+
+        manager.remove_chunks(['missing'])
+        assert manager.generation == seen[-1]
+
+        manager.clear_index()
+        seen.append(manager.generation)
+        assert len(set(seen)) == len(seen)
@@ -0,0 +1,100 @@
+"""Unit tests for async tool execution with concurrency limits."""
+
+import asyncio
+import inspect
+import threading
+import time
+
+import pytest
+
+from mcp_server.tool_executor import ToolExecutor, current_cancel_event
+
+
+@pytest.mark.unit
+@pytest.mark.mcp
+class TestToolExecutor:
+    """Test the bounded executor behind the async MCP tools."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test fixtures."""
+        self.executor = ToolExecutor(max_workers=4, tool_limits={'index_directory': 1})
+        yield
+        self.executor.shutdown(wait=True)
+
+    def test_per_tool_limits(self):
+        """Test that a tool's limit holds while other tools keep running."""
+        running = {'index_directory': 0, 'search_code': 0}
+        peak = dict(running)
+        lock = threading.Lock()
+
+        def work(tool):
+            with lock:
+                running[tool] += 1
+                peak[tool] = max(peak[tool], running[tool])
+            time.sleep(0.05)
+            with lock:
+                running[tool] -= 1
+            return tool
+
+        async def main():
+            calls = [self.executor.run(tool, work, tool) for tool in ['index_directory', 'search_code'] * 3]
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(main())
+
+        assert results == ['index_directory', 'search_code'] * 3
+        assert peak == {'index_directory': 1, 'search_code': 3}
+
+    def test_cancellation_sets_event_and_keeps_slot(self):
+        """Test that cancelling a running call signals it and holds its slot until it stops."""
+        started = threading.Event()
+        order = []
+
+        def index():
+            started.set()
+            cancel_event = current_cancel_event()
+            assert cancel_event.wait(5)
+            time.sleep(0.05)
+            order.append('cancelled call stopped')
+
+        def second():
+            order.append('second call started')
+
+        async def main():
+            task = asyncio.create_task(self.executor.run('index_directory', index))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await self.executor.run('index_directory', second)
+
+        asyncio.run(main())
+
+        assert order == ['cancelled call stopped', 'second call started']
+        assert current_cancel_event() is None
+
+    def test_wrap_keeps_signature(self):
+        """Test that wrapped tools are coroutine functions with the original signature."""
+        def search_code(query: str, k: int = 5) -> str:
+            """Search."""
+            return f'{query}:{k}'
+
+        wrapped = self.executor.wrap('search_code', search_code)
+
+        assert inspect.iscoroutinefunction(wrapped)
+        assert inspect.signature(wrapped) == inspect.signature(search_code)
+        assert wrapped.__name__ == 'search_code'
+        assert asyncio.run(wrapped('auth', k=2)) == 'auth:2'
+
+    def test_mcp_tools_are_async(self):
+        """Test that CodeSearchMCP registers async tools with unchanged schemas."""
+        from mcp_server.code_search_mcp import CodeSearchMCP
+        from mcp_server.code_search_server import CodeSearchServer
+
+        mcp = CodeSearchMCP(CodeSearchServer(), self.executor)
+        tools = {tool.name: tool for tool in asyncio.run(mcp.list_tools())}
+
+        assert 'query' in tools['search_code'].inputSchema['properties']
+        assert tools['search_code'].inputSchema['required'] == ['query']
+        assert all(t.is_async for t in mcp._tool_manager.list_tools())
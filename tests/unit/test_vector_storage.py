@@ -0,0 +1,97 @@
+"""Unit tests for float16 vector storage and copy-free adds."""
+
+import numpy as np
+import pytest
+
+from search.indexer import CodeIndexManager, _embedding_matrix
+from tests.fixtures.index_results import DIMENSION, make_chunk, make_results
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestFloat16Storage:
+    """Test that float16 indexes halve memory and rank like float32 ones."""
+
+    def test_float16_index_matches_float32(self, tmp_path):
+        """Test the index type, memory and search results of both element types."""
+        full = CodeIndexManager(str(tmp_path / 'full'))
+        half = CodeIndexManager(str(tmp_path / 'half'), vector_dtype='float16')
+        full.add_embeddings(make_results(200, np.random.RandomState(0)))
+        half.add_embeddings(make_results(200, np.random.RandomState(0)))
+        query = np.random.RandomState(1).randn(DIMENSION).astype(np.float32)
+
+        full_results = full.search(query, k=10)
+        half_results = half.search(query, k=10)
+
+        assert type(half.index).__name__ == 'IndexScalarQuantizer'
+        assert [chunk_id for chunk_id, _, _ in half_results] == [chunk_id for chunk_id, _, _ in full_results]
+        assert [sim for _, sim, _ in half_results] == pytest.approx([sim for _, sim, _ in full_results], abs=1e-3)
+        id_bytes = sum(len(chunk_id) + 56 for chunk_id in full._chunk_ids)
+        assert half.memory_usage() - id_bytes == (full.memory_usage() - id_bytes) // 2
+
+    def test_float16_index_survives_reload_and_large_adds(self, tmp_path):
+        """Test that the element type is kept on disk and used for IVF indexes."""
+        half = CodeIndexManager(str(tmp_path / 'half'), vector_dtype='float16')
+        half.add_embeddings(make_results(20, np.random.RandomState(0)))
+        half.save_index()
+
+        reloaded = CodeIndexManager(str(tmp_path / 'half'))
+        assert type(reloaded.index).__name__ == 'IndexScalarQuantizer'
+        assert reloaded.get_similar_chunks('module3.py:1-2:function:f3', k=2)
+
+        half.clear_index()
+        half.create_index(DIMENSION, 'ivf')
+        assert type(half._index).__name__ == 'IndexIVFScalarQuantizer'
+
+        with pytest.raises(ValueError):
+            CodeIndexManager(str(tmp_path / 'other'), vector_dtype='int8')
+
+
+@pytest.mark.unit
+@pytest.mark.search
+class TestEmbeddingMatrix:
+    """Test that embedded chunks are added without copying their vectors."""
+
+    def test_consecutive_rows_are_viewed(self):
+        """Test that rows of one matrix are used in place and anything else is copied."""
+        matrix = np.random.RandomState(0).randn(6, DIMENSION).astype(np.float32)
+
+        block = _embedding_matrix([matrix[2], matrix[3], matrix[4]])
+        assert np.shares_memory(block, matrix) and block.shape == (3, DIMENSION)
+
+        for embeddings in ([matrix[2], matrix[4]], [matrix[3], matrix[2]], [matrix[0], matrix[0].copy()]):
+            copied = _embedding_matrix(embeddings)
+            assert not np.shares_memory(copied, matrix)
+            assert np.array_equal(copied, np.stack(embeddings))
+
+        assert _embedding_matrix([np.ones(DIMENSION)]).dtype == np.float32
+
+    def test_embed_chunks_fills_one_matrix(self, embedder_with_cleanup, tmp_path):
+        """Test that embed_chunks rows are normalized in place when added."""
+        chunks = [make_chunk(f'm{i}.py', f'def f{i}(): return {i}', f'f{i}') for i in range(5)]
+
+        results = embedder_with_cleanup.embed_chunks(chunks, batch_size=2)
+        base = results[0].embedding.base
+        assert base.shape == (5, 768) and base.dtype == np.float32 and base.flags.c_contiguous
+        assert all(result.embedding.base is base for result in results)
+
+        CodeIndexManager(str(tmp_path / 'index')).add_embeddings(results)
+        assert np.allclose(np.linalg.norm(base, axis=1), 1.0)
+
+    def test_add_normalizes_embed_chunks_rows_in_place(self, embedder_with_cleanup, tmp_path):
+        """Test that add_embeddings normalizes embed_chunks rows, shared ones included, but copies others."""
+        chunks = [
+            make_chunk(path, content, 'f')
+            for path, content in [('a.py', 'def f(): pass'), ('vendor/a.py', 'def f(): pass'), ('b.py', 'def g(): 1')]
+        ]
+        results = embedder_with_cleanup.embed_chunks(chunks)
+        assert results[0].embedding is results[1].embedding
+        separate = make_results(3, np.random.RandomState(5), dimension=768)
+        originals = [result.embedding.copy() for result in separate]
+
+        manager = CodeIndexManager(str(tmp_path / 'index'))
+        manager.add_embeddings(results)
+        manager.add_embeddings(separate)
+
+        assert [np.linalg.norm(result.embedding) for result in results] == pytest.approx([1.0] * 3)
+        assert all(np.array_equal(result.embedding, original) for result, original in zip(separate, originals))